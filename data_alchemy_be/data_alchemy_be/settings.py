@@ -92,6 +92,79 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# Dataset value storage. New datasets use DATASET_STORAGE_BACKEND ('COLUMNAR' or 'EAV').
+DATASET_STORAGE_BACKEND = os.environ.get('DATASET_STORAGE_BACKEND', 'COLUMNAR')
+DATASET_STORAGE_ROOT = os.environ.get('DATASET_STORAGE_ROOT', BASE_DIR / 'dataset_storage')
+# How the EAV backend inserts rows on PostgreSQL: 'copy' (COPY FROM STDIN) or 'orm' (bulk_create)
+DATASET_BULK_LOADER = os.environ.get('DATASET_BULK_LOADER', 'copy')
+
+# Type inference. 'full' checks every value before the schema is stored; 'sample' infers
+# from the head/tail rows plus a reservoir sample and confirms the types in a background job.
+INFERENCE_MODE = os.environ.get('INFERENCE_MODE', 'full')
+INFERENCE_SAMPLE_SIZE = int(os.environ.get('INFERENCE_SAMPLE_SIZE', 10000))
+INFERENCE_HEAD_ROWS = int(os.environ.get('INFERENCE_HEAD_ROWS', 1000))
+INFERENCE_TAIL_ROWS = int(os.environ.get('INFERENCE_TAIL_ROWS', 1000))
+INFERENCE_CONFIDENCE_LEVEL = float(os.environ.get('INFERENCE_CONFIDENCE_LEVEL', 0.95))
+# Processes sharing full type inference within one worker: 1 infers in the worker
+# itself, 0 uses every CPU available to the container
+INFERENCE_PROCESSES = int(os.environ.get('INFERENCE_PROCESSES', 1))
+# Full inference results cached in Redis by column fingerprint (header name, value shapes and small
+# value sets of the first INFERENCE_CACHE_SAMPLE_ROWS rows). Entries expire INFERENCE_CACHE_TTL seconds
+# after their last use; past INFERENCE_CACHE_MAX_ENTRIES the least recently used are evicted
+INFERENCE_CACHE_ENABLED = os.environ.get('INFERENCE_CACHE_ENABLED', 'true').lower() == 'true'
+INFERENCE_CACHE_TTL = int(os.environ.get('INFERENCE_CACHE_TTL', 7 * 24 * 60 * 60))
+INFERENCE_CACHE_MAX_ENTRIES = int(os.environ.get('INFERENCE_CACHE_MAX_ENTRIES', 10000))
+INFERENCE_CACHE_SAMPLE_ROWS = int(os.environ.get('INFERENCE_CACHE_SAMPLE_ROWS', 1000))
+
+# Ingestion. 'serial' processes a file in one worker; 'parallel' splits CSV files into parts of
+# PARALLEL_INGESTION_PART_ROWS rows by PARALLEL_INGESTION_COLUMN_GROUP_SIZE columns, processed
+# as a Celery chord across the data_processing workers. Parallel ingestion always infers in full.
+INGESTION_MODE = os.environ.get('INGESTION_MODE', 'serial')
+PARALLEL_INGESTION_PART_ROWS = int(os.environ.get('PARALLEL_INGESTION_PART_ROWS', 100000))
+PARALLEL_INGESTION_COLUMN_GROUP_SIZE = int(os.environ.get('PARALLEL_INGESTION_COLUMN_GROUP_SIZE', 10))
+
+# Serial ingestion records a checkpoint on its job about every INGESTION_CHECKPOINT_ROWS rows;
+# a retried or resumed job continues from the last one
+INGESTION_CHECKPOINT_ROWS = int(os.environ.get('INGESTION_CHECKPOINT_ROWS', 10000))
+
+# Uploads are hashed while they stream in. With DATASET_DEDUPLICATION on, an upload whose content
+# matches an ingested dataset is cloned from it instead of processed; uploads can opt out with `deduplicate`
+FILE_UPLOAD_HANDLERS = [
+    'utils.upload_handlers.HashingUploadHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+DATASET_DEDUPLICATION = os.environ.get('DATASET_DEDUPLICATION', 'true').lower() == 'true'
+
+# Columns with more rows than this are converted as parallel row range partitions on the
+# data_processing queue and committed at once; 0 always converts in a single task
+CONVERSION_PARTITION_ROWS = int(os.environ.get('CONVERSION_PARTITION_ROWS', 1000000))
+
+# Redis cache of dataset row pages, bounded per dataset by count and by age
+DATASET_PAGE_CACHE_ENABLED = os.environ.get('DATASET_PAGE_CACHE_ENABLED', 'true').lower() == 'true'
+DATASET_PAGE_CACHE_TTL = int(os.environ.get('DATASET_PAGE_CACHE_TTL', 300))
+DATASET_PAGE_CACHE_MAX_PAGES = int(os.environ.get('DATASET_PAGE_CACHE_MAX_PAGES', 50))
+
+# Exports up to DATASET_EXPORT_STREAMING_MAX_CELLS cells stream straight to the client;
+# larger ones run on the exports queue and are written to DATASET_EXPORT_ROOT
+DATASET_EXPORT_ROOT = os.environ.get('DATASET_EXPORT_ROOT', BASE_DIR / 'exports')
+DATASET_EXPORT_STREAMING_MAX_CELLS = int(os.environ.get('DATASET_EXPORT_STREAMING_MAX_CELLS', 1000000))
+
+# Task progress is recorded and pushed to streaming clients at most TASK_PROGRESS_MAX_RATE
+# times a second per task; idle streams send a heartbeat every TASK_PROGRESS_HEARTBEAT seconds
+TASK_PROGRESS_MAX_RATE = float(os.environ.get('TASK_PROGRESS_MAX_RATE', 2))
+TASK_PROGRESS_HEARTBEAT = int(os.environ.get('TASK_PROGRESS_HEARTBEAT', 15))
+
+# Per-stage job metrics. Memory is sampled every JOB_METRICS_SAMPLE_INTERVAL seconds; stage
+# and job times are aggregated on /metrics into histograms with JOB_METRICS_BUCKETS bounds
+JOB_METRICS_SAMPLE_INTERVAL = float(os.environ.get('JOB_METRICS_SAMPLE_INTERVAL', 0.1))
+JOB_METRICS_BUCKETS = (0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 1800, 3600)
+
+# Profiling of ingestion and conversion jobs: '' (off), 'sampling' (collapsed stacks, sampled every
+# PROFILER_SAMPLE_INTERVAL seconds) or 'cprofile' (pstats). Single jobs can ask for it with `profile`.
+PROFILER_MODE = os.environ.get('PROFILER_MODE', '')
+PROFILER_SAMPLE_INTERVAL = float(os.environ.get('PROFILER_SAMPLE_INTERVAL', 0.005))
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -157,6 +230,13 @@ CELERY_TASK_QUEUES = {
 }
 CELERY_TASK_ROUTES = {
     'data_processing.tasks.process_dataset_task': {'queue': 'data_processing'},
+    'data_processing.tasks.clone_dataset_task': {'queue': 'data_processing'},
+    'data_processing.tasks.infer_part_types_task': {'queue': 'data_processing'},
+    'data_processing.tasks.create_parallel_columns_task': {'queue': 'data_processing'},
+    'data_processing.tasks.persist_part_task': {'queue': 'data_processing'},
+    'data_processing.tasks.finish_parallel_ingestion_task': {'queue': 'data_processing'},
+    'data_processing.tasks.convert_partition_task': {'queue': 'data_processing'},
+    'data_processing.tasks.finish_partitioned_conversion_task': {'queue': 'data_processing'},
     'data_processing.tasks.export_dataset_task': {'queue': 'exports'},
 }
 CELERY_RESULT_BACKEND = 'django-db'
@@ -1,5 +1,8 @@
 from django.urls import path, include
 
+from data_processing.views import metrics
+
 urlpatterns = [
     path('api/v1/', include('data_processing.urls')),
+    path('metrics', metrics, name='metrics'),
 ]
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class DataProcessingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'data_processing'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,8 @@
+from data_processing.benchmarks.harness import PeakMemory, compare, measure, percentile
+from data_processing.benchmarks.suite import PipelineBenchmark
+from data_processing.benchmarks.synthetic import DatasetSpec, generate_frame, parse_type_mix, write_dataset
+
+__all__ = (
+    'DatasetSpec', 'PeakMemory', 'PipelineBenchmark', 'compare', 'generate_frame',
+    'measure', 'parse_type_mix', 'percentile', 'write_dataset'
+)
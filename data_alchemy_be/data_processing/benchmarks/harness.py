@@ -0,0 +1,118 @@
+import statistics
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+from utils.memory import current_rss, max_rss
+
+
+class PeakMemory:
+    """
+    Samples the process RSS in a background thread while the block runs, so
+    each benchmark gets its own peak rather than the process lifetime one.
+    Falls back to the lifetime peak where RSS cannot be sampled.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self) -> 'PeakMemory':
+        self.peak = current_rss() or 0
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+        if not self.peak:
+            self.peak = max_rss()
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            rss = current_rss()
+            if rss:
+                self.peak = max(self.peak, rss)
+
+
+def summarize(seconds: List[float]) -> Dict[str, float]:
+    """Summary statistics of repeated timings, in seconds."""
+    return {
+        'rounds': len(seconds),
+        'min': min(seconds),
+        'max': max(seconds),
+        'mean': statistics.fmean(seconds),
+        'median': statistics.median(seconds),
+        'stddev': statistics.stdev(seconds) if len(seconds) > 1 else 0.0,
+    }
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Percentile of values with linear interpolation between the closest ranks."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = (len(ordered) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def measure(
+        target: Callable[[], Any],
+        rounds: int = 1,
+        setup: Callable[[], Any] = None,
+        teardown: Callable[[Any], None] = None
+) -> Dict[str, Any]:
+    """
+    Time target over several rounds. setup runs before each round, outside
+    the timing, and its return value is passed to target and to teardown.
+    Returns the timing summary, the peak RSS across rounds and the last
+    round's return value.
+    """
+    seconds = []
+    peak = 0
+    value = None
+    for _ in range(rounds):
+        context = setup() if setup else None
+        try:
+            with PeakMemory() as memory:
+                start = time.perf_counter()
+                value = target(context) if setup else target()
+                seconds.append(time.perf_counter() - start)
+            peak = max(peak, memory.peak)
+        finally:
+            if teardown:
+                teardown(context)
+
+    return {'seconds': summarize(seconds), 'peak_rss_bytes': peak, 'value': value}
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Relative change of every throughput, latency and memory metric of two
+    result documents. For throughputs higher is better; for the rest lower is.
+    """
+    changes = []
+    for benchmark, metrics in current.get('benchmarks', {}).items():
+        previous = baseline.get('benchmarks', {}).get(benchmark, {})
+        for metric, value in metrics.items():
+            before = previous.get(metric)
+            if not isinstance(value, (int, float)) or not isinstance(before, (int, float)) or not before:
+                continue
+            if not metric.endswith(('_per_second', '_ms', '_bytes')):
+                continue
+            change = (value - before) / before
+            better = change > 0 if metric.endswith('_per_second') else change < 0
+            changes.append({
+                'benchmark': benchmark,
+                'metric': metric,
+                'baseline': before,
+                'current': value,
+                'change': round(change, 4),
+                'improved': better,
+            })
+    return changes
@@ -0,0 +1,214 @@
+import logging
+import random
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from django.conf import settings
+from django.core.files import File
+from django.test import Client, override_settings
+from django.utils import timezone
+
+from data_processing.benchmarks.harness import measure, percentile
+from data_processing.benchmarks.synthetic import DatasetSpec, write_dataset
+from data_processing.models import Dataset
+from data_processing.tasks.conversion import ConversionFailed
+from data_processing.tasks.task_service import DataProcessingService
+
+logger = logging.getLogger(__name__)
+
+
+class PipelineBenchmark:
+    """
+    Measures the hot paths of the pipeline in this process, against the
+    configured database and storage: serial ingestion through
+    DataProcessingService.process_dataset, column type conversion through
+    convert_column, and row page fetches through the dataset API.
+
+    Celery is bypassed so queueing does not blur the timings. Every dataset
+    created is deleted afterwards unless keep is set.
+    """
+
+    def __init__(
+            self,
+            spec: DatasetSpec,
+            storage_backend: str = None,
+            rounds: int = 1,
+            pages: int = 100,
+            page_size: int = 20,
+            page_cache: bool = False,
+            keep: bool = False
+    ):
+        self.spec = spec
+        self.storage_backend = storage_backend or settings.DATASET_STORAGE_BACKEND
+        self.rounds = rounds
+        self.pages = pages
+        self.page_size = page_size
+        self.page_cache = page_cache
+        self.keep = keep
+        self._datasets: List[Dataset] = []
+
+    def run(self) -> Dict[str, Any]:
+        """Run every benchmark and return the results document."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = write_dataset(self.spec, Path(tmp_dir) / f'benchmark.{self.spec.file_type}')
+            try:
+                ingest = self.benchmark_ingest(path)
+                dataset = self._datasets[-1]
+                benchmarks = {
+                    'ingest': ingest,
+                    'retrieval': self.benchmark_retrieval(dataset),
+                    'conversion': self.benchmark_conversion(dataset),
+                }
+            finally:
+                if not self.keep:
+                    self.cleanup()
+
+        return {
+            'created_at': timezone.now().isoformat(),
+            'commit': self._commit(),
+            'spec': self.spec.to_dict(),
+            'settings': {
+                'storage_backend': self.storage_backend,
+                'inference_mode': settings.INFERENCE_MODE,
+                'inference_processes': settings.INFERENCE_PROCESSES,
+                'inference_cache': settings.INFERENCE_CACHE_ENABLED,
+                'page_cache': self.page_cache,
+                'database': settings.DATABASES['default']['ENGINE'],
+            },
+            'benchmarks': benchmarks,
+        }
+
+    def benchmark_ingest(self, path: Path) -> Dict[str, Any]:
+        """Rows ingested per second, each round into a new dataset."""
+        rounds_done = []
+
+        def setup() -> Dataset:
+            with open(path, 'rb') as source:
+                dataset = Dataset.objects.create(
+                    name=f'benchmark-{path.name}',
+                    file=File(source, name=path.name),
+                    file_type=self.spec.file_type,
+                    storage_backend=self.storage_backend
+                )
+            self._datasets.append(dataset)
+            return dataset
+
+        def teardown(dataset: Dataset) -> None:
+            # Only the last round's dataset is kept for the other benchmarks
+            rounds_done.append(dataset)
+            if len(rounds_done) < self.rounds:
+                self._delete(dataset)
+                self._datasets.remove(dataset)
+
+        measured = measure(DataProcessingService.process_dataset, self.rounds, setup, teardown)
+        return {
+            'rows': self.spec.rows,
+            'cells': self.spec.rows * self.spec.columns,
+            'seconds': measured['seconds'],
+            'rows_per_second': self.spec.rows / measured['seconds']['median'],
+            'peak_rss_bytes': measured['peak_rss_bytes'],
+        }
+
+    def benchmark_retrieval(self, dataset: Dataset) -> Dict[str, Any]:
+        """Latency of fetching random numbered row pages through the API."""
+        client = Client()
+        page_count = max((self.spec.rows + self.page_size - 1) // self.page_size, 1)
+        pages = random.Random(self.spec.seed).choices(range(1, page_count + 1), k=self.pages)
+
+        def fetch_pages() -> List[float]:
+            latencies = []
+            for page in pages:
+                start = time.perf_counter()
+                response = client.get(
+                    f'/api/v1/datasets/{dataset.id}/',
+                    {'page': page, 'page_size': self.page_size}
+                )
+                latencies.append((time.perf_counter() - start) * 1000)
+                if response.status_code != 200:
+                    raise RuntimeError(f"Page {page} failed with status {response.status_code}")
+            return latencies
+
+        with override_settings(DATASET_PAGE_CACHE_ENABLED=self.page_cache):
+            measured = measure(fetch_pages)
+
+        latencies = measured['value']
+        return {
+            'pages': len(latencies),
+            'page_size': self.page_size,
+            'p50_ms': percentile(latencies, 50),
+            'p99_ms': percentile(latencies, 99),
+            'mean_ms': sum(latencies) / len(latencies) if latencies else 0.0,
+            'peak_rss_bytes': measured['peak_rss_bytes'],
+        }
+
+    def benchmark_conversion(self, dataset: Dataset) -> Dict[str, Any]:
+        """
+        Values converted per second. Columns inferred as their intended type
+        are converted to Text; columns that dirty values kept as Text are
+        converted to their intended type, which scans them fully and fails.
+        """
+        intended_types = self.spec.column_types()
+        conversions = []
+        total_values = 0
+        total_seconds = 0.0
+        peak = 0
+        for column in dataset.columns.order_by('position'):
+            target_type = intended_types[column.position] if column.current_type == 'Text' else 'Text'
+            if target_type == column.current_type:
+                continue
+
+            def convert() -> bool:
+                try:
+                    DataProcessingService.convert_column(column, target_type)
+                    return True
+                except ConversionFailed:
+                    return False
+
+            source_type = column.current_type
+            measured = measure(convert)
+            seconds = measured['seconds']['median']
+            conversions.append({
+                'column': column.name,
+                'source_type': source_type,
+                'target_type': target_type,
+                'converted': measured['value'],
+                'seconds': seconds,
+                'values_per_second': self.spec.rows / seconds if seconds else 0.0,
+            })
+            total_values += self.spec.rows
+            total_seconds += seconds
+            peak = max(peak, measured['peak_rss_bytes'])
+
+        return {
+            'values': total_values,
+            'seconds': total_seconds,
+            'values_per_second': total_values / total_seconds if total_seconds else 0.0,
+            'peak_rss_bytes': peak,
+            'columns': conversions,
+        }
+
+    def cleanup(self) -> None:
+        for dataset in self._datasets:
+            self._delete(dataset)
+        self._datasets = []
+
+    @staticmethod
+    def _delete(dataset: Dataset) -> None:
+        try:
+            dataset.file.delete(save=False)
+            dataset.delete()
+        except Exception as e:
+            logger.warning(f"Could not delete benchmark dataset {dataset.id}: {str(e)}")
+
+    @staticmethod
+    def _commit() -> str:
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                cwd=settings.BASE_DIR, capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return ''
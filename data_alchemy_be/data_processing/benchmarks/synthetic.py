@@ -0,0 +1,101 @@
+from pathlib import Path
+from typing import Dict, List, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+# Values of each type that the type inference rejects for that type
+DIRTY_VALUES = {
+    'Integer': ['N/A', '12a', '1.5', '--'],
+    'Float': ['N/A', 'abc', '1,2,3.4.5'],
+    'Datetime': ['not a date', '2023-13-45', 'yesterday'],
+    'Boolean': ['maybe', 'unknown', '2'],
+    'Category': ['???', 'other-value'],
+    'Text': [],
+}
+CATEGORIES = ['red', 'green', 'blue', 'yellow', 'black']
+WORDS = ['alpha', 'beta', 'gamma', 'delta', 'epsilon', 'zeta', 'eta', 'theta', 'iota', 'kappa']
+
+
+class DatasetSpec(NamedTuple):
+    """Shape of a synthetic dataset. type_mix maps column types to their relative weight."""
+    rows: int
+    columns: int
+    type_mix: Dict[str, int]
+    null_ratio: float = 0.0
+    dirty_ratio: float = 0.0
+    file_type: str = 'csv'
+    seed: int = 0
+
+    def column_types(self) -> List[str]:
+        """Intended type of every column, spread over the mix in proportion to the weights."""
+        types = [data_type for data_type, weight in sorted(self.type_mix.items()) for _ in range(weight)]
+        return [types[position % len(types)] for position in range(self.columns)]
+
+    def to_dict(self) -> Dict:
+        return self._asdict()
+
+
+def parse_type_mix(value: str) -> Dict[str, int]:
+    """Parse 'Integer=3,Float=2,Text=1' into a type mix."""
+    mix = {}
+    for item in value.split(','):
+        data_type, _, weight = item.partition('=')
+        data_type = data_type.strip().capitalize()
+        if data_type not in DIRTY_VALUES:
+            raise ValueError(f"Unknown column type: {data_type}")
+        mix[data_type] = int(weight or 1)
+    if not mix or not any(mix.values()):
+        raise ValueError("The type mix needs at least one weighted type")
+    return mix
+
+
+def generate_column(data_type: str, rows: int, rng: np.random.Generator) -> pd.Series:
+    """Clean text values of one column of the given type."""
+    if data_type == 'Integer':
+        values = rng.integers(-1_000_000, 1_000_000, rows).astype(str)
+    elif data_type == 'Float':
+        values = np.char.mod('%.4f', rng.normal(0, 1000, rows))
+    elif data_type == 'Datetime':
+        seconds = rng.integers(0, 10 * 365 * 24 * 3600, rows)
+        values = (pd.Timestamp('2015-01-01') + pd.to_timedelta(seconds, unit='s')).strftime('%Y-%m-%d %H:%M:%S')
+    elif data_type == 'Boolean':
+        values = rng.choice(['true', 'false'], rows)
+    elif data_type == 'Category':
+        values = rng.choice(CATEGORIES, rows)
+    else:
+        values = np.char.add(np.char.add(rng.choice(WORDS, rows), ' '), rng.integers(0, 1_000_000, rows).astype(str))
+    return pd.Series(np.asarray(values, dtype=object))
+
+
+def generate_frame(spec: DatasetSpec) -> pd.DataFrame:
+    """
+    Build the dataset described by spec. Nulls and dirty values are scattered
+    over each column at their ratios; the same spec always builds the same data.
+    """
+    rng = np.random.default_rng(spec.seed)
+    columns = {}
+    for position, data_type in enumerate(spec.column_types()):
+        values = generate_column(data_type, spec.rows, rng)
+
+        dirty = DIRTY_VALUES[data_type]
+        if dirty and spec.dirty_ratio:
+            mask = rng.random(spec.rows) < spec.dirty_ratio
+            values[mask] = rng.choice(dirty, int(mask.sum()))
+        if spec.null_ratio:
+            values[rng.random(spec.rows) < spec.null_ratio] = None
+
+        columns[f'{data_type.lower()}_{position}'] = values
+    return pd.DataFrame(columns)
+
+
+def write_dataset(spec: DatasetSpec, path: Path) -> Path:
+    """Write the dataset described by spec as CSV or xlsx."""
+    frame = generate_frame(spec)
+    if spec.file_type == 'csv':
+        frame.to_csv(path, index=False)
+    elif spec.file_type == 'xlsx':
+        frame.to_excel(path, index=False, engine='openpyxl')
+    else:
+        raise ValueError(f"Unsupported file type: {spec.file_type}")
+    return path
@@ -0,0 +1,196 @@
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from redis import RedisError
+
+from data_processing.metrics import JobMetricsStore
+from utils.redis_client import RedisClient
+
+logger = logging.getLogger(__name__)
+
+
+class DatasetPageCache:
+    """
+    Redis cache of fully built dataset row pages, keyed by dataset, a per
+    dataset version and the request's query parameters.
+
+    Invalidation bumps the version, so pages computed from data read before
+    an invalidation are stored under a version no reader asks for. Each
+    dataset keeps at most DATASET_PAGE_CACHE_MAX_PAGES pages, evicting the
+    least recently used, and every page expires after DATASET_PAGE_CACHE_TTL.
+
+    Redis errors are logged and treated as misses; the cache never fails a request.
+    """
+
+    KEY_PREFIX = 'dataset-page'
+
+    @classmethod
+    def version(cls, dataset_id) -> Optional[str]:
+        """Current cache version of a dataset; read it before reading the data to cache."""
+        if not settings.DATASET_PAGE_CACHE_ENABLED:
+            return None
+        try:
+            value = RedisClient().get(cls._version_key(dataset_id))
+            return value.decode() if value else '0'
+        except RedisError as e:
+            logger.warning(f"Page cache unavailable: {str(e)}")
+            return None
+
+    @classmethod
+    def get(cls, dataset_id, version: Optional[str], params: List[Tuple[str, List[str]]]) -> Optional[Dict[str, Any]]:
+        if version is None:
+            return None
+        key = cls._page_key(dataset_id, version, params)
+        try:
+            client = RedisClient()
+            value = client.get(key)
+            if value is None:
+                return None
+
+            # Refresh the page's position in the dataset's LRU order
+            client.redis.zadd(cls._index_key(dataset_id), {key: time.time()})
+            return json.loads(value)
+        except RedisError as e:
+            logger.warning(f"Page cache unavailable: {str(e)}")
+            return None
+
+    @classmethod
+    def set(cls, dataset_id, version: Optional[str], params: List[Tuple[str, List[str]]], data: Dict[str, Any]) -> None:
+        if version is None:
+            return
+        key = cls._page_key(dataset_id, version, params)
+        index_key = cls._index_key(dataset_id)
+        ttl = settings.DATASET_PAGE_CACHE_TTL
+        try:
+            client = RedisClient()
+            pipeline = client.pipeline()
+            pipeline.set(key, json.dumps(data, default=str), ex=ttl)
+            pipeline.zadd(index_key, {key: time.time()})
+            pipeline.expire(index_key, ttl)
+            pipeline.zcard(index_key)
+            page_count = pipeline.execute()[-1]
+
+            overflow = page_count - settings.DATASET_PAGE_CACHE_MAX_PAGES
+            if overflow > 0:
+                evicted = client.redis.zpopmin(index_key, overflow)
+                client.delete(*[evicted_key for evicted_key, _ in evicted])
+        except RedisError as e:
+            logger.warning(f"Page cache unavailable: {str(e)}")
+
+    @classmethod
+    def invalidate(cls, dataset_id) -> None:
+        """Drop every cached page of a dataset; call whenever its rows, columns or types change."""
+        index_key = cls._index_key(dataset_id)
+        try:
+            client = RedisClient()
+            pipeline = client.pipeline()
+            pipeline.incr(cls._version_key(dataset_id))
+            pipeline.zrange(index_key, 0, -1)
+            pipeline.delete(index_key)
+            _, page_keys, _ = pipeline.execute()
+            client.delete(*page_keys)
+        except RedisError as e:
+            logger.warning(f"Could not invalidate page cache of dataset {dataset_id}: {str(e)}")
+
+    @classmethod
+    def _version_key(cls, dataset_id) -> str:
+        return f"{cls.KEY_PREFIX}:{dataset_id}:version"
+
+    @classmethod
+    def _index_key(cls, dataset_id) -> str:
+        return f"{cls.KEY_PREFIX}:{dataset_id}:pages"
+
+    @classmethod
+    def _page_key(cls, dataset_id, version: str, params: List[Tuple[str, List[str]]]) -> str:
+        digest = hashlib.sha1(json.dumps(sorted(params)).encode('utf-8')).hexdigest()
+        return f"{cls.KEY_PREFIX}:{dataset_id}:{version}:{digest}"
+
+
+class InferenceCache:
+    """
+    Redis cache of full type inference results, the ColumnTypeState of a
+    column as a dict, keyed by column fingerprint. Columns recurring across
+    extracts take their state from here instead of being scanned.
+
+    Entries expire INFERENCE_CACHE_TTL seconds after they were last used.
+    Past INFERENCE_CACHE_MAX_ENTRIES the least recently used are evicted.
+    Lookups are counted by result on /metrics.
+
+    Redis errors are logged and treated as misses; the cache never fails a job.
+    """
+
+    KEY_PREFIX = 'inference-cache'
+    INDEX_KEY = 'inference-cache:lru'
+    LOOKUPS_METRIC = 'dataalchemy_inference_cache_lookups_total'
+
+    @classmethod
+    def get_many(cls, fingerprints: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Cached states of the fingerprints found, refreshing their age and LRU position."""
+        if not settings.INFERENCE_CACHE_ENABLED or not fingerprints:
+            return {}
+        try:
+            client = RedisClient()
+            values = client.redis.mget([cls._key(fingerprint) for fingerprint in fingerprints])
+            found = {
+                fingerprint: json.loads(value)
+                for fingerprint, value in zip(fingerprints, values) if value is not None
+            }
+            if found:
+                pipeline = client.pipeline()
+                pipeline.zadd(cls.INDEX_KEY, {fingerprint: time.time() for fingerprint in found})
+                for fingerprint in found:
+                    pipeline.expire(cls._key(fingerprint), settings.INFERENCE_CACHE_TTL)
+                pipeline.execute()
+        except RedisError as e:
+            logger.warning(f"Inference cache unavailable: {str(e)}")
+            return {}
+
+        JobMetricsStore.count(cls.LOOKUPS_METRIC, {'result': 'hit'}, len(found))
+        JobMetricsStore.count(cls.LOOKUPS_METRIC, {'result': 'miss'}, len(fingerprints) - len(found))
+        return found
+
+    @classmethod
+    def set_many(cls, states: Dict[str, Dict[str, Any]]) -> None:
+        if not settings.INFERENCE_CACHE_ENABLED or not states:
+            return
+        ttl = settings.INFERENCE_CACHE_TTL
+        now = time.time()
+        try:
+            client = RedisClient()
+            pipeline = client.pipeline()
+            for fingerprint, state in states.items():
+                pipeline.set(cls._key(fingerprint), json.dumps(state), ex=ttl)
+            pipeline.zadd(cls.INDEX_KEY, {fingerprint: now for fingerprint in states})
+            # Entries unused for longer than the TTL have already expired
+            pipeline.zremrangebyscore(cls.INDEX_KEY, '-inf', now - ttl)
+            pipeline.zcard(cls.INDEX_KEY)
+            entry_count = pipeline.execute()[-1]
+
+            overflow = entry_count - settings.INFERENCE_CACHE_MAX_ENTRIES
+            if overflow > 0:
+                evicted = client.redis.zpopmin(cls.INDEX_KEY, overflow)
+                client.delete(*[cls._key(fingerprint.decode()) for fingerprint, _ in evicted])
+        except RedisError as e:
+            logger.warning(f"Inference cache unavailable: {str(e)}")
+
+    @classmethod
+    def evict(cls, fingerprints: List[str]) -> None:
+        """Drop states found not to fit a column with their fingerprint."""
+        if not fingerprints:
+            return
+        try:
+            pipeline = RedisClient().pipeline()
+            pipeline.delete(*[cls._key(fingerprint) for fingerprint in fingerprints])
+            pipeline.zrem(cls.INDEX_KEY, *fingerprints)
+            pipeline.execute()
+        except RedisError as e:
+            logger.warning(f"Could not evict from the inference cache: {str(e)}")
+        JobMetricsStore.count(cls.LOOKUPS_METRIC, {'result': 'stale'}, len(fingerprints))
+
+    @classmethod
+    def _key(cls, fingerprint: str) -> str:
+        return f"{cls.KEY_PREFIX}:{fingerprint}"
@@ -0,0 +1,169 @@
+import io
+import tempfile
+from typing import BinaryIO, Callable, Iterator, List
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from openpyxl import Workbook
+
+from data_processing.models import Column, Dataset
+from data_processing.storage import get_storage
+from data_processing.tasks.inference import convert_chunk
+from utils.exceptions import ExportError
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object collecting bytes until they are drained."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data, self._chunks = b''.join(self._chunks), []
+        return data
+
+
+class DatasetExporter:
+    """
+    Exports a dataset in its columns' current types, reading the stored
+    values chunk by chunk so memory stays constant whatever the dataset size.
+    """
+
+    FORMATS = {
+        'csv': ('text/csv', 'csv'),
+        'parquet': ('application/vnd.apache.parquet', 'parquet'),
+        'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+    }
+    CHUNK_SIZE = 10000
+    SPOOL_SIZE = 1024 * 1024
+    # An xlsx sheet holds 1,048,576 rows, one of which is the header
+    XLSX_MAX_ROWS = 1048576 - 1
+
+    ARROW_TYPES = {
+        'Integer': pa.int64(),
+        'Float': pa.float64(),
+        'Datetime': pa.timestamp('ns'),
+        'Boolean': pa.bool_(),
+        'Category': pa.dictionary(pa.int32(), pa.string()),
+    }
+
+    def __init__(self, dataset: Dataset, file_format: str):
+        if file_format not in self.FORMATS:
+            raise ValueError(f"Unsupported export format: {file_format}. Must be one of: {', '.join(self.FORMATS)}")
+
+        self.dataset = dataset
+        self.file_format = file_format
+        self.columns: List[Column] = list(dataset.columns.all().order_by('position'))
+        self.rows_written = 0
+
+    def check_row_count(self, row_count: int) -> None:
+        """Reject a dataset with more rows than the export format can hold."""
+        if self.file_format == 'xlsx' and row_count > self.XLSX_MAX_ROWS:
+            raise ExportError(
+                f"The dataset has {row_count} rows, more than the {self.XLSX_MAX_ROWS} an xlsx sheet can hold. "
+                f"Export it as csv or parquet instead."
+            )
+
+    @property
+    def content_type(self) -> str:
+        return self.FORMATS[self.file_format][0]
+
+    @property
+    def filename(self) -> str:
+        return f"{self.dataset.name}.{self.FORMATS[self.file_format][1]}"
+
+    def iter_chunks(self) -> Iterator[pd.DataFrame]:
+        """Yield the dataset's rows in chunks, converted to each column's current type."""
+        storage = get_storage(self.dataset)
+        for _, chunk in storage.iter_rows(self.columns, self.CHUNK_SIZE):
+            yield pd.DataFrame({
+                column.name: convert_chunk(chunk[column.name].where(chunk[column.name] != ''), column.current_type)
+                for column in self.columns
+            })
+
+    def write(self, fileobj: BinaryIO, progress_callback: Callable[[int], None] = None) -> int:
+        """Write the whole export to a binary file object. Returns the number of rows written."""
+        if self.file_format == 'xlsx':
+            self._build_workbook(progress_callback).save(fileobj)
+        else:
+            for data in self.iter_bytes(progress_callback):
+                fileobj.write(data)
+        return self.rows_written
+
+    def iter_bytes(self, progress_callback: Callable[[int], None] = None) -> Iterator[bytes]:
+        """Yield the export as a sequence of byte blocks, suitable for a streaming response."""
+        writers = {
+            'csv': self._iter_csv,
+            'parquet': self._iter_parquet,
+            'xlsx': self._iter_xlsx,
+        }
+        for data in writers[self.file_format](progress_callback):
+            if data:
+                yield data
+
+    def _chunks_with_progress(self, progress_callback: Callable[[int], None] = None) -> Iterator[pd.DataFrame]:
+        for chunk in self.iter_chunks():
+            yield chunk
+            self.rows_written += len(chunk)
+            if progress_callback:
+                progress_callback(self.rows_written)
+
+    def _iter_csv(self, progress_callback) -> Iterator[bytes]:
+        header = True
+        for chunk in self._chunks_with_progress(progress_callback):
+            yield chunk.to_csv(index=False, header=header).encode('utf-8')
+            header = False
+        if header:
+            yield pd.DataFrame(columns=[column.name for column in self.columns]).to_csv(index=False).encode('utf-8')
+
+    def _iter_parquet(self, progress_callback) -> Iterator[bytes]:
+        # A fixed schema keeps every row group consistent even when a chunk is all null
+        schema = pa.schema([
+            pa.field(column.name, self.ARROW_TYPES.get(column.current_type, pa.string()))
+            for column in self.columns
+        ])
+        sink = _ChunkSink()
+        with pq.ParquetWriter(sink, schema, compression='zstd') as writer:
+            for chunk in self._chunks_with_progress(progress_callback):
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+                yield sink.drain()
+        yield sink.drain()
+
+    def _iter_xlsx(self, progress_callback) -> Iterator[bytes]:
+        # The xlsx archive can only be produced once every row is written
+        with tempfile.SpooledTemporaryFile(max_size=self.SPOOL_SIZE) as buffer:
+            self._build_workbook(progress_callback).save(buffer)
+            buffer.seek(0)
+            yield from iter(lambda: buffer.read(self.SPOOL_SIZE), b'')
+
+    def _build_workbook(self, progress_callback) -> Workbook:
+        # Write-only workbooks spill rows to a temporary file instead of keeping them in memory
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet(title='Data')
+        sheet.append([column.name for column in self.columns])
+
+        try:
+            for chunk in self._chunks_with_progress(progress_callback):
+                # Checked before the export starts, but rows may have been added since
+                self.check_row_count(self.rows_written + len(chunk))
+                for row in chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None):
+                    sheet.append(list(row))
+        except BaseException:
+            # Unsaved rows stay in the sheet's temporary file, which only saving would remove
+            sheet.close()
+            sheet._writer.cleanup()
+            raise
+        return workbook
@@ -0,0 +1,83 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from data_processing.benchmarks import DatasetSpec, PipelineBenchmark, compare, parse_type_mix
+from data_processing.storage import STORAGE_BACKENDS
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark ingestion, type conversion and row page retrieval on a synthetic dataset "
+        "and write the results as JSON. Runs against the configured database and storage."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000)
+        parser.add_argument('--columns', type=int, default=10)
+        parser.add_argument(
+            '--type-mix', default='Integer=2,Float=2,Datetime=1,Boolean=1,Category=1,Text=1',
+            help="Relative weight of each column type, e.g. 'Integer=3,Text=1'."
+        )
+        parser.add_argument('--null-ratio', type=float, default=0.05)
+        parser.add_argument('--dirty-ratio', type=float, default=0.0, help="Share of values invalid for their column's type.")
+        parser.add_argument('--file-type', default='csv', choices=['csv', 'xlsx'])
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--backend', choices=list(STORAGE_BACKENDS.keys()), help="Defaults to DATASET_STORAGE_BACKEND.")
+        parser.add_argument('--rounds', type=int, default=3, help="Ingestion rounds; the median is reported.")
+        parser.add_argument('--pages', type=int, default=200, help="Row pages fetched for the latency percentiles.")
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument('--page-cache', action='store_true', help="Serve pages through the Redis page cache.")
+        parser.add_argument('--output', help="File to write the results to. Defaults to stdout.")
+        parser.add_argument('--compare', dest='baseline', help="Results file of an earlier run to compare against.")
+        parser.add_argument('--keep', action='store_true', help="Keep the benchmark datasets.")
+
+    def handle(self, *args, **options):
+        try:
+            spec = DatasetSpec(
+                rows=options['rows'],
+                columns=options['columns'],
+                type_mix=parse_type_mix(options['type_mix']),
+                null_ratio=options['null_ratio'],
+                dirty_ratio=options['dirty_ratio'],
+                file_type=options['file_type'],
+                seed=options['seed'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        if spec.rows < 1 or spec.columns < 1 or options['rounds'] < 1:
+            raise CommandError("rows, columns and rounds must be positive")
+
+        results = PipelineBenchmark(
+            spec,
+            storage_backend=options['backend'],
+            rounds=options['rounds'],
+            pages=options['pages'],
+            page_size=options['page_size'],
+            page_cache=options['page_cache'],
+            keep=options['keep'],
+        ).run()
+
+        document = json.dumps(results, indent=2, default=str)
+        if options['output']:
+            Path(options['output']).write_text(document)
+            self.stdout.write(self.style.SUCCESS(f"Wrote results to {options['output']}"))
+        else:
+            self.stdout.write(document)
+
+        benchmarks = results['benchmarks']
+        self.stderr.write(
+            f"ingest {benchmarks['ingest']['rows_per_second']:,.0f} rows/s, "
+            f"conversion {benchmarks['conversion']['values_per_second']:,.0f} values/s, "
+            f"page p50 {benchmarks['retrieval']['p50_ms']:.1f} ms / p99 {benchmarks['retrieval']['p99_ms']:.1f} ms"
+        )
+
+        if options['baseline']:
+            baseline = json.loads(Path(options['baseline']).read_text())
+            for change in compare(baseline, results):
+                style = self.style.SUCCESS if change['improved'] else self.style.WARNING
+                self.stderr.write(style(
+                    f"{change['benchmark']}.{change['metric']}: {change['baseline']:,.2f} -> "
+                    f"{change['current']:,.2f} ({change['change']:+.1%})"
+                ))
@@ -0,0 +1,64 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from data_processing.models import Dataset
+from data_processing.storage import STORAGE_BACKENDS, get_storage
+from data_processing.tasks.task_service import DataProcessingService
+
+
+class Command(BaseCommand):
+    help = "Move dataset values between storage backends, by default from the legacy EAV tables to columnar storage."
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset_ids', nargs='*', help="Datasets to migrate. Defaults to every dataset not yet on the target backend.")
+        parser.add_argument('--to', dest='target', default='COLUMNAR', choices=list(STORAGE_BACKENDS.keys()))
+        parser.add_argument('--chunk-size', type=int, default=DataProcessingService.CHUNK_SIZE)
+        parser.add_argument('--keep-source', action='store_true', help="Do not delete values from the source backend.")
+
+    def handle(self, *args, **options):
+        target_backend = options['target']
+        datasets = Dataset.objects.exclude(storage_backend=target_backend)
+        if options['dataset_ids']:
+            datasets = datasets.filter(id__in=options['dataset_ids'])
+
+        failed = 0
+        for dataset in datasets.iterator():
+            try:
+                rows = self._migrate(dataset, target_backend, options['chunk_size'], options['keep_source'])
+                self.stdout.write(self.style.SUCCESS(f"Migrated dataset {dataset.id} ({rows} rows) to {target_backend}"))
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"Failed to migrate dataset {dataset.id}: {str(e)}")
+
+        if failed:
+            raise CommandError(f"{failed} dataset(s) could not be migrated")
+
+    @staticmethod
+    def _migrate(dataset: Dataset, target_backend: str, chunk_size: int, keep_source: bool) -> int:
+        source = get_storage(dataset)
+        target = get_storage(dataset, backend=target_backend)
+        columns = list(dataset.columns.all())
+
+        # Clear anything left behind by an earlier interrupted run
+        target.delete()
+
+        try:
+            for start, chunk in source.iter_rows(columns, chunk_size):
+                target.write_chunk(start, columns, chunk)
+
+            source_rows, target_rows = source.count_rows(), target.count_rows()
+            if source_rows != target_rows:
+                raise ValueError(f"Row count mismatch after copy: {source_rows} != {target_rows}")
+        except Exception:
+            target.delete()
+            raise
+
+        dataset.storage_backend = target_backend
+        dataset.save(update_fields=['storage_backend', 'updated_at'])
+
+        for column in columns:
+            target.index_column(column)
+
+        if not keep_source:
+            source.delete()
+
+        return target_rows
@@ -0,0 +1,297 @@
+import logging
+import re
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from redis import RedisError
+
+from utils.memory import current_rss
+from utils.redis_client import RedisClient
+
+logger = logging.getLogger(__name__)
+
+_current: ContextVar[Optional['JobMetrics']] = ContextVar('job_metrics', default=None)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Attribute the time, queries and memory of the block to a stage of the running job, if any."""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+
+    metrics.enter(name)
+    try:
+        yield
+    finally:
+        metrics.exit()
+
+
+def count_rows(rows: int) -> None:
+    """Count rows handled by the current stage of the running job, if any."""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.add_rows(rows)
+
+
+def timed_iter(name: str, iterable: Iterable) -> Iterator:
+    """Yield from iterable, attributing the time spent producing each item to a stage."""
+    iterator = iter(iterable)
+    while True:
+        with stage(name):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
+class JobMetrics:
+    """
+    Per-stage wall time, rows, database queries and peak RSS of one job.
+
+    Stages nest and their times are exclusive: while a stage runs inside
+    another, only the inner one is charged, so stage times add up to the
+    job's wall time. Time outside every stage is charged to 'other'. Queries
+    are counted through a connection execute wrapper and memory by a thread
+    sampling RSS every JOB_METRICS_SAMPLE_INTERVAL seconds.
+
+    Used as a context manager around the job's work; on exit the totals are
+    added to the aggregates served on /metrics. Jobs split over several
+    tasks measure each task without recording it, then merge every task's
+    to_dict() into the metrics of the task finishing the job. Their stage
+    times add up across workers, so they can exceed the job's wall time,
+    which runs from started_at.
+    """
+
+    ROOT_STAGE = 'other'
+    STAGE_TOTALS = ('seconds', 'calls', 'rows', 'db_queries', 'db_seconds')
+
+    def __init__(self, job_type: str, record: bool = True, started_at: datetime = None):
+        self.job_type = job_type
+        self.record = record
+        self.started_at = started_at
+        self.status = None
+        self.wall_seconds = 0.0
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self._stack: List[Tuple[str, float]] = []
+        self._started = None
+        self._token = None
+        self._exit_stack = None
+        self._stop = threading.Event()
+
+    def __enter__(self) -> 'JobMetrics':
+        self._token = _current.set(self)
+        self._started = time.perf_counter()
+        if self.started_at:
+            self._started -= max((timezone.now() - self.started_at).total_seconds(), 0)
+        self.enter(self.ROOT_STAGE)
+
+        self._exit_stack = ExitStack()
+        self._exit_stack.enter_context(connection.execute_wrapper(self._track_query))
+        sampler = threading.Thread(target=self._sample, daemon=True)
+        sampler.start()
+        self._exit_stack.callback(sampler.join)
+        self._exit_stack.callback(self._stop.set)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self._exit_stack.close()
+        while self._stack:
+            self.exit()
+        _current.reset(self._token)
+
+        self.wall_seconds = time.perf_counter() - self._started
+        self.status = 'FAILED' if exc_type else 'COMPLETED'
+        if self.record:
+            JobMetricsStore.record(self)
+
+    def enter(self, name: str) -> None:
+        now = time.perf_counter()
+        if self._stack:
+            self._charge(*self._stack[-1], now)
+        self._stage(name)['calls'] += 1
+        self._stack.append((name, now))
+
+    def exit(self) -> None:
+        now = time.perf_counter()
+        self._charge(*self._stack.pop(), now)
+        if self._stack:
+            # The outer stage resumes from now
+            self._stack[-1] = (self._stack[-1][0], now)
+
+    def add_rows(self, rows: int) -> None:
+        if self._stack:
+            self._stage(self._stack[-1][0])['rows'] += rows
+
+    def merge(self, other: Optional[Dict[str, Any]]) -> 'JobMetrics':
+        """Add the stages of another task of the same job, as its to_dict()."""
+        for name, data in (other or {}).get('stages', {}).items():
+            if name not in self.stages:
+                self.stages[name] = {key: 0 for key in self.STAGE_TOTALS}
+                self.stages[name]['peak_rss_bytes'] = 0
+            merged = self.stages[name]
+            for key in self.STAGE_TOTALS:
+                merged[key] += data[key]
+            merged['peak_rss_bytes'] = max(merged['peak_rss_bytes'], data['peak_rss_bytes'])
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        stages = {}
+        for name, data in self.stages.items():
+            stages[name] = {
+                **data,
+                'seconds': round(data['seconds'], 6),
+                'db_seconds': round(data['db_seconds'], 6),
+                'rows_per_second': round(data['rows'] / data['seconds'], 2) if data['rows'] and data['seconds'] else None,
+            }
+        return {
+            'wall_seconds': round(self.wall_seconds, 6),
+            'peak_rss_bytes': max((data['peak_rss_bytes'] for data in self.stages.values()), default=0),
+            'stages': stages,
+        }
+
+    def _stage(self, name: str) -> Dict[str, Any]:
+        if name not in self.stages:
+            self.stages[name] = {
+                'seconds': 0.0, 'calls': 0, 'rows': 0, 'db_queries': 0, 'db_seconds': 0.0,
+                'peak_rss_bytes': current_rss() or 0,
+            }
+        return self.stages[name]
+
+    def _charge(self, name: str, since: float, now: float) -> None:
+        self._stage(name)['seconds'] += now - since
+
+    def _track_query(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            if self._stack:
+                data = self._stage(self._stack[-1][0])
+                data['db_queries'] += 1
+                data['db_seconds'] += time.perf_counter() - start
+
+    def _sample(self) -> None:
+        while not self._stop.wait(settings.JOB_METRICS_SAMPLE_INTERVAL):
+            rss = current_rss()
+            try:
+                name = self._stack[-1][0]
+            except IndexError:
+                continue
+            if rss:
+                data = self._stage(name)
+                data['peak_rss_bytes'] = max(data['peak_rss_bytes'], rss)
+
+
+class JobMetricsStore:
+    """
+    Aggregate job metrics shared by every worker in one Redis hash, rendered
+    in the Prometheus text exposition format. Each field is a sample name
+    with its labels, holding a counter or a histogram bucket.
+
+    Redis errors are logged; metrics never fail a job or a scrape.
+    """
+
+    KEY = 'job-metrics'
+    METRICS = {
+        'dataalchemy_jobs_total': ('counter', 'Processing jobs finished, by type and status.'),
+        'dataalchemy_job_duration_seconds': ('histogram', 'Wall time of processing jobs.'),
+        'dataalchemy_job_stage_seconds': ('histogram', 'Time spent in each stage of a processing job.'),
+        'dataalchemy_job_stage_rows_total': ('counter', 'Rows handled in each stage.'),
+        'dataalchemy_job_stage_db_queries_total': ('counter', 'Database queries run in each stage.'),
+        'dataalchemy_job_stage_db_seconds_total': ('counter', 'Time spent in database queries in each stage.'),
+        'dataalchemy_inference_cache_lookups_total': (
+            'counter', 'Column fingerprints looked up in the inference cache, by result; stale hits are evicted.'
+        ),
+    }
+    SAMPLE_PATTERN = re.compile(r'^(?P<name>[a-z_]+?)(?:_bucket|_sum|_count)?\{')
+
+    @classmethod
+    def record(cls, metrics: JobMetrics) -> None:
+        job = {'job_type': metrics.job_type}
+        try:
+            pipe = RedisClient().pipeline()
+            pipe.hincrbyfloat(cls.KEY, cls._sample('dataalchemy_jobs_total', {**job, 'status': metrics.status}), 1)
+            cls._observe(pipe, 'dataalchemy_job_duration_seconds', job, metrics.wall_seconds)
+            for name, data in metrics.stages.items():
+                labels = {**job, 'stage': name}
+                cls._observe(pipe, 'dataalchemy_job_stage_seconds', labels, data['seconds'])
+                pipe.hincrbyfloat(cls.KEY, cls._sample('dataalchemy_job_stage_rows_total', labels), data['rows'])
+                pipe.hincrbyfloat(cls.KEY, cls._sample('dataalchemy_job_stage_db_queries_total', labels), data['db_queries'])
+                pipe.hincrbyfloat(cls.KEY, cls._sample('dataalchemy_job_stage_db_seconds_total', labels), data['db_seconds'])
+            pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Could not record metrics of a {metrics.job_type} job: {str(e)}")
+
+    @classmethod
+    def count(cls, name: str, labels: Dict[str, str], value: float = 1) -> None:
+        """Add to a counter that is not tied to a job."""
+        try:
+            RedisClient().redis.hincrbyfloat(cls.KEY, cls._sample(name, labels), value)
+        except RedisError as e:
+            logger.warning(f"Could not record metric {name}: {str(e)}")
+
+    @classmethod
+    def render(cls) -> str:
+        """Every aggregate in the Prometheus text exposition format."""
+        try:
+            values = RedisClient().redis.hgetall(cls.KEY)
+        except RedisError as e:
+            logger.warning(f"Could not read job metrics: {str(e)}")
+            values = {}
+
+        samples: Dict[str, List[Tuple[str, str]]] = {name: [] for name in cls.METRICS}
+        for field, value in values.items():
+            field = field.decode()
+            match = cls.SAMPLE_PATTERN.match(field)
+            if match and match.group('name') in samples:
+                samples[match.group('name')].append((field, value.decode()))
+
+        lines = []
+        for name, (metric_type, description) in cls.METRICS.items():
+            lines.append(f'# HELP {name} {description}')
+            lines.append(f'# TYPE {name} {metric_type}')
+            lines.extend(f'{field} {value}' for field, value in sorted(samples[name], key=cls._sort_key))
+        return '\n'.join(lines) + '\n'
+
+    @classmethod
+    def _observe(cls, pipe, name: str, labels: Dict[str, str], value: float) -> None:
+        # Every bucket is written, so a series always has all of them
+        for bound in settings.JOB_METRICS_BUCKETS:
+            pipe.hincrbyfloat(
+                cls.KEY, cls._sample(f'{name}_bucket', {**labels, 'le': cls._format(bound)}), int(value <= bound)
+            )
+        pipe.hincrbyfloat(cls.KEY, cls._sample(f'{name}_bucket', {**labels, 'le': '+Inf'}), 1)
+        pipe.hincrbyfloat(cls.KEY, cls._sample(f'{name}_sum', labels), value)
+        pipe.hincrbyfloat(cls.KEY, cls._sample(f'{name}_count', labels), 1)
+
+    @staticmethod
+    def _sample(name: str, labels: Dict[str, str]) -> str:
+        label_text = ','.join(
+            '{}="{}"'.format(key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+            for key, value in labels.items()
+        )
+        return f'{name}{{{label_text}}}'
+
+    @staticmethod
+    def _format(bound: float) -> str:
+        return f'{bound:g}'
+
+    @staticmethod
+    def _sort_key(sample: Tuple[str, str]) -> Tuple:
+        # Buckets of a series sort by their numeric bound, +Inf last
+        field = sample[0]
+        match = re.search(r',?le="([^"]+)"', field)
+        if not match:
+            return field, 0.0
+        bound = float('inf') if match.group(1) == '+Inf' else float(match.group(1))
+        return field[:match.start()] + field[match.end():], bound
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-16 23:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_processing', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataset',
+            name='storage_backend',
+            field=models.CharField(choices=[('EAV', 'EAV (legacy)'), ('COLUMNAR', 'Columnar')], default='EAV', max_length=20),
+        ),
+    ]
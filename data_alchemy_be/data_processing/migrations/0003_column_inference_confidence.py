@@ -0,0 +1,23 @@
+# Generated by Django 5.0.1 on 2026-10-16 23:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_processing', '0002_dataset_storage_backend'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='column',
+            name='inference_confidence',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='processingjob',
+            name='job_type',
+            field=models.CharField(choices=[('INFERENCE', 'Type Inference'), ('EXPORT', 'Data Export'), ('CONVERSION', 'Type Conversion'), ('VALIDATION', 'Type Validation')], max_length=20),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.1 on 2026-10-16 23:21
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # RowValue can hold tens of millions of rows; build the index without blocking writes
+    atomic = False
+
+    dependencies = [
+        ('data_processing', '0003_column_inference_confidence'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='rowvalue',
+            index=models.Index(fields=['column', 'id'], name='rowvalue_column_id_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.1 on 2026-10-16 23:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_processing', '0004_rowvalue_column_id_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ColumnProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_count', models.IntegerField(default=0)),
+                ('null_count', models.IntegerField(default=0)),
+                ('distinct_count', models.IntegerField(default=0)),
+                ('min_value', models.TextField(blank=True)),
+                ('max_value', models.TextField(blank=True)),
+                ('parse_counts', models.JSONField(default=dict)),
+                ('top_values', models.JSONField(default=list)),
+                ('top_values_exact', models.BooleanField(default=True)),
+                ('sketches', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('column', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='profile', to='data_processing.column')),
+            ],
+        ),
+    ]
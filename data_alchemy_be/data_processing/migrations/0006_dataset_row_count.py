@@ -0,0 +1,33 @@
+# Generated by Django 5.0.1 on 2026-10-16 23:27
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_row_count(apps, schema_editor):
+    # Columnar datasets read their count from Parquet metadata and are left unset
+    Dataset = apps.get_model('data_processing', 'Dataset')
+    ingested = Dataset.objects.filter(
+        storage_backend='EAV',
+        jobs__job_type='INFERENCE',
+        jobs__status='COMPLETED'
+    ).annotate(total_rows=Count('rows', distinct=True))
+
+    for dataset in ingested:
+        Dataset.objects.filter(id=dataset.id).update(row_count=dataset.total_rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_processing', '0005_column_profile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataset',
+            name='row_count',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_row_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-16 23:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_processing', '0006_dataset_row_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='processingjob',
+            name='checkpoint',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
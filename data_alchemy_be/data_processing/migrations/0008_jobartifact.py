@@ -0,0 +1,28 @@
+# Generated by Django 5.0.1 on 2026-10-17 00:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_processing', '0007_processingjob_checkpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobArtifact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('PSTATS', 'cProfile statistics'), ('COLLAPSED_STACKS', 'Collapsed stacks')], max_length=20)),
+                ('file', models.FileField(upload_to='job_artifacts/')),
+                ('size', models.BigIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='artifacts', to='data_processing.processingjob')),
+            ],
+            options={
+                'ordering': ['created_at'],
+            },
+        ),
+    ]
@@ -12,6 +12,15 @@ class Dataset(models.Model):
     name = models.CharField(max_length=255)
     file = models.FileField(validators=[FileExtensionValidator(allowed_extensions=['csv', 'xlsx', 'xls'])])
     file_type = models.CharField(max_length=10, choices=[('CSV', 'CSV'), ('EXCEL', 'Excel')])
+    storage_backend = models.CharField(
+        max_length=20,
+        choices=[('EAV', 'EAV (legacy)'), ('COLUMNAR', 'Columnar')],
+        default='EAV'
+    )
+    # Set once ingestion has stored every row, so pages never count rows
+    row_count = models.IntegerField(null=True, blank=True)
+    # SHA-256 of the uploaded file, to find earlier uploads of the same content
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -41,12 +50,41 @@ class Column(models.Model):
     position = models.IntegerField()
     inferred_type = models.CharField(max_length=20, choices=DATA_TYPES)
     current_type = models.CharField(max_length=20, choices=DATA_TYPES)
+    # Set when the type was inferred from a sample; 1.0 once validated against every value
+    inference_confidence = models.FloatField(null=True, blank=True)
 
     class Meta:
         ordering = ['position']
         unique_together = ['dataset', 'name']
 
 
+class ColumnProfile(models.Model):
+    """
+    Statistics of a column's stored values, computed while the values are
+    written so type conversion checks do not need to scan the column.
+    """
+    column = models.OneToOneField(Column, on_delete=models.CASCADE, related_name='profile')
+    total_count = models.IntegerField(default=0)
+    null_count = models.IntegerField(default=0)
+    # HyperLogLog estimate, about 1.6% standard error
+    distinct_count = models.IntegerField(default=0)
+    min_value = models.TextField(blank=True)
+    max_value = models.TextField(blank=True)
+    # Number of non-null values convertible to each type; a null count means
+    # the type was ruled out and counting stopped
+    parse_counts = models.JSONField(default=dict)
+    # [value, count] pairs, most frequent first; exact while top_values_exact
+    top_values = models.JSONField(default=list)
+    top_values_exact = models.BooleanField(default=True)
+    # Serialized sketches, kept so profiles of column parts can be merged
+    sketches = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def non_null_count(self) -> int:
+        return self.total_count - self.null_count
+
+
 class ProcessingJob(models.Model):
     """
     Model to track background processing jobs.
@@ -55,6 +93,7 @@ class ProcessingJob(models.Model):
         ('INFERENCE', 'Type Inference'),
         ('EXPORT', 'Data Export'),
         ('CONVERSION', 'Type Conversion'),
+        ('VALIDATION', 'Type Validation'),
     ]
 
     STATUS_CHOICES = [
@@ -71,6 +110,8 @@ class ProcessingJob(models.Model):
     celery_task_id = models.CharField(max_length=255, blank=True)
     error_message = models.TextField(blank=True)
     result = models.JSONField(null=True, blank=True)
+    # Progress committed so far, from which a retried or resumed job continues
+    checkpoint = models.JSONField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     started_at = models.DateTimeField(null=True, blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
@@ -83,6 +124,26 @@ class ProcessingJob(models.Model):
     def __str__(self):
         return f"{self.dataset.name} - {self.job_type} ({self.status})"
 
+
+class JobArtifact(models.Model):
+    """
+    File produced alongside a processing job, such as the profile of a job
+    that ran with profiling on.
+    """
+    KINDS = [
+        ('PSTATS', 'cProfile statistics'),
+        ('COLLAPSED_STACKS', 'Collapsed stacks'),
+    ]
+
+    job = models.ForeignKey(ProcessingJob, on_delete=models.CASCADE, related_name='artifacts')
+    kind = models.CharField(max_length=20, choices=KINDS)
+    file = models.FileField(upload_to='job_artifacts/')
+    size = models.BigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['created_at']
+
 class DatasetRow(models.Model):
     """
     Model to store information about each row in the dataset.
@@ -104,4 +165,10 @@ class RowValue(models.Model):
     column = models.ForeignKey(Column, on_delete=models.CASCADE, related_name='row_values')
     value = models.TextField()  # Store the value as text for flexibility across data types
 
+    class Meta:
+        # Lets full-column scans walk a column in id order as index range scans
+        indexes = [
+            models.Index(fields=['column', 'id'], name='rowvalue_column_id_idx'),
+        ]
+
 
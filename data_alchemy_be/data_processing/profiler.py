@@ -0,0 +1,112 @@
+import cProfile
+import logging
+import marshal
+import sys
+import threading
+from collections import Counter
+from contextlib import nullcontext
+from typing import ContextManager, Optional
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+
+from data_processing.models import JobArtifact, ProcessingJob
+
+logger = logging.getLogger(__name__)
+
+
+class SamplingProfiler:
+    """
+    Samples the stack of one thread every PROFILER_SAMPLE_INTERVAL seconds
+    from a background thread and counts identical stacks. Only the sampler
+    does any work, so the profiled code runs at full speed.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples = Counter()
+        self._thread_id = None
+        self._stop = threading.Event()
+        self._sampler = None
+
+    def start(self) -> None:
+        self._thread_id = threading.get_ident()
+        self._sampler = threading.Thread(target=self._sample, daemon=True)
+        self._sampler.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._sampler.join()
+
+    def collapsed(self) -> str:
+        """Stacks in the collapsed format read by flamegraph.pl and speedscope: 'outer;inner count' lines."""
+        return ''.join(f'{stack} {count}\n' for stack, count in self.samples.most_common())
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{frame.f_globals.get('__name__', '?')}:{getattr(code, 'co_qualname', code.co_name)}")
+                frame = frame.f_back
+            if stack:
+                self.samples[';'.join(reversed(stack))] += 1
+
+
+class JobProfiler:
+    """
+    Profiles the block it wraps and stores the profile as an artifact of a
+    job, whether the block succeeds or fails.
+
+    'sampling' stores collapsed stacks for a flame graph at little cost;
+    'cprofile' traces every call and stores pstats, exact but several times
+    slower. Only the calling thread is profiled, not inference pool workers.
+    """
+
+    MODES = ('sampling', 'cprofile')
+
+    def __init__(self, job: ProcessingJob, mode: str):
+        if mode not in self.MODES:
+            raise ValueError(f"Unsupported profiler: {mode}. Must be one of: {', '.join(self.MODES)}")
+        self.job = job
+        self.mode = mode
+        self._profiler = None
+
+    @classmethod
+    def for_job(cls, job: ProcessingJob, mode: Optional[str] = None) -> ContextManager:
+        """Profiler for a job with the requested mode, else PROFILER_MODE; a no-op when both are unset."""
+        mode = mode or settings.PROFILER_MODE
+        return cls(job, mode) if mode else nullcontext()
+
+    def __enter__(self) -> 'JobProfiler':
+        if self.mode == 'cprofile':
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        else:
+            self._profiler = SamplingProfiler(settings.PROFILER_SAMPLE_INTERVAL)
+            self._profiler.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self.mode == 'cprofile':
+            self._profiler.disable()
+        else:
+            self._profiler.stop()
+
+        try:
+            self._save()
+        except Exception as e:
+            logger.warning(f"Could not store the profile of job {self.job.id}: {str(e)}")
+
+    def _save(self) -> None:
+        if self.mode == 'cprofile':
+            # The format pstats.Stats loads, as written by Profile.dump_stats
+            self._profiler.create_stats()
+            kind, name, content = 'PSTATS', f'{self.job.id}.prof', marshal.dumps(self._profiler.stats)
+        else:
+            kind, name, content = 'COLLAPSED_STACKS', f'{self.job.id}.folded', self._profiler.collapsed().encode()
+
+        artifact = JobArtifact(job=self.job, kind=kind, size=len(content))
+        artifact.file.save(name, ContentFile(content), save=False)
+        artifact.save()
@@ -0,0 +1,131 @@
+import json
+import logging
+import time
+from typing import Any, AsyncIterator, Dict
+
+import redis.asyncio
+from asgiref.sync import sync_to_async
+from celery import states
+from celery.result import AsyncResult
+from django.conf import settings
+from redis import RedisError
+
+from data_processing.metrics import stage
+from utils.redis_client import RedisClient
+
+logger = logging.getLogger(__name__)
+
+
+class TaskProgress:
+    """
+    Progress of background tasks, recorded in the Celery result backend and
+    pushed to subscribers over Redis pub/sub as {'status', 'result'} events,
+    the shape of the backend's own task meta.
+
+    Progress of a task id is reported at most TASK_PROGRESS_MAX_RATE times a
+    second, across every process reporting it; updates in between are
+    dropped, since each one supersedes the last. Outcomes are always
+    published. Redis errors are logged and never fail a task.
+    """
+
+    CHANNEL = 'task-progress:{task_id}'
+    THROTTLE_KEY = 'task-progress-throttle:{task_id}'
+
+    # When each task id last reported progress from this process
+    _last_reported: Dict[str, float] = {}
+
+    @classmethod
+    def report(cls, task, meta: Dict[str, Any], task_id: str = None) -> None:
+        """Record and publish the progress of a task, unless it reported too recently."""
+        task_id = task_id or task.request.id
+        with stage('progress'):
+            if not cls._acquire(task_id):
+                return
+
+            task.update_state(task_id=task_id, state='PROGRESS', meta=meta)
+            cls.publish(task_id, 'PROGRESS', meta)
+
+    @classmethod
+    def publish(cls, task_id: str, status: str, result: Any) -> None:
+        """Publish an event to the subscribers of a task id."""
+        if status in states.READY_STATES:
+            cls._last_reported.pop(task_id, None)
+        try:
+            RedisClient().redis.publish(
+                cls.CHANNEL.format(task_id=task_id),
+                json.dumps({'status': status, 'result': result}, default=str)
+            )
+        except RedisError as e:
+            logger.warning(f"Could not publish progress of task {task_id}: {str(e)}")
+
+    @classmethod
+    async def stream(cls, task_id: str) -> AsyncIterator[str]:
+        """
+        Server-sent events of a task: its current state, then every published
+        event until it finishes. While no event arrives a comment is sent
+        every TASK_PROGRESS_HEARTBEAT seconds and the result backend checked,
+        so outcomes that were never published still end the stream.
+        """
+        client = redis.asyncio.Redis.from_url(settings.CELERY_BROKER_URL)
+        pubsub = client.pubsub()
+        try:
+            # Subscribe before reading the current state so no event falls in between
+            await pubsub.subscribe(cls.CHANNEL.format(task_id=task_id))
+            yield f"retry: {settings.TASK_PROGRESS_HEARTBEAT * 1000}\n\n"
+
+            event = await cls._current(task_id)
+            yield cls._format(event)
+            while event['status'] not in states.READY_STATES:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True,
+                    timeout=settings.TASK_PROGRESS_HEARTBEAT
+                )
+                if message is not None:
+                    event = json.loads(message['data'])
+                    yield cls._format(event)
+                    continue
+
+                current = await cls._current(task_id)
+                if current['status'] in states.READY_STATES:
+                    event = current
+                    yield cls._format(event)
+                else:
+                    yield ": keep-alive\n\n"
+        finally:
+            await pubsub.aclose()
+            await client.aclose()
+
+    @classmethod
+    def _acquire(cls, task_id: str) -> bool:
+        interval = 1 / settings.TASK_PROGRESS_MAX_RATE
+        now = time.monotonic()
+        if now - cls._last_reported.get(task_id, float('-inf')) < interval:
+            return False
+        cls._last_reported[task_id] = now
+
+        # Parts of a chord report the same task id from several workers
+        try:
+            return bool(RedisClient().redis.set(
+                cls.THROTTLE_KEY.format(task_id=task_id), 1, nx=True, px=max(int(interval * 1000), 1)
+            ))
+        except RedisError as e:
+            logger.warning(f"Could not throttle progress of task {task_id}: {str(e)}")
+            return True
+
+    @classmethod
+    async def _current(cls, task_id: str) -> Dict[str, Any]:
+        return await sync_to_async(cls._read_state)(task_id)
+
+    @staticmethod
+    def _read_state(task_id: str) -> Dict[str, Any]:
+        """The state of a task as the configured result backend records it."""
+        task = AsyncResult(task_id)
+        status, result = task.state, task.info
+        # Failures hold the exception, published as its message
+        if isinstance(result, BaseException):
+            result = str(result)
+        return {'status': status, 'result': result}
+
+    @staticmethod
+    def _format(event: Dict[str, Any]) -> str:
+        return f"data: {json.dumps(event, default=str)}\n\n"
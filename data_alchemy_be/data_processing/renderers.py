@@ -0,0 +1,130 @@
+import gzip
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+import msgpack
+import pyarrow as pa
+from django.utils.cache import patch_vary_headers
+from rest_framework.renderers import BaseRenderer
+
+
+class CompressedRenderer(BaseRenderer):
+    """
+    Base for binary renderers of the APIResponse envelope. Bodies above
+    MIN_COMPRESS_SIZE are compressed with the best encoding the client
+    accepts, zstd before gzip, and labelled with Content-Encoding.
+    """
+
+    charset = None
+    MIN_COMPRESS_SIZE = 1024
+    GZIP_LEVEL = 6
+
+    def render(self, data, accepted_media_type=None, renderer_context=None) -> bytes:
+        body = self.render_body(data or {})
+        return self.compress(body, renderer_context or {})
+
+    def render_body(self, data: Dict[str, Any]) -> bytes:
+        raise NotImplementedError
+
+    def compress(self, body: bytes, renderer_context: Dict[str, Any]) -> bytes:
+        request = renderer_context.get('request')
+        response = renderer_context.get('response')
+        if request is None or response is None:
+            return body
+
+        patch_vary_headers(response, ['Accept-Encoding'])
+        if len(body) < self.MIN_COMPRESS_SIZE:
+            return body
+
+        accepted = {
+            token.split(';')[0].strip().lower()
+            for token in request.META.get('HTTP_ACCEPT_ENCODING', '').split(',')
+        }
+        if 'zstd' in accepted:
+            response['Content-Encoding'] = 'zstd'
+            return pa.compress(body, codec='zstd', asbytes=True)
+        if 'gzip' in accepted:
+            response['Content-Encoding'] = 'gzip'
+            return gzip.compress(body, compresslevel=self.GZIP_LEVEL)
+        return body
+
+    @staticmethod
+    def split_rows(data: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str], Optional[List[Dict[str, Any]]]]:
+        """
+        Separate a page's rows from the envelope, with column names in column
+        order. Rows are None for envelopes without rows, such as errors.
+        """
+        payload = data.get('data')
+        if not isinstance(payload, dict) or 'rows' not in payload:
+            return data, [], None
+
+        rows = payload['rows']
+        names = [column['name'] for column in payload.get('columns', [])]
+        envelope = {**data, 'data': {key: value for key, value in payload.items() if key != 'rows'}}
+        return envelope, names, rows
+
+
+class ArrowIPCRenderer(CompressedRenderer):
+    """
+    Renders a page of rows as an Arrow IPC stream with one string column per
+    dataset column. The rest of the envelope travels as JSON in the schema
+    metadata under 'envelope', and each field carries its column's type.
+    """
+
+    media_type = 'application/vnd.apache.arrow.stream'
+    format = 'arrow'
+
+    def render_body(self, data: Dict[str, Any]) -> bytes:
+        envelope, names, rows = self.split_rows(data)
+        column_types = {
+            column['name']: column.get('customUserType') or ''
+            for column in envelope.get('data', {}).get('columns', [])
+        }
+
+        schema = pa.schema(
+            [pa.field(name, pa.string(), metadata={'type': column_types.get(name, '')}) for name in names],
+            metadata={'envelope': json.dumps(envelope, default=str)}
+        )
+        table = pa.table(
+            [pa.array([row.get(name) for row in rows or []], type=pa.string()) for name in names],
+            schema=schema
+        )
+
+        # Buffers are left uncompressed so every Arrow reader can open the
+        # stream; the body as a whole is compressed by Content-Encoding
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+
+class MessagePackRenderer(CompressedRenderer):
+    """
+    Renders the envelope as MessagePack with rows turned into column arrays:
+    data.rows becomes {'columns': [names], 'values': [[values of a column], ...]}.
+    """
+
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+
+    def render_body(self, data: Dict[str, Any]) -> bytes:
+        envelope, names, rows = self.split_rows(data)
+        if rows is not None:
+            envelope['data']['rows'] = {
+                'columns': names,
+                'values': [[row.get(name) for row in rows] for name in names],
+            }
+        return msgpack.packb(envelope, default=str, use_bin_type=True)
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Lets progress streams be negotiated. Streams bypass rendering; an
+    envelope returned instead, such as an error, becomes a single event.
+    """
+
+    media_type = 'text/event-stream'
+    format = 'sse'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None) -> bytes:
+        return f"data: {json.dumps(data or {}, default=str)}\n\n".encode()
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Dataset, Column, ProcessingJob, DatasetRow
+from .models import Dataset, Column, JobArtifact, ProcessingJob, DatasetRow
 
 
 class ColumnSerializer(serializers.ModelSerializer):
@@ -27,16 +27,28 @@ class ColumnSerializer(serializers.ModelSerializer):
         return value
 
 
+class JobArtifactSerializer(serializers.ModelSerializer):
+    """
+    Serializer for JobArtifact model, without the file itself.
+    """
+
+    class Meta:
+        model = JobArtifact
+        fields = ['id', 'kind', 'size', 'created_at']
+        read_only_fields = fields
+
+
 class ProcessingJobSerializer(serializers.ModelSerializer):
     """
     Serializer for ProcessingJob model.
     """
+    artifacts = JobArtifactSerializer(many=True, read_only=True)
 
     class Meta:
         model = ProcessingJob
         fields = [
-            'id', 'job_type', 'status', 'error_message', 'started_at',
-            'completed_at', 'created_at'
+            'id', 'job_type', 'status', 'error_message', 'result', 'started_at',
+            'completed_at', 'created_at', 'artifacts'
         ]
         read_only_fields = fields
 
@@ -123,10 +135,11 @@ class DatasetColumnSerializer(serializers.ModelSerializer):
     columnIndex = serializers.IntegerField(source='position')
     inferredType = serializers.CharField(source='inferred_type')
     customUserType = serializers.CharField(source='current_type')
+    inferenceConfidence = serializers.FloatField(source='inference_confidence')
 
     class Meta:
         model = Column
-        fields = ['id', 'name', 'columnIndex', 'inferredType', 'customUserType']
+        fields = ['id', 'name', 'columnIndex', 'inferredType', 'customUserType', 'inferenceConfidence']
 
 
 class DatasetRowsSerializer(serializers.ModelSerializer):
@@ -140,5 +153,6 @@ class DatasetRowsSerializer(serializers.ModelSerializer):
     def get_values(self, obj):
         return {
             value.column.name: value.value
-            for value in obj.values.select_related('column').all()
+            # all() reuses prefetch_related('values__column') instead of querying per row
+            for value in obj.values.all()
         }
\ No newline at end of file
@@ -0,0 +1,43 @@
+import shutil
+from pathlib import Path
+
+from celery import states
+from celery.signals import task_postrun
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .cache import DatasetPageCache
+from .models import Dataset, Column, JobArtifact
+from .progress import TaskProgress
+from .storage import EAVStorage, get_storage
+
+
+@receiver(post_delete, sender=Dataset)
+def delete_dataset_storage(sender, instance: Dataset, **kwargs):
+    """Remove stored values that live outside the dataset's own tables."""
+    transaction.on_commit(lambda: get_storage(instance).delete())
+    transaction.on_commit(lambda: DatasetPageCache.invalidate(instance.id))
+    transaction.on_commit(
+        lambda: shutil.rmtree(Path(settings.DATASET_EXPORT_ROOT) / str(instance.id), ignore_errors=True)
+    )
+
+
+@receiver(post_delete, sender=Column)
+def drop_column_index(sender, instance: Column, **kwargs):
+    """Drop the typed index an EAV column may have on the shared RowValue table."""
+    transaction.on_commit(lambda: EAVStorage.drop_column_index(instance))
+
+
+@receiver(post_delete, sender=JobArtifact)
+def delete_artifact_file(sender, instance: JobArtifact, **kwargs):
+    """Remove the file of a deleted job artifact, including artifacts of deleted datasets."""
+    transaction.on_commit(lambda: instance.file.delete(save=False))
+
+
+@task_postrun.connect
+def publish_task_outcome(sender=None, task_id=None, retval=None, state=None, **kwargs):
+    """Push the outcome of a finished task to clients streaming its progress."""
+    if state in states.READY_STATES:
+        TaskProgress.publish(task_id, state, retval if state == states.SUCCESS else str(retval))
@@ -0,0 +1,17 @@
+from data_processing.models import Dataset
+from data_processing.storage.base import DatasetStorage
+from data_processing.storage.columnar import ColumnarStorage
+from data_processing.storage.eav import EAVStorage
+
+STORAGE_BACKENDS = {
+    'EAV': EAVStorage,
+    'COLUMNAR': ColumnarStorage,
+}
+
+
+def get_storage(dataset: Dataset, backend: str = None) -> DatasetStorage:
+    """Return the storage backend holding a dataset's values."""
+    return STORAGE_BACKENDS[backend or dataset.storage_backend](dataset)
+
+
+__all__ = ('DatasetStorage', 'EAVStorage', 'ColumnarStorage', 'STORAGE_BACKENDS', 'get_storage')
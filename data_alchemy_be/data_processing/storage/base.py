@@ -0,0 +1,163 @@
+from abc import ABC, abstractmethod
+from typing import Callable, ContextManager, Dict, Iterator, List, Optional, Tuple, Any
+
+import numpy as np
+import pandas as pd
+
+from data_processing.models import Dataset, Column
+from data_processing.storage.query import RowQuery
+
+
+class DatasetStorage(ABC):
+    """
+    Interface for persisting and reading the cell values of a dataset.
+
+    Values cross this interface as text, the representation the API has always
+    exposed: nulls are read back as empty strings. Column batches are DataFrames
+    indexed by a backend specific key with 'row_index' and 'value' columns.
+    """
+
+    def __init__(self, dataset: Dataset):
+        self.dataset = dataset
+
+    @abstractmethod
+    def write_chunk(self, start_row: int, columns: List[Column], chunk: pd.DataFrame) -> None:
+        """Persist a chunk of rows starting at start_row. Chunk columns are labelled by column name."""
+
+    def create_rows(self, total_rows: int) -> None:
+        """
+        Prepare total_rows empty rows whose values are then written part by
+        part with write_columns. Backends without row records do nothing.
+        """
+
+    def write_columns(self, start_row: int, columns: List[Column], chunk: pd.DataFrame) -> None:
+        """
+        Persist the values of some columns for rows prepared by create_rows.
+        Parts of different columns may be written concurrently.
+        """
+        self.write_chunk(start_row, columns, chunk)
+
+    @abstractmethod
+    def delete_rows_from(self, start_row: int) -> None:
+        """
+        Remove every stored row from start_row on, so an interrupted ingestion
+        can write them again. start_row falls on a chunk boundary.
+        """
+
+    @abstractmethod
+    def count_rows(self) -> int:
+        """Return the number of stored rows."""
+
+    @abstractmethod
+    def read_rows(self, columns: List[Column], offset: int, limit: int) -> List[Dict[str, Any]]:
+        """Return one {column name: value} dict per row, ordered by row index."""
+
+    @abstractmethod
+    def query_rows(
+            self,
+            columns: List[Column],
+            query: RowQuery,
+            limit: int
+    ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Return up to limit rows matching the query's filters, in its order and
+        after its keyset position, with the position to continue from when
+        more rows match (None otherwise).
+        """
+
+    def index_column(self, column: Column) -> None:
+        """
+        Prepare a column to be filtered and sorted by its current_type. Called
+        whenever a column's type is set; backends without indexes do nothing.
+        """
+
+    @abstractmethod
+    def iter_rows(self, columns: List[Column], chunk_size: int) -> Iterator[Tuple[int, pd.DataFrame]]:
+        """Yield (start_row, chunk) pairs covering every stored row in order."""
+
+    @abstractmethod
+    def iter_column(self, column: Column, batch_size: int) -> Iterator[pd.DataFrame]:
+        """Yield batches of a column's values for a full scan."""
+
+    @abstractmethod
+    def update_column(self, column: Column, values: pd.Series) -> None:
+        """
+        Overwrite values of a column, rendered as text. The series is indexed
+        by the keys of an iter_column batch.
+        """
+
+    @abstractmethod
+    def rewrite_column(self, column: Column) -> ContextManager[Callable[[pd.Series], None]]:
+        """
+        Context manager yielding a writer that takes the same series as
+        update_column. Written values only become visible if the block exits
+        cleanly; raising inside it discards them.
+        """
+
+    @abstractmethod
+    def iter_column_range(
+            self,
+            column: Column,
+            start_row: int,
+            stop_row: Optional[int],
+            batch_size: int
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Yield batches of a column's values for the rows from start_row up to
+        stop_row (the end when None). Backends storing rows in parts yield the
+        whole parts that begin in the range, so ranges that partition the rows
+        still yield every value exactly once.
+        """
+
+    @abstractmethod
+    def open_stage(self, column: Column, stage: str) -> None:
+        """Create an empty named stage for new values of a column."""
+
+    @abstractmethod
+    def stage_writer(self, column: Column, stage: str) -> Callable[[pd.Series], None]:
+        """
+        Writer taking the same series as update_column, in whole
+        iter_column_range batches. Several processes may write disjoint
+        ranges to the same stage; nothing is visible until commit_stage.
+        """
+
+    @abstractmethod
+    def commit_stage(self, column: Column, stage: str) -> None:
+        """Atomically replace the column's values with everything written to the stage."""
+
+    @abstractmethod
+    def discard_stage(self, column: Column, stage: str) -> None:
+        """Drop a stage and the values written to it."""
+
+    def copy_from(self, source: 'DatasetStorage', columns: List[Tuple[Column, Column]], chunk_size: int) -> None:
+        """
+        Store a copy of every row of another dataset. columns pairs each
+        source column with the column of this dataset receiving its values.
+        Rows are read back and written in chunks of chunk_size rows; backends
+        override this to copy within their own storage instead.
+        """
+        source_columns = [source_column for source_column, _ in columns]
+        names = {source_column.name: column.name for source_column, column in columns}
+        for start_row, chunk in source.iter_rows(source_columns, chunk_size):
+            self.write_chunk(start_row, [column for _, column in columns], chunk.rename(columns=names))
+
+    @abstractmethod
+    def delete(self) -> None:
+        """Remove all stored values of the dataset."""
+
+    @staticmethod
+    def to_text(series: pd.Series) -> pd.Series:
+        """
+        Render values as text, with nulls as empty strings and booleans as
+        'true'/'false', the text ConversionEngine renders them to.
+        """
+        mask = series.isna()
+        values = series.astype(object)
+        text = values.astype(str)
+
+        booleans = text.isin(('True', 'False'))
+        if booleans.any():
+            booleans &= values.map(lambda value: isinstance(value, (bool, np.bool_)))
+            text[booleans] = text[booleans].str.lower()
+        text[mask] = ''
+        return text
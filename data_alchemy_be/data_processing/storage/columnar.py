@@ -0,0 +1,471 @@
+import bisect
+import logging
+import os
+import shutil
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple, Any
+from uuid import uuid4
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from django.conf import settings
+
+from data_processing.models import Column
+from data_processing.storage.base import DatasetStorage
+from data_processing.storage.query import COMPARISONS, SORTABLE_TYPES, RowQuery, typed_keys, typed_value
+
+logger = logging.getLogger(__name__)
+
+
+class KeyRange(NamedTuple):
+    """Statistics of a key part: smallest and largest key (None without any) and null count."""
+    low: Any
+    high: Any
+    nulls: int
+
+
+class ColumnarStorage(DatasetStorage):
+    """
+    Stores each column as a sequence of Parquet parts, one per ingestion chunk:
+    DATASET_STORAGE_ROOT/<dataset id>/<column id>/part-<start row>.parquet
+
+    Parts of every column share the same row boundaries. Column batches are
+    keyed by row index.
+
+    Committed stages become versions of a column, <column id>/v-<id>/, and
+    the CURRENT file in the column directory names the version readers use.
+
+    Typed columns get a key part next to each part, key-<start row>.parquet,
+    holding the part's typed keys with their min/max statistics.
+    """
+
+    PART_PREFIX = 'part-'
+    KEY_PREFIX = 'key-'
+    VERSION_PREFIX = 'v-'
+    VERSION_POINTER = 'CURRENT'
+    # Arrow types of typed keys; other sortable types compare as text
+    KEY_TYPES = {'Integer': pa.int64(), 'Float': pa.float64()}
+
+    def __init__(self, dataset):
+        super().__init__(dataset)
+        self.root = Path(settings.DATASET_STORAGE_ROOT) / str(dataset.id)
+
+    def write_chunk(self, start_row: int, columns: List[Column], chunk: pd.DataFrame) -> None:
+        for column in columns:
+            self._write_part(self._part_path(column, start_row), self.to_text(chunk[column.name]))
+
+    def delete_rows_from(self, start_row: int) -> None:
+        for column in self.dataset.columns.all():
+            for start, path in self._parts(column):
+                if start >= start_row:
+                    path.unlink(missing_ok=True)
+                    self._key_path(path).unlink(missing_ok=True)
+
+    def count_rows(self) -> int:
+        column = self.dataset.columns.first()
+        parts = self._parts(column) if column else []
+        if not parts:
+            return 0
+
+        start, path = parts[-1]
+        return start + pq.ParquetFile(path).metadata.num_rows
+
+    def read_rows(self, columns: List[Column], offset: int, limit: int) -> List[Dict[str, Any]]:
+        data = {
+            column.name: self._read_range(column, offset, offset + limit)
+            for column in columns
+        }
+        total = min((len(values) for values in data.values()), default=0)
+        return [
+            {name: values[idx] for name, values in data.items()}
+            for idx in range(total)
+        ]
+
+    def query_rows(
+            self,
+            columns: List[Column],
+            query: RowQuery,
+            limit: int
+    ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Scan only the filtered and sorted columns part by part, with typed
+        comparisons in pandas, then read the projected columns of the page.
+        Parts whose key statistics rule out a filter or the keyset position
+        are skipped, and unsorted queries stop at the first part that
+        completes the page.
+        """
+        sort, after = query.sort, query.after or {}
+        anchor = sort.column if sort else (query.filters[0].column if query.filters else columns[0])
+        key_columns = [row_filter.column for row_filter in query.filters] + ([sort.column] if sort else [])
+        matches, matched_count = [], 0
+
+        for start, path in self._parts(anchor):
+            key_parts = {column.id: self._key_part(column, start) for column in key_columns}
+            if self._rules_out_part(query, key_parts):
+                continue
+
+            part_length = pq.ParquetFile(path).metadata.num_rows
+            part = pd.DataFrame({'row_index': pd.RangeIndex(start, start + part_length)})
+            if sort:
+                part['key'] = self._read_keys(sort.column, start, key_parts[sort.column.id]).array
+
+            for row_filter in query.filters:
+                data_type = row_filter.column.current_type
+                keys = self._read_keys(row_filter.column, start, key_parts[row_filter.column.id])
+                matched = COMPARISONS[row_filter.op](keys, typed_value(row_filter.value, data_type))
+                part = part[matched.fillna(False).to_numpy(dtype=bool)[part.index]]
+
+            if sort:
+                # Only a part's first rows in sort order can make the page
+                part = self._sort_after(part, sort, after).head(limit + 1)
+            elif 'row' in after:
+                part = part[part['row_index'] > after['row']]
+
+            matches.append(part)
+            matched_count += len(part)
+            if not sort and matched_count > limit:
+                break
+
+        if not matches:
+            return [], None
+
+        found = pd.concat(matches, ignore_index=True)
+        if sort:
+            # Every part was already cut to the keyset position and its ties are in row order
+            found = self._sort_after(found, sort, {})
+
+        page, has_more = found.head(limit), len(found) > limit
+        rows = self._read_row_indexes(columns, page['row_index'].astype(int).tolist()).to_dict('records')
+        if not has_more:
+            return rows, None
+
+        last = page.iloc[-1]
+        last_key = last['key'] if sort and pd.notna(last['key']) else None
+        return rows, {
+            'row': int(last['row_index']),
+            'key': last_key.item() if hasattr(last_key, 'item') else last_key
+        }
+
+    def _rules_out_part(self, query: RowQuery, key_parts: Dict[int, Optional[pq.FileMetaData]]) -> bool:
+        """Whether the statistics of a part's keys show none of its rows can be on the page."""
+        for row_filter in query.filters:
+            key_range = self._key_range(key_parts[row_filter.column.id])
+            if key_range is None:
+                continue
+            if key_range.low is None:
+                return True
+
+            value = typed_value(row_filter.value, row_filter.column.current_type)
+            if row_filter.op == 'eq':
+                possible = key_range.low <= value <= key_range.high
+            else:
+                # Some key passes the comparison if the largest (gt, gte) or smallest (lt, lte) does
+                bound = key_range.high if row_filter.op in ('gt', 'gte') else key_range.low
+                possible = COMPARISONS[row_filter.op](bound, value)
+            if not possible:
+                return True
+
+        # Past the keyset position only larger (smaller if descending) keys and nulls remain
+        sort, after = query.sort, query.after or {}
+        if sort and 'row' in after:
+            key_range = self._key_range(key_parts[sort.column.id])
+            if key_range is None or key_range.nulls:
+                return False
+            if key_range.low is None or after.get('key') is None:
+                return True
+            after_key = typed_value(after['key'], sort.column.current_type)
+            return key_range.low > after_key if sort.descending else key_range.high < after_key
+        return False
+
+    @staticmethod
+    def _sort_after(found: pd.DataFrame, sort, after: Dict[str, Any]) -> pd.DataFrame:
+        """
+        Order matches by key (nulls last) and row_index, keeping those past the
+        keyset position. Matches come in row_index order, so a stable sort on
+        the key alone breaks ties by row_index.
+        """
+        if 'row' in after:
+            keys, rows = found['key'], found['row_index']
+            if after.get('key') is None:
+                found = found[keys.isna() & (rows > after['row'])]
+            else:
+                after_key = typed_value(after['key'], sort.column.current_type)
+                beyond = keys < after_key if sort.descending else keys > after_key
+                found = found[beyond | ((keys == after_key) & (rows > after['row'])) | keys.isna()]
+
+        return found.sort_values('key', ascending=not sort.descending, kind='stable', na_position='last')
+
+    def index_column(self, column: Column) -> None:
+        """
+        Write the typed keys of each part of the column to its key part. Key
+        parts record the type and the file of the part they were computed
+        from, and queries ignore them once either has changed.
+        """
+        parts = self._parts(column)
+        if column.current_type not in SORTABLE_TYPES:
+            for _, path in parts:
+                self._key_path(path).unlink(missing_ok=True)
+            return
+
+        for _, path in parts:
+            keys = typed_keys(self._read_part(path), column.current_type)
+            try:
+                array = pa.array(keys, type=self.KEY_TYPES.get(column.current_type, pa.string()), from_pandas=True)
+            except pa.ArrowException as e:
+                # A value that does not cast leaves the column filterable only by parsing its text
+                logger.warning(f"Could not index column {column.id} as {column.current_type}: {str(e)}")
+                return
+
+            table = pa.table({'key': array}).replace_schema_metadata({
+                'data_type': column.current_type,
+                'source': self._part_stamp(path),
+            })
+            self._write_table(self._key_path(path), table)
+
+    def iter_rows(self, columns: List[Column], chunk_size: int) -> Iterator[Tuple[int, pd.DataFrame]]:
+        if not columns:
+            return
+
+        for start, _ in self._parts(columns[0]):
+            chunk = pd.DataFrame({
+                column.name: self._read_part(self._part_path(column, start))
+                for column in columns
+            })
+            for offset in range(0, len(chunk), chunk_size):
+                yield start + offset, chunk.iloc[offset:offset + chunk_size].reset_index(drop=True)
+
+    def iter_column(self, column: Column, batch_size: int) -> Iterator[pd.DataFrame]:
+        # Batches follow part boundaries so updates rewrite whole parts
+        return self.iter_column_range(column, 0, None, batch_size)
+
+    def iter_column_range(
+            self,
+            column: Column,
+            start_row: int,
+            stop_row: Optional[int],
+            batch_size: int
+    ) -> Iterator[pd.DataFrame]:
+        for start, path in self._parts(column):
+            if start < start_row or (stop_row is not None and start >= stop_row):
+                continue
+            values = self._read_part(path)
+            row_index = pd.RangeIndex(start, start + len(values))
+            yield pd.DataFrame(
+                {'row_index': row_index, 'value': values.to_numpy()},
+                index=row_index
+            )
+
+    def update_column(self, column: Column, values: pd.Series) -> None:
+        values = self.to_text(values)
+        parts = self._parts(column)
+        starts = [start for start, _ in parts]
+
+        for part_pos in sorted({bisect.bisect_right(starts, key) - 1 for key in values.index}):
+            start, path = parts[part_pos]
+            current = self._read_part(path)
+            current.index = pd.RangeIndex(start, start + len(current))
+
+            updates = values[(values.index >= start) & (values.index < start + len(current))]
+            current.loc[updates.index] = updates
+            self._write_part(path, current.reset_index(drop=True))
+
+    @contextmanager
+    def rewrite_column(self, column: Column) -> Iterator[Callable[[pd.Series], None]]:
+        """
+        Write the new parts into a staging directory next to the column and
+        swap it in on success. Values must come in whole iter_column batches.
+        """
+        self.open_stage(column, 'rewrite')
+        try:
+            yield self.stage_writer(column, 'rewrite')
+        except BaseException:
+            self.discard_stage(column, 'rewrite')
+            raise
+        self.commit_stage(column, 'rewrite')
+
+    def open_stage(self, column: Column, stage: str) -> None:
+        self.discard_stage(column, stage)
+        self._stage_dir(column, stage).mkdir(parents=True)
+
+    def stage_writer(self, column: Column, stage: str) -> Callable[[pd.Series], None]:
+        stage_dir = self._stage_dir(column, stage)
+
+        def write(values: pd.Series) -> None:
+            start = int(values.index.min())
+            path = stage_dir / f"{self.PART_PREFIX}{start:012d}.parquet"
+            self._write_part(path, self.to_text(values).reset_index(drop=True))
+
+        return write
+
+    def commit_stage(self, column: Column, stage: str) -> None:
+        # The stage becomes a new version, and a single rename of the pointer
+        # moves readers from every old part to every new one
+        column_dir = self._column_dir(column)
+        column_dir.mkdir(parents=True, exist_ok=True)
+        previous = self._active_dir(column)
+        version = column_dir / f"{self.VERSION_PREFIX}{uuid4().hex}"
+        os.replace(self._stage_dir(column, stage), version)
+
+        pointer = column_dir / self.VERSION_POINTER
+        tmp_pointer = pointer.with_suffix('.tmp')
+        tmp_pointer.write_text(version.name)
+        os.replace(tmp_pointer, pointer)
+
+        # The replaced version stays until the next commit for reads still going through it
+        self._drop_versions(column_dir, keep={version, previous})
+
+    def discard_stage(self, column: Column, stage: str) -> None:
+        shutil.rmtree(self._stage_dir(column, stage), ignore_errors=True)
+
+    def copy_from(self, source: DatasetStorage, columns: List[Tuple[Column, Column]], chunk_size: int) -> None:
+        if not isinstance(source, ColumnarStorage):
+            return super().copy_from(source, columns, chunk_size)
+
+        # Parts are only ever replaced, never modified in place, so the copy
+        # hard links them and both datasets share the files copy-on-write
+        for source_column, column in columns:
+            column_dir = self._active_dir(column)
+            column_dir.mkdir(parents=True, exist_ok=True)
+            for _, path in source._parts(source_column):
+                try:
+                    os.link(path, column_dir / path.name)
+                except OSError:
+                    shutil.copyfile(path, column_dir / path.name)
+
+    def delete(self) -> None:
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _column_dir(self, column: Column) -> Path:
+        return self.root / str(column.id)
+
+    def _active_dir(self, column: Column) -> Path:
+        """Directory of a column's current parts: the version CURRENT names, else the column directory."""
+        column_dir = self._column_dir(column)
+        try:
+            return column_dir / (column_dir / self.VERSION_POINTER).read_text().strip()
+        except FileNotFoundError:
+            return column_dir
+
+    def _drop_versions(self, column_dir: Path, keep: Set[Path]) -> None:
+        """Remove the parts of every version of a column except those kept."""
+        if column_dir not in keep:
+            for prefix in (self.PART_PREFIX, self.KEY_PREFIX):
+                for path in column_dir.glob(f"{prefix}*.parquet"):
+                    path.unlink(missing_ok=True)
+        for path in column_dir.glob(f"{self.VERSION_PREFIX}*"):
+            if path not in keep:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def _stage_dir(self, column: Column, stage: str) -> Path:
+        return self._column_dir(column).with_name(f"{column.id}.stage-{stage}")
+
+    def _part_path(self, column: Column, start_row: int) -> Path:
+        return self._active_dir(column) / f"{self.PART_PREFIX}{start_row:012d}.parquet"
+
+    def _parts(self, column: Column) -> List[Tuple[int, Path]]:
+        """Return (start row, path) for each part of a column's current version, in row order."""
+        column_dir = self._active_dir(column)
+        if not column_dir.exists():
+            return []
+
+        parts = [
+            (int(path.stem[len(self.PART_PREFIX):]), path)
+            for path in column_dir.glob(f"{self.PART_PREFIX}*.parquet")
+        ]
+        return sorted(parts)
+
+    def _key_path(self, path: Path) -> Path:
+        return path.with_name(self.KEY_PREFIX + path.name[len(self.PART_PREFIX):])
+
+    @staticmethod
+    def _part_stamp(path: Path) -> str:
+        """Identity of a part's file, which changes whenever the part is rewritten."""
+        stat = path.stat()
+        return f"{stat.st_ino}-{stat.st_mtime_ns}-{stat.st_size}"
+
+    def _key_part(self, column: Column, start: int) -> Optional[pq.FileMetaData]:
+        """Metadata of the key part of a column's part, None unless it holds the part's current keys."""
+        path = self._part_path(column, start)
+        try:
+            metadata = pq.ParquetFile(self._key_path(path)).metadata
+            stamp = self._part_stamp(path)
+        except FileNotFoundError:
+            return None
+
+        properties = metadata.metadata or {}
+        if properties.get(b'data_type') != column.current_type.encode() or properties.get(b'source') != stamp.encode():
+            return None
+        return metadata
+
+    def _read_keys(self, column: Column, start: int, key_part: Optional[pq.FileMetaData]) -> pd.Series:
+        """Typed keys of a column's part, from its key part when current, else parsed from its text."""
+        path = self._part_path(column, start)
+        if key_part is None:
+            return typed_keys(self._read_part(path), column.current_type)
+
+        keys = pq.read_table(self._key_path(path), columns=['key']).column('key')
+        return keys.to_pandas(types_mapper={pa.int64(): pd.Int64Dtype()}.get)
+
+    @staticmethod
+    def _key_range(key_part: Optional[pq.FileMetaData]) -> Optional[KeyRange]:
+        """Statistics of a key part, None when it has none to go by."""
+        if key_part is None or key_part.num_row_groups != 1:
+            return None
+
+        statistics = key_part.row_group(0).column(0).statistics
+        if statistics is None or not statistics.has_null_count:
+            return None
+        if statistics.has_min_max:
+            return KeyRange(statistics.min, statistics.max, statistics.null_count)
+        return KeyRange(None, None, statistics.null_count) if statistics.null_count == key_part.num_rows else None
+
+    def _read_row_indexes(self, columns: List[Column], row_indexes: List[int]) -> pd.DataFrame:
+        """Read the given rows, in the given order, opening only the parts that hold them."""
+        wanted = pd.Index(row_indexes, dtype='int64')
+        data = {}
+
+        for column in columns:
+            values = []
+            parts = self._parts(column)
+            starts = [start for start, _ in parts]
+            for part_pos in sorted({bisect.bisect_right(starts, row_index) - 1 for row_index in wanted}):
+                start, path = parts[part_pos]
+                part = pq.read_table(path, columns=['value']).column('value')
+                in_part = wanted[(wanted >= start) & (wanted < start + len(part))]
+                # Only the wanted values are converted from Arrow
+                values.append(pd.Series(part.take(pa.array(in_part - start)).to_pandas().to_numpy(), index=in_part))
+            data[column.name] = pd.concat(values) if values else pd.Series(dtype=object)
+
+        return pd.DataFrame(data, columns=[column.name for column in columns]).reindex(wanted).fillna('')
+
+    def _read_range(self, column: Column, start: int, stop: int) -> List[str]:
+        parts = self._parts(column)
+        starts = [part_start for part_start, _ in parts]
+
+        values = []
+        for part_start, path in parts[max(bisect.bisect_right(starts, start) - 1, 0):]:
+            if part_start >= stop:
+                break
+            part = self._read_part(path)
+            values.extend(part.iloc[max(start - part_start, 0):stop - part_start].tolist())
+        return values
+
+    @staticmethod
+    def _read_part(path: Path) -> pd.Series:
+        values = pq.read_table(path, columns=['value']).column('value').to_pandas()
+        return values.fillna('')
+
+    @classmethod
+    def _write_part(cls, path: Path, values: pd.Series) -> None:
+        array = pa.array(values.where(values != '', None), type=pa.string())
+        cls._write_table(path, pa.table({'value': array}))
+
+    @staticmethod
+    def _write_table(path: Path, table: pa.Table) -> None:
+        """Write a part atomically so readers never see a half written file."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        pq.write_table(table, tmp_path, compression='zstd')
+        os.replace(tmp_path, path)
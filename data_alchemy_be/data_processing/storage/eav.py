@@ -0,0 +1,438 @@
+import logging
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Any
+
+import pandas as pd
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+
+from data_processing.models import Column, DatasetRow, RowValue
+from data_processing.storage.base import DatasetStorage
+from data_processing.storage.query import RowQuery
+from utils.pg_copy import allocate_ids, copy_rows
+from utils.queryset import iter_keyset
+
+logger = logging.getLogger(__name__)
+
+
+class EAVStorage(DatasetStorage):
+    """
+    Legacy backend storing one DatasetRow per row and one RowValue per cell.
+
+    Typed columns get a partial expression index over their RowValues, so
+    filters and sorts compare typed values through an index scan.
+    """
+
+    # SQL casting a stored text value to its comparable typed key. Datetimes
+    # are stored ISO formatted with four digit years and compare as bytes.
+    TYPED_EXPRESSIONS = {
+        'Integer': ("NULLIF({value}, '')::numeric", 'numeric'),
+        'Float': ("NULLIF({value}, '')::double precision", 'double precision'),
+        'Datetime': ("NULLIF({value}, '') COLLATE \"C\"", 'text'),
+        'Category': ("NULLIF({value}, '')", 'text'),
+        'Boolean': ("NULLIF(lower({value}), '')", 'text'),
+    }
+    SQL_OPERATORS = {'eq': '=', 'gt': '>', 'gte': '>=', 'lt': '<', 'lte': '<='}
+
+    def write_chunk(self, start_row: int, columns: List[Column], chunk: pd.DataFrame) -> None:
+        if connection.vendor == 'postgresql' and settings.DATASET_BULK_LOADER == 'copy':
+            self._copy_chunk(start_row, columns, chunk)
+        else:
+            self._bulk_create_chunk(start_row, columns, chunk)
+
+    @transaction.atomic
+    def _copy_chunk(self, start_row: int, columns: List[Column], chunk: pd.DataFrame) -> None:
+        """
+        Load a chunk with COPY FROM STDIN. Row ids are reserved from the
+        DatasetRow sequence up front so values can reference them directly.
+        """
+        with connection.cursor() as cursor:
+            row_ids = allocate_ids(cursor, DatasetRow._meta.db_table, len(chunk))
+            created_at = timezone.now()
+
+            copy_rows(
+                cursor,
+                DatasetRow._meta.db_table,
+                ['id', 'dataset_id', 'row_index', 'created_at'],
+                (
+                    (row_id, self.dataset.id, start_row + idx, created_at)
+                    for idx, row_id in enumerate(row_ids)
+                )
+            )
+            copy_rows(
+                cursor,
+                RowValue._meta.db_table,
+                ['dataset_row_id', 'column_id', 'value'],
+                (
+                    (row_id, column.id, value)
+                    for column in columns
+                    for row_id, value in zip(row_ids, self.to_text(chunk[column.name]))
+                )
+            )
+
+    def _bulk_create_chunk(self, start_row: int, columns: List[Column], chunk: pd.DataFrame) -> None:
+        dataset_rows = [
+            DatasetRow(
+                dataset=self.dataset,
+                row_index=start_row + idx
+            ) for idx in range(len(chunk))
+        ]
+        created_rows = DatasetRow.objects.bulk_create(dataset_rows)
+
+        for column in columns:
+            values = self.to_text(chunk[column.name])
+            row_values = [
+                RowValue(
+                    dataset_row=created_rows[idx],
+                    column=column,
+                    value=value
+                ) for idx, value in enumerate(values)
+            ]
+
+            RowValue.objects.bulk_create(row_values, batch_size=1000)
+
+    def create_rows(self, total_rows: int) -> None:
+        if connection.vendor != 'postgresql':
+            for start in range(0, total_rows, 10000):
+                DatasetRow.objects.bulk_create([
+                    DatasetRow(dataset=self.dataset, row_index=row_index)
+                    for row_index in range(start, min(start + 10000, total_rows))
+                ])
+            return
+
+        # Generated server side, so no row travels over the connection
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {DatasetRow._meta.db_table} (dataset_id, row_index, created_at) "
+                f"SELECT %s, row_index, %s FROM generate_series(0, %s) AS row_index",
+                [self.dataset.id, timezone.now(), total_rows - 1]
+            )
+
+    def write_columns(self, start_row: int, columns: List[Column], chunk: pd.DataFrame) -> None:
+        row_ids = dict(
+            self.dataset.rows.filter(row_index__gte=start_row, row_index__lt=start_row + len(chunk))
+            .values_list('row_index', 'id')
+        )
+        row_ids = [row_ids[start_row + idx] for idx in range(len(chunk))]
+
+        # Values of a retried part replace whatever its previous attempt wrote
+        RowValue.objects.filter(dataset_row_id__in=row_ids, column__in=columns).delete()
+
+        if connection.vendor == 'postgresql' and settings.DATASET_BULK_LOADER == 'copy':
+            with connection.cursor() as cursor:
+                copy_rows(
+                    cursor,
+                    RowValue._meta.db_table,
+                    ['dataset_row_id', 'column_id', 'value'],
+                    (
+                        (row_id, column.id, value)
+                        for column in columns
+                        for row_id, value in zip(row_ids, self.to_text(chunk[column.name]))
+                    )
+                )
+            return
+
+        for column in columns:
+            RowValue.objects.bulk_create([
+                RowValue(dataset_row_id=row_id, column=column, value=value)
+                for row_id, value in zip(row_ids, self.to_text(chunk[column.name]))
+            ], batch_size=1000)
+
+    def delete_rows_from(self, start_row: int) -> None:
+        rows = self.dataset.rows.filter(row_index__gte=start_row)
+        RowValue.objects.filter(dataset_row__in=rows).delete()
+        rows.delete()
+
+    def count_rows(self) -> int:
+        return self.dataset.rows.count()
+
+    def read_rows(self, columns: List[Column], offset: int, limit: int) -> List[Dict[str, Any]]:
+        # Row indexes are contiguous, so a page is a row_index range fetched in one query
+        page = self._read_cells(columns, start=offset, stop=offset + limit)
+        return page.sort_index().to_dict('records')
+
+    def query_rows(
+            self,
+            columns: List[Column],
+            query: RowQuery,
+            limit: int
+    ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        row_table, value_table = DatasetRow._meta.db_table, RowValue._meta.db_table
+        joins, join_params = '', []
+        conditions, params = ['dr.dataset_id = %s'], [self.dataset.id]
+
+        # Each filter is a semi-join answered by the filtered column's typed index
+        for position, row_filter in enumerate(query.filters):
+            alias = f'f{position}'
+            cast = self.TYPED_EXPRESSIONS[row_filter.column.current_type][1]
+            conditions.append(
+                f"EXISTS (SELECT 1 FROM {value_table} {alias} "
+                f"WHERE {alias}.dataset_row_id = dr.id AND {alias}.column_id = {int(row_filter.column.id)} "
+                f"AND {self.typed_key(row_filter.column, alias)} {self.SQL_OPERATORS[row_filter.op]} %s::{cast})"
+            )
+            params.append(row_filter.value)
+
+        sort_key, order = 'NULL', 'dr.row_index'
+        if query.sort:
+            cast = self.TYPED_EXPRESSIONS[query.sort.column.current_type][1]
+            sort_key = self.typed_key(query.sort.column, 's')
+            joins = f"LEFT JOIN {value_table} s ON s.dataset_row_id = dr.id AND s.column_id = %s"
+            join_params = [query.sort.column.id]
+            order = f"{sort_key} {'DESC' if query.sort.descending else 'ASC'} NULLS LAST, dr.row_index"
+
+        if query.after:
+            after_row, after_key = query.after['row'], query.after.get('key')
+            if not query.sort:
+                conditions.append('dr.row_index > %s')
+                params.append(after_row)
+            elif after_key is None:
+                conditions.append(f"{sort_key} IS NULL AND dr.row_index > %s")
+                params.append(after_row)
+            else:
+                comparison = '<' if query.sort.descending else '>'
+                conditions.append(
+                    f"({sort_key} {comparison} %s::{cast} OR "
+                    f"({sort_key} = %s::{cast} AND dr.row_index > %s) OR {sort_key} IS NULL)"
+                )
+                params += [after_key, after_key, after_row]
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT dr.row_index, ({sort_key})::text FROM {row_table} dr {joins} "
+                f"WHERE {' AND '.join(conditions)} ORDER BY {order} LIMIT %s",
+                join_params + params + [limit + 1]
+            )
+            matches = cursor.fetchall()
+
+        page, has_more = matches[:limit], len(matches) > limit
+        cells = self._read_cells(columns, row_indexes=[row_index for row_index, _ in page])
+        rows = cells.reindex(index=[row_index for row_index, _ in page]).fillna('').to_dict('records')
+
+        if not has_more:
+            return rows, None
+        last_row, last_key = page[-1]
+        return rows, {'row': last_row, 'key': last_key}
+
+    def iter_rows(self, columns: List[Column], chunk_size: int) -> Iterator[Tuple[int, pd.DataFrame]]:
+        total_rows = self.count_rows()
+
+        for start in range(0, total_rows, chunk_size):
+            stop = min(start + chunk_size, total_rows)
+            chunk = self._read_cells(columns, start=start, stop=stop).reindex(index=range(start, stop)).fillna('')
+            yield start, chunk.rename_axis(index=None)
+
+    def _read_cells(
+            self,
+            columns: List[Column],
+            start: int = None,
+            stop: int = None,
+            row_indexes: List[int] = None
+    ) -> pd.DataFrame:
+        """
+        Fetch the cells of rows start..stop, or of the given row indexes, with
+        one query and pivot them to a row_index indexed frame.
+        """
+        names = {column.id: column.name for column in columns}
+        cells = RowValue.objects.filter(
+            dataset_row__dataset=self.dataset,
+            column_id__in=names.keys()
+        )
+        if row_indexes is not None:
+            cells = cells.filter(dataset_row__row_index__in=row_indexes)
+        else:
+            cells = cells.filter(dataset_row__row_index__gte=start, dataset_row__row_index__lt=stop)
+
+        frame = pd.DataFrame.from_records(
+            cells.values_list('dataset_row__row_index', 'column_id', 'value'),
+            columns=['row_index', 'column_id', 'value']
+        )
+        chunk = frame.pivot(index='row_index', columns='column_id', values='value')
+        return chunk.reindex(columns=list(names.keys())).rename(
+            columns=names
+        ).rename_axis(columns=None).fillna('')
+
+    def iter_column(self, column: Column, batch_size: int) -> Iterator[pd.DataFrame]:
+        fields = ['id', 'dataset_row__row_index', 'value']
+        for batch_values in iter_keyset(RowValue.objects.filter(column=column), fields, batch_size):
+            batch = pd.DataFrame.from_records(batch_values, columns=['id', 'row_index', 'value'])
+            yield batch.set_index('id')
+
+    def iter_column_range(
+            self,
+            column: Column,
+            start_row: int,
+            stop_row: Optional[int],
+            batch_size: int
+    ) -> Iterator[pd.DataFrame]:
+        queryset = RowValue.objects.filter(column=column, dataset_row__row_index__gte=start_row)
+        if stop_row is not None:
+            queryset = queryset.filter(dataset_row__row_index__lt=stop_row)
+
+        fields = ['id', 'dataset_row__row_index', 'value']
+        for batch_values in iter_keyset(queryset, fields, batch_size):
+            batch = pd.DataFrame.from_records(batch_values, columns=['id', 'row_index', 'value'])
+            yield batch.set_index('id')
+
+    def update_column(self, column: Column, values: pd.Series) -> None:
+        values = self.to_text(values)
+        if connection.vendor != 'postgresql':
+            RowValue.objects.bulk_update(
+                [RowValue(id=key, value=value) for key, value in values.items()],
+                ['value'],
+                batch_size=1000
+            )
+            return
+
+        # One UPDATE per batch, joined against the new values passed as arrays
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {RowValue._meta.db_table} AS rv SET value = v.value "
+                f"FROM unnest(%s::bigint[], %s::text[]) AS v(id, value) "
+                f"WHERE rv.id = v.id",
+                [[int(key) for key in values.index], values.tolist()]
+            )
+
+    @contextmanager
+    def rewrite_column(self, column: Column) -> Iterator[Callable[[pd.Series], None]]:
+        # Updates are held in one transaction and rolled back if the block raises
+        with transaction.atomic():
+            yield lambda values: self.update_column(column, values)
+
+    def open_stage(self, column: Column, stage: str) -> None:
+        # Stages are scratch tables keyed by RowValue id; unlogged on PostgreSQL
+        # since a crashed conversion is simply started again
+        unlogged = 'UNLOGGED' if connection.vendor == 'postgresql' else ''
+        table = self._stage_table(stage)
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {table}")
+            cursor.execute(f"CREATE {unlogged} TABLE {table} (id bigint PRIMARY KEY, value text NOT NULL)")
+
+    def stage_writer(self, column: Column, stage: str) -> Callable[[pd.Series], None]:
+        table = self._stage_table(stage)
+
+        def write(values: pd.Series) -> None:
+            values = self.to_text(values)
+            with connection.cursor() as cursor:
+                if connection.vendor == 'postgresql':
+                    cursor.execute(
+                        f"INSERT INTO {table} (id, value) SELECT * FROM unnest(%s::bigint[], %s::text[])",
+                        [[int(key) for key in values.index], values.tolist()]
+                    )
+                else:
+                    cursor.executemany(
+                        f"INSERT INTO {table} (id, value) VALUES (%s, %s)",
+                        [(int(key), value) for key, value in values.items()]
+                    )
+
+        return write
+
+    def commit_stage(self, column: Column, stage: str) -> None:
+        table = self._stage_table(stage)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {RowValue._meta.db_table} SET value = stage.value "
+                f"FROM {table} AS stage WHERE {RowValue._meta.db_table}.id = stage.id"
+            )
+            cursor.execute(f"DROP TABLE {table}")
+
+    def discard_stage(self, column: Column, stage: str) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {self._stage_table(stage)}")
+
+    @staticmethod
+    def _stage_table(stage: str) -> str:
+        return f"rowvalue_stage_{''.join(char for char in stage if char.isalnum())}"
+
+    def index_column(self, column: Column) -> None:
+        if connection.vendor != 'postgresql':
+            return
+
+        # Build without blocking ingestion into the shared RowValue table, unless
+        # called inside a transaction where CONCURRENTLY is not allowed
+        concurrently = '' if connection.in_atomic_block else 'CONCURRENTLY'
+        name = self.column_index_name(column)
+        self.drop_column_index(column)
+
+        if column.current_type not in self.TYPED_EXPRESSIONS:
+            return
+
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"CREATE INDEX {concurrently} IF NOT EXISTS {name} "
+                    f"ON {RowValue._meta.db_table} (({self.typed_key(column)}), dataset_row_id) "
+                    f"WHERE column_id = {int(column.id)}"
+                )
+        except DatabaseError as e:
+            # A value that does not cast leaves the column filterable only without the index
+            logger.warning(f"Could not index column {column.id} as {column.current_type}: {str(e)}")
+            self.drop_column_index(column)
+
+    @classmethod
+    def drop_column_index(cls, column: Column) -> None:
+        if connection.vendor != 'postgresql':
+            return
+
+        concurrently = '' if connection.in_atomic_block else 'CONCURRENTLY'
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP INDEX {concurrently} IF EXISTS {cls.column_index_name(column)}")
+
+    @classmethod
+    def typed_key(cls, column: Column, alias: str = None) -> str:
+        """
+        SQL casting a column's RowValues to their typed key. The cast is guarded
+        by the column id, so it never sees the text of another column whatever
+        order the planner evaluates conditions in; queries and the column's
+        index use the same expression.
+        """
+        prefix = f'{alias}.' if alias else ''
+        expression = cls.TYPED_EXPRESSIONS[column.current_type][0].format(value=f'{prefix}value')
+        return f"CASE WHEN {prefix}column_id = {int(column.id)} THEN {expression} END"
+
+    @staticmethod
+    def column_index_name(column: Column) -> str:
+        return f"rowvalue_typed_{column.id}"
+
+    @transaction.atomic
+    def copy_from(self, source: DatasetStorage, columns: List[Tuple[Column, Column]], chunk_size: int) -> None:
+        if not isinstance(source, EAVStorage) or connection.vendor != 'postgresql':
+            return super().copy_from(source, columns, chunk_size)
+
+        # Copied server side, so no value travels over the connection
+        column_cases = ' '.join('WHEN %s THEN %s' for _ in columns)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {DatasetRow._meta.db_table} (dataset_id, row_index, created_at) "
+                f"SELECT %s, row_index, %s FROM {DatasetRow._meta.db_table} WHERE dataset_id = %s",
+                [self.dataset.id, timezone.now(), source.dataset.id]
+            )
+            cursor.execute(
+                f"INSERT INTO {RowValue._meta.db_table} (dataset_row_id, column_id, value) "
+                f"SELECT target_row.id, CASE rv.column_id {column_cases} END, rv.value "
+                f"FROM {RowValue._meta.db_table} rv "
+                f"JOIN {DatasetRow._meta.db_table} source_row ON source_row.id = rv.dataset_row_id "
+                f"JOIN {DatasetRow._meta.db_table} target_row "
+                f"ON target_row.dataset_id = %s AND target_row.row_index = source_row.row_index "
+                f"WHERE source_row.dataset_id = %s AND rv.column_id IN ({', '.join('%s' for _ in columns)})",
+                [
+                    *(column_id for source_column, column in columns for column_id in (source_column.id, column.id)),
+                    self.dataset.id,
+                    source.dataset.id,
+                    *(source_column.id for source_column, _ in columns),
+                ]
+            )
+
+    @transaction.atomic
+    def delete(self) -> None:
+        # Raw deletes avoid Django collecting millions of cascaded objects in memory
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {RowValue._meta.db_table} WHERE column_id IN "
+                f"(SELECT id FROM {Column._meta.db_table} WHERE dataset_id = %s)",
+                [self.dataset.id]
+            )
+            cursor.execute(
+                f"DELETE FROM {DatasetRow._meta.db_table} WHERE dataset_id = %s",
+                [self.dataset.id]
+            )
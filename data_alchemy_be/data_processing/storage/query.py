@@ -0,0 +1,117 @@
+import operator
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import pandas as pd
+
+from data_processing.models import Column
+from data_processing.tasks.conversion import ConversionEngine
+
+# Operators each column type can be filtered with
+FILTER_OPERATORS = {
+    'Integer': ('eq', 'gt', 'gte', 'lt', 'lte'),
+    'Float': ('eq', 'gt', 'gte', 'lt', 'lte'),
+    'Datetime': ('eq', 'gt', 'gte', 'lt', 'lte'),
+    'Category': ('eq',),
+    'Boolean': ('eq',),
+}
+SORTABLE_TYPES = ('Integer', 'Float', 'Datetime', 'Category', 'Boolean')
+COMPARISONS = {
+    'eq': operator.eq,
+    'gt': operator.gt,
+    'gte': operator.ge,
+    'lt': operator.lt,
+    'lte': operator.le,
+}
+
+
+class RowFilter(NamedTuple):
+    column: Column
+    op: str
+    # Canonical text of the value, as ConversionEngine renders it
+    value: str
+
+
+class RowSort(NamedTuple):
+    column: Column
+    descending: bool = False
+
+
+class RowQuery(NamedTuple):
+    """
+    Filters, sort and keyset position of a rows query. Rows are ordered by
+    the sort column (nulls last) and then by row_index; `after` holds the
+    'row' and 'key' of the last row of the previous page.
+    """
+    filters: List[RowFilter]
+    sort: Optional[RowSort] = None
+    after: Optional[Dict[str, Any]] = None
+
+
+def parse_filter(columns: Dict[str, Column], expression: str) -> RowFilter:
+    """Parse a `<column>:<op>:<value>` filter. Raises ValueError when it does not apply."""
+    parts = expression.split(':', 2)
+    if len(parts) != 3:
+        raise ValueError(f"Invalid filter '{expression}', expected <column>:<op>:<value>")
+
+    name, op, raw_value = parts
+    column = columns.get(name)
+    if not column:
+        raise ValueError(f"Unknown column '{name}'")
+
+    operators = FILTER_OPERATORS.get(column.current_type, ())
+    if op not in operators:
+        raise ValueError(f"Column '{name}' of type {column.current_type} cannot be filtered with '{op}'")
+
+    invalid = ValueError(f"Invalid {column.current_type} value '{raw_value}' for column '{name}'")
+    if column.current_type == 'Integer':
+        # Parsed exactly: a float cannot tell apart integers above 2**53
+        try:
+            return RowFilter(column=column, op=op, value=str(int(raw_value.strip())))
+        except ValueError:
+            raise invalid
+
+    converted = ConversionEngine.convert(pd.Series([raw_value]), column.current_type)
+    if converted.failed.any() or converted.values[0] == '':
+        raise invalid
+
+    return RowFilter(column=column, op=op, value=converted.values[0])
+
+
+def parse_sort(columns: Dict[str, Column], expression: str) -> RowSort:
+    """Parse a `<column>` or `-<column>` sort. Raises ValueError when it does not apply."""
+    descending = expression.startswith('-')
+    name = expression[1:] if descending else expression
+
+    column = columns.get(name)
+    if not column:
+        raise ValueError(f"Unknown column '{name}'")
+    if column.current_type not in SORTABLE_TYPES:
+        raise ValueError(f"Column '{name}' of type {column.current_type} cannot be sorted")
+
+    return RowSort(column=column, descending=descending)
+
+
+def typed_keys(values: pd.Series, data_type: str) -> pd.Series:
+    """
+    Comparable keys for stored text values, nulls as NaN or NA. Stored datetimes
+    are ISO formatted with four digit years, so they compare as text.
+    """
+    text = values.where(values != '')
+    if data_type == 'Integer':
+        # Compared exactly, nulls as NA, unless a stored value is not an integer
+        try:
+            return text.astype('Int64')
+        except (TypeError, ValueError):
+            return pd.to_numeric(text, errors='coerce')
+    if data_type == 'Float':
+        return pd.to_numeric(text, errors='coerce')
+    if data_type == 'Boolean':
+        return text.str.lower()
+    return text
+
+
+def typed_value(value: str, data_type: str) -> Any:
+    """Comparable key for a canonical filter value or cursor key."""
+    if data_type == 'Integer':
+        return int(value)
+    return float(value) if data_type == 'Float' else value
@@ -0,0 +1,301 @@
+from collections import Counter
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_datetime64_dtype
+
+
+class ConversionResult(NamedTuple):
+    # Converted values as stored text, '' for nulls and failures
+    values: pd.Series
+    # Why each value could not be converted, '' where it converted cleanly
+    errors: pd.Series
+
+    @property
+    def failed(self) -> pd.Series:
+        return self.errors != ''
+
+
+class ConversionEngine:
+    """
+    Vectorized column type conversion. Whole batches of stored text values
+    are converted at once with pd.to_numeric / pd.to_datetime / mapping, and
+    rendered back to the same text the column would hold after a per-value
+    conversion: str(int(...)), str(float(...)), str(pd.Timestamp), 'true'/'false'.
+
+    Values the target type cannot represent faithfully (decimals for Integer,
+    years outside 1000-9999 for Datetime, ...) are reported as errors.
+    """
+
+    TRUE_VALUES = {'true', 'yes', '1', 't', 'y', 'on'}
+    FALSE_VALUES = {'false', 'no', '0', 'f', 'n', 'off'}
+    INT64_LIMIT = 2.0 ** 63
+    SUPPORTED_TYPES = ('Integer', 'Float', 'Datetime', 'Boolean', 'Category', 'Text')
+
+    @classmethod
+    def convert(cls, values: pd.Series, target_type: str) -> ConversionResult:
+        converters = {
+            'Integer': cls._to_integer,
+            'Float': cls._to_float,
+            'Datetime': cls._to_datetime,
+            'Boolean': cls._to_boolean,
+            'Category': cls._to_category,
+            'Text': cls._to_text,
+        }
+        converter = converters.get(target_type)
+        if not converter:
+            raise ValueError(f"Unsupported target type: {target_type}")
+
+        text = values.astype(object).where(values.notna(), '').astype(str)
+        empty = text.str.strip() == ''
+        return converter(text, empty)
+
+    @classmethod
+    def _to_numbers(cls, text: pd.Series, empty: pd.Series) -> pd.Series:
+        cleaned = text.str.replace(',', '', regex=False).str.strip()
+        return pd.to_numeric(cleaned.where(~empty), errors='coerce').astype(float)
+
+    @classmethod
+    def _to_integer(cls, text: pd.Series, empty: pd.Series) -> ConversionResult:
+        numbers = cls._to_numbers(text, empty)
+        errors = cls._errors(text.index, [
+            (~empty & numbers.isna(), 'not a number'),
+            (numbers.notna() & ~(numbers.abs() < cls.INT64_LIMIT), 'out of integer range'),
+            (np.isfinite(numbers) & (numbers != np.trunc(numbers)), 'has a decimal part'),
+        ])
+
+        valid = ~empty & (errors == '')
+        integers = numbers.where(valid).astype('Int64')
+        return ConversionResult(cls._render(integers.astype(str), valid), errors)
+
+    @classmethod
+    def _to_float(cls, text: pd.Series, empty: pd.Series) -> ConversionResult:
+        numbers = cls._to_numbers(text, empty)
+        errors = cls._errors(text.index, [
+            (~empty & numbers.isna(), 'not a number'),
+            (numbers.notna() & ~np.isfinite(numbers), 'out of float range'),
+        ])
+
+        valid = ~empty & (errors == '')
+        return ConversionResult(cls._render(numbers.astype(str), valid), errors)
+
+    @classmethod
+    def _to_datetime(cls, text: pd.Series, empty: pd.Series) -> ConversionResult:
+        candidates = text.where(~empty)
+        parsed = pd.to_datetime(candidates, errors='coerce', format='ISO8601')
+
+        # Fall back to per-value format inference only for what ISO 8601 missed
+        retry = parsed.isna() & ~empty
+        if retry.any():
+            fallback = pd.to_datetime(candidates.where(retry), errors='coerce', format='mixed')
+            parsed = parsed.where(~retry, fallback)
+
+        if is_datetime64_dtype(parsed):
+            years = parsed.dt.year
+            rendered = parsed.dt.strftime('%Y-%m-%d %H:%M:%S')
+            fractional = parsed.notna() & ((parsed.dt.microsecond != 0) | (parsed.dt.nanosecond != 0))
+            rendered = rendered.where(~fractional, parsed[fractional].map(str))
+        else:
+            # Mixed time zones leave Timestamps in an object series
+            years = parsed.map(lambda value: value.year if pd.notna(value) else np.nan)
+            rendered = parsed.map(str)
+
+        errors = cls._errors(text.index, [
+            (~empty & parsed.isna(), 'not a date'),
+            (parsed.notna() & ((years < 1000) | (years > 9999)), 'year outside 1000-9999'),
+        ])
+
+        valid = ~empty & (errors == '')
+        return ConversionResult(cls._render(rendered, valid), errors)
+
+    @classmethod
+    def _to_boolean(cls, text: pd.Series, empty: pd.Series) -> ConversionResult:
+        normalized = text.str.lower().str.strip()
+        is_true = normalized.isin(cls.TRUE_VALUES)
+        is_false = normalized.isin(cls.FALSE_VALUES)
+
+        rendered = pd.Series(np.where(is_true, 'true', 'false'), index=text.index)
+        errors = cls._errors(text.index, [(~empty & ~is_true & ~is_false, 'not a boolean')])
+        return ConversionResult(cls._render(rendered, is_true | is_false), errors)
+
+    @classmethod
+    def _to_category(cls, text: pd.Series, empty: pd.Series) -> ConversionResult:
+        return ConversionResult(cls._render(text.str.strip(), ~empty), cls._errors(text.index, []))
+
+    @classmethod
+    def _to_text(cls, text: pd.Series, empty: pd.Series) -> ConversionResult:
+        return ConversionResult(text, cls._errors(text.index, []))
+
+    @staticmethod
+    def _errors(index: pd.Index, checks: List) -> pd.Series:
+        """Build the per-value error series; the first failing check names the error."""
+        errors = pd.Series('', index=index, dtype=object)
+        for mask, message in reversed(checks):
+            errors[np.asarray(mask, dtype=bool)] = message
+        return errors
+
+    @staticmethod
+    def _render(rendered: pd.Series, valid: pd.Series) -> pd.Series:
+        return rendered.where(valid, '')
+
+
+class ConversionValidator:
+    """
+    Accumulates the outcome of converting a column batch by batch: the first
+    failing values with their row indexes, and the column-level Category
+    limits that can only be judged once the whole column has been seen.
+    """
+
+    MAX_REPORTED_FAILURES = 20
+    MAX_CATEGORIES = 100
+    # Categories must cover at least this share of the non-null values
+    MIN_CATEGORY_SHARE = 0.01
+
+    def __init__(self, target_type: str, max_reported_failures: int = None):
+        self.target_type = target_type
+        self.max_reported_failures = max_reported_failures or self.MAX_REPORTED_FAILURES
+        self.total_count = 0
+        self.failed_count = 0
+        self.failures = []
+        self.category_counts = Counter()
+        self.category_overflow = False
+
+    def update(self, values: pd.Series, row_indexes: pd.Series, result: ConversionResult) -> None:
+        """Fold the conversion result of one batch into the outcome."""
+        failed = result.failed
+        self.total_count += len(values)
+        self.failed_count += int(failed.sum())
+
+        room = self.max_reported_failures - len(self.failures)
+        if room > 0 and failed.any():
+            for key in failed[failed].index[:room]:
+                self.failures.append({
+                    'row_index': int(row_indexes[key]),
+                    'value': str(values[key]),
+                    'reason': result.errors[key],
+                })
+
+        if self.target_type == 'Category' and not self.category_overflow:
+            self.category_counts.update(result.values[result.values != ''].value_counts().to_dict())
+            if len(self.category_counts) > self.MAX_CATEGORIES:
+                self.category_overflow = True
+                self.category_counts = Counter()
+
+    def merge(self, other: 'ConversionValidator') -> 'ConversionValidator':
+        """Combine the outcome of another partition of the same column into this one."""
+        self.total_count += other.total_count
+        self.failed_count += other.failed_count
+        self.failures = sorted(
+            self.failures + other.failures, key=lambda failure: failure['row_index']
+        )[:self.max_reported_failures]
+
+        if self.target_type == 'Category':
+            self.category_overflow = self.category_overflow or other.category_overflow
+            self.category_counts.update(other.category_counts)
+            if self.category_overflow or len(self.category_counts) > self.MAX_CATEGORIES:
+                self.category_overflow = True
+                self.category_counts = Counter()
+        return self
+
+    def column_errors(self) -> List[str]:
+        """Column-level problems that no single value is responsible for."""
+        if self.target_type != 'Category':
+            return []
+        if self.category_overflow:
+            return [f"Too many unique values for category type (maximum is {self.MAX_CATEGORIES})"]
+
+        non_null = sum(self.category_counts.values())
+        rare_values = [
+            value for value, count in self.category_counts.items()
+            if count < non_null * self.MIN_CATEGORY_SHARE
+        ]
+        if rare_values:
+            return [f"Some categories are too rare (less than 1% occurrence): {', '.join(map(str, rare_values[:5]))}..."]
+        return []
+
+    @property
+    def is_valid(self) -> bool:
+        return self.failed_count == 0 and not self.column_errors()
+
+    def summary(self) -> str:
+        """One-line description of why the conversion is not possible."""
+        if self.failed_count:
+            examples = ', '.join(
+                f"'{failure['value']}' at row {failure['row_index']} ({failure['reason']})"
+                for failure in self.failures[:5]
+            )
+            return f"{self.failed_count} value(s) cannot be converted to {self.target_type}: {examples}"
+        return '; '.join(self.column_errors())
+
+    @classmethod
+    def check_profile(cls, profile, target_type: str) -> Optional[Tuple[bool, str]]:
+        """
+        Decide from a ColumnProfile whether a column converts, without reading
+        its values. Returns (can_convert, error_message), or None when the
+        profile cannot tell.
+        """
+        non_null = profile.non_null_count
+        if target_type == 'Text' or non_null == 0:
+            return True, ""
+
+        if target_type in profile.parse_counts:
+            parsed = profile.parse_counts[target_type]
+            if parsed is None:
+                return False, f"Some values cannot be converted to {target_type}"
+            if parsed < non_null:
+                return False, f"{non_null - parsed} value(s) cannot be converted to {target_type}"
+            return True, ""
+
+        if target_type == 'Category':
+            if not profile.top_values_exact:
+                return False, f"Too many unique values for category type (maximum is {cls.MAX_CATEGORIES})"
+            rare_values = [
+                value for value, count in profile.top_values
+                if count < non_null * cls.MIN_CATEGORY_SHARE
+            ]
+            if rare_values:
+                return False, f"Some categories are too rare (less than 1% occurrence): {', '.join(map(str, rare_values[:5]))}..."
+            return True, ""
+
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'target_type': self.target_type,
+            'valid': self.is_valid,
+            'total_values': self.total_count,
+            'failed_count': self.failed_count,
+            'failures': self.failures,
+            'errors': self.column_errors(),
+        }
+
+    def state_dict(self) -> Dict[str, Any]:
+        """JSON safe state, for merging outcomes computed by other workers."""
+        return {
+            'target_type': self.target_type,
+            'max_reported_failures': self.max_reported_failures,
+            'total_count': self.total_count,
+            'failed_count': self.failed_count,
+            'failures': self.failures,
+            'category_counts': dict(self.category_counts),
+            'category_overflow': self.category_overflow,
+        }
+
+    @classmethod
+    def from_state_dict(cls, data: Dict[str, Any]) -> 'ConversionValidator':
+        validator = cls(data['target_type'], data['max_reported_failures'])
+        validator.total_count = data['total_count']
+        validator.failed_count = data['failed_count']
+        validator.failures = data['failures']
+        validator.category_counts = Counter(data['category_counts'])
+        validator.category_overflow = data['category_overflow']
+        return validator
+
+
+class ConversionFailed(Exception):
+    """Raised when a column cannot be converted; carries the validator outcome."""
+
+    def __init__(self, validator: ConversionValidator):
+        super().__init__(validator.summary())
+        self.validator = validator
@@ -0,0 +1,232 @@
+import hashlib
+import json
+from typing import Dict, Any, List
+
+import numpy as np
+import pandas as pd
+
+
+def normalize_values(chunk: pd.Series) -> pd.Series:
+    """Normalize string values by stripping whitespace and converting to lowercase"""
+    if chunk.dtype == 'object':
+        return chunk.str.strip().str.lower()
+    return chunk
+
+
+def clean_numeric_string(chunk: pd.Series) -> pd.Series:
+    """Clean numeric strings by removing commas"""
+    if chunk.dtype == 'object':
+        return chunk.str.replace(',', '')
+    return chunk
+
+
+# Bumped whenever fingerprints or the inference rules change, so older cached results are never used
+FINGERPRINT_VERSION = 2
+MAX_FINGERPRINT_SHAPES = 50
+MAX_FINGERPRINT_VALUES = 10
+
+
+def column_fingerprint(name: str, values: pd.Series) -> str:
+    """
+    Fingerprint of a column from its header and a sample of its raw values:
+    the share of each value shape (runs of digits and of letters collapsed,
+    so '2024-01-31' is '9-9-9') and, when few, the distinct values
+    themselves, which decide Boolean and Category columns.
+    """
+    values = values.dropna().astype(str)
+    shapes = (
+        values.str.replace(r'[0-9]+', '9', regex=True)
+        .str.replace(r'[^\W\d_]+', 'a', regex=True)
+        .value_counts(normalize=True)
+    )
+    distinct = normalize_values(values).unique()
+    summary = {
+        'version': FINGERPRINT_VERSION,
+        'name': name.strip().lower(),
+        # Shares are coarse so extracts differing in a few values still match; rare shapes are kept
+        'shapes': {shape: round(share, 1) for shape, share in shapes.head(MAX_FINGERPRINT_SHAPES).items()},
+        'values': sorted(distinct) if len(distinct) <= MAX_FINGERPRINT_VALUES else None,
+    }
+    return hashlib.sha256(json.dumps(summary, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class InferenceCacheMismatch(Exception):
+    """Values of columns whose types came from the inference cache do not fit those types."""
+
+    def __init__(self, columns: List[str]):
+        super().__init__(f"Cached types do not fit the values of: {', '.join(columns)}")
+        self.columns = columns
+
+
+class ColumnTypeState:
+    """
+    Mergeable summary of a column's values, built chunk by chunk, from which
+    the column type is decided once the whole column has been seen.
+
+    Candidate types are dropped as soon as a value rules them out, so later
+    chunks only pay for the parse attempts that can still succeed.
+    """
+
+    BOOLEAN_VALUES = {'true', 'false', 'yes', 'no', '1', '0', 't', 'f', 'y', 'n'}
+    TRUE_VALUES = {'true', 'yes', '1', 't', 'y'}
+    FALSE_VALUES = {'false', 'no', '0', 'f', 'n'}
+
+    # Distinct values beyond this can no longer make a Boolean or Category column
+    MAX_TRACKED_VALUES = 100
+    # Values tried as dates before parsing a whole chunk
+    DATETIME_PROBE_SIZE = 100
+    # Integers must fit the stored Int64 values
+    INT64_LIMIT = 2.0 ** 63
+
+    def __init__(self):
+        self.total_count = 0
+        self.null_count = 0
+        self.is_numeric = True
+        self.is_integer = True
+        self.is_datetime = True
+        self.distinct_values = set()
+        self.distinct_overflow = False
+
+    @property
+    def non_null_count(self) -> int:
+        return self.total_count - self.null_count
+
+    def update(self, chunk: pd.Series) -> 'ColumnTypeState':
+        """Fold a chunk of raw values into the state."""
+        values = chunk.dropna()
+        self.total_count += len(chunk)
+        self.null_count += len(chunk) - len(values)
+        if values.empty:
+            return self
+
+        if not self.distinct_overflow:
+            self._track_distinct(normalize_values(values).dropna().unique())
+
+        if self.is_numeric or self.is_datetime:
+            numeric = pd.to_numeric(clean_numeric_string(values), errors='coerce')
+            numeric_mask = numeric.notna()
+
+            if self.is_numeric:
+                if not numeric_mask.all():
+                    self.is_numeric = self.is_integer = False
+                elif self.is_integer:
+                    numbers = numeric.to_numpy(dtype=float)
+                    self.is_integer = bool((
+                        np.isfinite(numbers)
+                        & (numbers == np.floor(numbers))
+                        & (np.abs(numbers) < self.INT64_LIMIT)
+                    ).all())
+
+            # Values that parse as numbers never count as dates
+            if self.is_datetime:
+                if numeric_mask.any():
+                    self.is_datetime = False
+                else:
+                    self.is_datetime = all(
+                        pd.to_datetime(batch, errors='coerce').notna().all()
+                        for batch in (values.head(self.DATETIME_PROBE_SIZE), values)
+                    )
+
+        return self
+
+    def merge(self, other: 'ColumnTypeState') -> 'ColumnTypeState':
+        """Combine the state of another part of the same column into this one."""
+        self.total_count += other.total_count
+        self.null_count += other.null_count
+        self.is_numeric = self.is_numeric and other.is_numeric
+        self.is_integer = self.is_integer and other.is_integer
+        self.is_datetime = self.is_datetime and other.is_datetime
+        self.distinct_overflow = self.distinct_overflow or other.distinct_overflow
+        if not self.distinct_overflow:
+            self._track_distinct(other.distinct_values)
+        return self
+
+    def candidates(self) -> 'ColumnTypeState':
+        """
+        Empty state that keeps the types this one has ruled out, so the state
+        of another part skips the parse attempts that can no longer matter.
+        """
+        state = type(self)()
+        state.is_numeric = self.is_numeric
+        state.is_integer = self.is_integer
+        state.is_datetime = self.is_datetime
+        state.distinct_overflow = self.distinct_overflow
+        return state
+
+    def resolve(self) -> str:
+        """Decide the column type from everything seen so far."""
+        non_null = self.non_null_count
+        if non_null == 0:
+            return 'Text'
+
+        unique_count = len(self.distinct_values)
+        if (not self.distinct_overflow and unique_count <= 2
+                and set(map(str, self.distinct_values)).issubset(self.BOOLEAN_VALUES)):
+            return 'Boolean'
+
+        if self.is_numeric:
+            return 'Integer' if self.is_integer else 'Float'
+
+        if self.is_datetime:
+            return 'Datetime'
+
+        if (not self.distinct_overflow and
+                non_null >= 30 and
+                unique_count <= 10 and
+                unique_count < 0.2 * non_null and
+                non_null >= unique_count * 3):
+            return 'Category'
+
+        return 'Text'
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'total_count': self.total_count,
+            'null_count': self.null_count,
+            'is_numeric': self.is_numeric,
+            'is_integer': self.is_integer,
+            'is_datetime': self.is_datetime,
+            'distinct_values': sorted(map(str, self.distinct_values)),
+            'distinct_overflow': self.distinct_overflow,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ColumnTypeState':
+        state = cls()
+        state.total_count = data['total_count']
+        state.null_count = data['null_count']
+        state.is_numeric = data['is_numeric']
+        state.is_integer = data['is_integer']
+        state.is_datetime = data['is_datetime']
+        state.distinct_values = set(data['distinct_values'])
+        state.distinct_overflow = data['distinct_overflow']
+        return state
+
+    def _track_distinct(self, values) -> None:
+        self.distinct_values.update(values)
+        if len(self.distinct_values) > self.MAX_TRACKED_VALUES:
+            self.distinct_values = set()
+            self.distinct_overflow = True
+
+
+def convert_chunk(chunk: pd.Series, data_type: str) -> pd.Series:
+    """Convert a chunk of raw values to the representation stored for data_type."""
+    if data_type == 'Boolean':
+        normalized = normalize_values(chunk)
+        return normalized.map(
+            lambda x: True if str(x) in ColumnTypeState.TRUE_VALUES
+            else False if str(x) in ColumnTypeState.FALSE_VALUES
+            else None
+        )
+
+    if data_type in ('Integer', 'Float'):
+        numeric_chunk = pd.to_numeric(clean_numeric_string(chunk), errors='coerce')
+        return numeric_chunk.astype('Int64') if data_type == 'Integer' else numeric_chunk
+
+    if data_type == 'Datetime':
+        return pd.to_datetime(chunk, errors='coerce')
+
+    if data_type == 'Category':
+        return chunk.astype('category')
+
+    return chunk
@@ -0,0 +1,118 @@
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, List
+
+import pandas as pd
+import pyarrow as pa
+from billiard.pool import ApplyResult, Pool
+
+from data_processing.tasks.inference import ColumnTypeState
+
+
+def share_frame(chunk: pd.DataFrame) -> SharedMemory:
+    """
+    Write a chunk of raw string values as an Arrow IPC stream into a new
+    shared memory block. The caller owns the block and must unlink it.
+    """
+    batch = pa.RecordBatch.from_pandas(chunk.astype(object), preserve_index=False)
+
+    # Size the stream first so it is written straight into the block
+    mock = pa.MockOutputStream()
+    with pa.ipc.new_stream(mock, batch.schema) as writer:
+        writer.write_batch(batch)
+
+    block = SharedMemory(create=True, size=max(mock.size(), 1))
+    with pa.ipc.new_stream(pa.FixedSizeBufferWriter(pa.py_buffer(block.buf)), batch.schema) as writer:
+        writer.write_batch(batch)
+    return block
+
+
+def infer_shared_columns(block_name: str, candidates: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Pool worker: update a state per column from the shared chunk. Only the
+    requested columns are turned into Series; the rest of the block is never copied.
+    """
+    block = SharedMemory(name=block_name)
+    # Attaching registers the block with the resource tracker too; only its creator unlinks it
+    resource_tracker.unregister(block._name, 'shared_memory')
+    try:
+        table = pa.ipc.open_stream(pa.py_buffer(block.buf)).read_all()
+        values = {name: table.column(name).to_pandas() for name in candidates}
+        del table
+    finally:
+        block.close()
+
+    return {
+        name: ColumnTypeState.from_dict(state).update(values[name]).to_dict()
+        for name, state in candidates.items()
+    }
+
+
+class InferencePool:
+    """
+    Spreads the columns of each chunk over a pool of processes. The chunk is
+    shared once as Arrow buffers instead of pickling a Series per column,
+    and every worker infers a fixed group of columns of it.
+
+    While a chunk is being inferred the next one can be read: infer() only
+    submits it, and merges the previous chunk's results into the states.
+
+    The pool is billiard's, as Celery's prefork workers are daemonic
+    processes, which the standard library does not allow to have children.
+    """
+
+    def __init__(self, processes: int, column_names: List[str]):
+        self.processes = max(min(processes, len(column_names)), 1)
+        self.column_groups = [column_names[pos::self.processes] for pos in range(self.processes)]
+        self.pool = None
+        self._pending = None
+        # Rows submitted but not yet folded into the states
+        self.pending_rows = 0
+
+    def __enter__(self) -> 'InferencePool':
+        self.pool = Pool(processes=self.processes)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        try:
+            if self._pending:
+                self._release(self._pending[0])
+        finally:
+            # Nothing is left to wait for once the last chunk has been merged
+            self.pool.terminate()
+            self.pool.join()
+
+    def infer(self, chunk: pd.DataFrame, states: Dict[str, ColumnTypeState]) -> None:
+        """Submit a chunk, then fold the previously submitted chunk into states."""
+        block = share_frame(chunk)
+        results = [
+            self.pool.apply_async(
+                infer_shared_columns,
+                (block.name, {name: states[name].candidates().to_dict() for name in group})
+            ) for group in self.column_groups
+        ]
+
+        previous, self._pending = self._pending, (block, results)
+        self.pending_rows = len(chunk)
+        if previous:
+            self._merge(states, *previous)
+
+    def finish(self, states: Dict[str, ColumnTypeState]) -> None:
+        """Fold the last submitted chunk into states."""
+        if self._pending:
+            pending, self._pending = self._pending, None
+            self.pending_rows = 0
+            self._merge(states, *pending)
+
+    def _merge(self, states: Dict[str, ColumnTypeState], block: SharedMemory, results: List[ApplyResult]) -> None:
+        try:
+            for result in results:
+                for name, state in result.get().items():
+                    states[name].merge(ColumnTypeState.from_dict(state))
+        finally:
+            self._release(block)
+
+    @staticmethod
+    def _release(block: SharedMemory) -> None:
+        block.close()
+        block.unlink()
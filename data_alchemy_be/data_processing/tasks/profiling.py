@@ -0,0 +1,155 @@
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+from data_processing.tasks.conversion import ConversionEngine, ConversionResult, ConversionValidator
+from utils.sketches import HyperLogLog, TopK
+
+
+class ColumnProfiler:
+    """
+    Mergeable accumulator of the statistics stored in ColumnProfile, fed with
+    batches of a column's stored text values ('' for nulls).
+
+    Parse counts use ConversionEngine, so they agree with what a conversion
+    would accept. A type is only counted while every value parses as it: the
+    first failure rules it out (its count becomes None) and it is never parsed
+    again. A small probe of each batch is tried first so most types are ruled
+    out cheaply, and Float is counted from the Integer parse while every value
+    is an integer, so a column costs about one full parse per batch.
+    """
+
+    PARSED_TYPES = ('Integer', 'Float', 'Datetime', 'Boolean')
+    # Values tried before parsing a whole batch
+    PROBE_SIZE = 100
+
+    def __init__(self):
+        self.total_count = 0
+        self.null_count = 0
+        self.distinct = HyperLogLog()
+        # Exact while at most MAX_CATEGORIES distinct values exist, which is
+        # exactly what the Category checks need
+        self.top_values = TopK(size=ConversionValidator.MAX_CATEGORIES)
+        self.parse_counts: Dict[str, Optional[int]] = {data_type: 0 for data_type in self.PARSED_TYPES}
+        self.numeric_min = self.numeric_max = None
+        self.text_min = self.text_max = None
+
+    @property
+    def non_null_count(self) -> int:
+        return self.total_count - self.null_count
+
+    def update(self, values: pd.Series) -> 'ColumnProfiler':
+        """Fold a batch of stored values into the profile."""
+        text = values.astype(object).where(values.notna(), '').astype(str).str.strip()
+        non_null = text[text != '']
+        self.total_count += len(text)
+        self.null_count += len(text) - len(non_null)
+        if non_null.empty:
+            return self
+
+        self.distinct.update(non_null)
+        self.top_values.update(non_null)
+        self.text_min = min(filter(None, [self.text_min, non_null.min()]))
+        self.text_max = max(filter(None, [self.text_max, non_null.max()]))
+
+        numbers = None
+        for data_type in self.PARSED_TYPES:
+            if self.parse_counts[data_type] is None:
+                continue
+
+            # Every Integer value converts to Float as well
+            if data_type == 'Float' and numbers is not None:
+                self.parse_counts[data_type] += len(non_null)
+                self._update_numeric_range(numbers.min(), numbers.max())
+                continue
+
+            result = self._parse_all(non_null, data_type)
+            if result is None:
+                self.parse_counts[data_type] = None
+                continue
+            self.parse_counts[data_type] += len(non_null)
+
+            if data_type in ('Integer', 'Float'):
+                numbers = pd.to_numeric(result.values).astype(float)
+                if data_type == 'Float':
+                    self._update_numeric_range(numbers.min(), numbers.max())
+
+        return self
+
+    @classmethod
+    def _parse_all(cls, values: pd.Series, data_type: str) -> Optional[ConversionResult]:
+        """Convert values to data_type, or return None as soon as one of them fails."""
+        if len(values) > cls.PROBE_SIZE and ConversionEngine.convert(
+                values.head(cls.PROBE_SIZE), data_type).failed.any():
+            return None
+
+        result = ConversionEngine.convert(values, data_type)
+        return None if result.failed.any() else result
+
+    def merge(self, other: 'ColumnProfiler') -> 'ColumnProfiler':
+        """Combine the profile of another part of the same column into this one."""
+        self.total_count += other.total_count
+        self.null_count += other.null_count
+        self.distinct.merge(other.distinct)
+        self.top_values.merge(other.top_values)
+        for data_type in self.PARSED_TYPES:
+            counts = (self.parse_counts[data_type], other.parse_counts[data_type])
+            self.parse_counts[data_type] = None if None in counts else sum(counts)
+        if other.numeric_min is not None:
+            self._update_numeric_range(other.numeric_min, other.numeric_max)
+        if other.text_min is not None:
+            self.text_min = min(filter(None, [self.text_min, other.text_min]))
+            self.text_max = max(filter(None, [self.text_max, other.text_max]))
+        return self
+
+    def to_fields(self) -> Dict[str, Any]:
+        """ColumnProfile field values for the statistics seen so far."""
+        # Columns of numbers are ranged numerically, anything else lexically
+        numeric = self.non_null_count and self.parse_counts['Float'] == self.non_null_count
+        min_value, max_value = (
+            (self.numeric_min, self.numeric_max) if numeric else (self.text_min, self.text_max)
+        )
+        return {
+            'total_count': self.total_count,
+            'null_count': self.null_count,
+            'distinct_count': min(self.distinct.estimate(), self.non_null_count),
+            'min_value': '' if min_value is None else str(min_value),
+            'max_value': '' if max_value is None else str(max_value),
+            'parse_counts': dict(self.parse_counts),
+            'top_values': self.top_values.most_common(),
+            'top_values_exact': self.top_values.exact,
+            'sketches': {
+                'distinct': self.distinct.to_dict(),
+                'top_values': self.top_values.to_dict(),
+            },
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON safe state, for merging profiles built by other workers."""
+        return {
+            'total_count': self.total_count,
+            'null_count': self.null_count,
+            'distinct': self.distinct.to_dict(),
+            'top_values': self.top_values.to_dict(),
+            'parse_counts': dict(self.parse_counts),
+            'numeric_range': None if self.numeric_min is None else [float(self.numeric_min), float(self.numeric_max)],
+            'text_range': None if self.text_min is None else [self.text_min, self.text_max],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ColumnProfiler':
+        profiler = cls()
+        profiler.total_count = data['total_count']
+        profiler.null_count = data['null_count']
+        profiler.distinct = HyperLogLog.from_dict(data['distinct'])
+        profiler.top_values = TopK.from_dict(data['top_values'])
+        profiler.parse_counts = dict(data['parse_counts'])
+        if data['numeric_range']:
+            profiler.numeric_min, profiler.numeric_max = data['numeric_range']
+        if data['text_range']:
+            profiler.text_min, profiler.text_max = data['text_range']
+        return profiler
+
+    def _update_numeric_range(self, low: float, high: float) -> None:
+        self.numeric_min = low if self.numeric_min is None else min(self.numeric_min, low)
+        self.numeric_max = high if self.numeric_max is None else max(self.numeric_max, high)
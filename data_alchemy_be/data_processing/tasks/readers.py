@@ -0,0 +1,275 @@
+import logging
+from contextlib import closing
+from typing import Iterator, List, Any, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class DatasetFileReader:
+    """
+    Streams an uploaded dataset file as DataFrame chunks of raw string values.
+    Memory use is bounded by the chunk size rather than the file size.
+    """
+
+    def __init__(self, path: str, file_type: str):
+        if file_type not in ('csv', 'xls', 'xlsx'):
+            raise ValueError("Unsupported file format. Please use CSV or Excel.")
+
+        self.path = path
+        self.file_type = file_type
+        self._columns = None
+        self._row_count = None
+        self._has_blank_lines = None
+
+    @property
+    def columns(self) -> List[str]:
+        """Column names as pandas would label them (unnamed and duplicate headers included)."""
+        if self._columns is None:
+            if self.file_type == 'csv':
+                self._columns = pd.read_csv(self.path, nrows=0).columns.tolist()
+            elif self.file_type == 'xlsx':
+                self._columns = self._read_excel_header()
+            else:
+                self._columns = pd.read_excel(self.path, nrows=0).columns.tolist()
+        return self._columns
+
+    def count_rows(self) -> int:
+        """
+        Count data rows with a cheap single-column scan. xlsx sheets report the
+        row count recorded in their dimensions, which may include blank rows.
+        """
+        if self.file_type == 'csv':
+            if self._row_count is None:
+                self._row_count = self._count_csv_records(skip_blank_lines=True)
+            return self._row_count
+        if self.file_type == 'xlsx':
+            max_row = self._read_excel_max_row()
+            if max_row is not None:
+                return max(max_row - 1, 0)
+        return sum(len(chunk) for chunk in self.iter_chunks(100000))
+
+    def has_blank_lines(self) -> bool:
+        """
+        Whether a CSV file has blank lines. pandas skips them when reading
+        rows but counts them when skipping lines, so rows of such files cannot
+        be reached by skipping lines.
+        """
+        if self._has_blank_lines is None:
+            self._has_blank_lines = self._count_csv_records(skip_blank_lines=False) != self.count_rows()
+        return self._has_blank_lines
+
+    def iter_chunks(self, chunk_size: int, start_row: int = 0) -> Iterator[pd.DataFrame]:
+        """
+        Yield consecutive DataFrame chunks of at most chunk_size rows, from
+        start_row on. CSV files without blank lines skip the rows before it
+        without parsing them; other files still stream through them.
+        """
+        if self.file_type == 'csv':
+            yield from self._iter_csv_chunks(chunk_size, start_row)
+            return
+
+        chunks = self._iter_xlsx_chunks(chunk_size) if self.file_type == 'xlsx' else self._iter_xls_chunks(chunk_size)
+        rows_to_skip = start_row
+        for chunk in chunks:
+            if rows_to_skip >= len(chunk):
+                rows_to_skip -= len(chunk)
+                continue
+            yield chunk.iloc[rows_to_skip:]
+            rows_to_skip = 0
+
+    def read_part(self, start_row: int, row_count: int, positions: List[int]) -> pd.DataFrame:
+        """
+        Read row_count rows from start_row, keeping only the columns at the
+        given positions. Only CSV files can be parsed from an offset, and only
+        those without blank lines skip the rows before it unparsed.
+        """
+        if self.file_type != 'csv':
+            raise ValueError("Only CSV files can be read in parts")
+
+        names = [self.columns[pos] for pos in positions]
+        parts, remaining = [], row_count
+        with closing(self._iter_csv_rows(start_row, row_count, positions)) as chunks:
+            for chunk in chunks:
+                parts.append(chunk.iloc[:remaining])
+                remaining -= len(parts[-1])
+                if not remaining:
+                    break
+
+        if not parts:
+            return pd.DataFrame(columns=names, dtype=object)
+        return pd.concat(parts).reindex(columns=positions).set_axis(names, axis=1)
+
+    def sample(
+            self,
+            sample_size: int,
+            head_rows: int,
+            tail_rows: int,
+            chunk_size: int,
+            seed: int = None
+    ) -> Tuple[pd.DataFrame, int]:
+        """
+        Return (sample, total_rows): the first head_rows rows, the last tail_rows
+        rows and a uniform reservoir sample of up to sample_size rows in between.
+        Rows are only parsed, never type-checked, so this is a fast scan.
+        """
+        rng = np.random.default_rng(seed)
+        head, tail, reservoir = [], None, []
+        head_count = offered_count = 0
+
+        for chunk in self.iter_chunks(chunk_size):
+            chunk = chunk.reset_index(drop=True)
+            if head_count < head_rows:
+                head.append(chunk.iloc[:head_rows - head_count])
+                head_count += len(head[-1])
+                chunk = chunk.iloc[len(head[-1]):]
+
+            # Rows leaving the tail window are offered to the reservoir
+            window = chunk if tail is None else pd.concat([tail, chunk], ignore_index=True)
+            split = max(len(window) - tail_rows, 0)
+            tail = window.iloc[split:]
+            offered_count = self._offer_to_reservoir(
+                reservoir, window.iloc[:split].to_numpy(dtype=object), offered_count, sample_size, rng
+            )
+
+        parts = head + ([tail] if tail is not None else [])
+        parts.append(pd.DataFrame(reservoir, columns=self.columns, dtype=object))
+        total_rows = head_count + offered_count + (len(tail) if tail is not None else 0)
+        return pd.concat(parts, ignore_index=True), total_rows
+
+    @staticmethod
+    def _offer_to_reservoir(reservoir: list, records, offered_count: int, sample_size: int, rng) -> int:
+        """Algorithm R, vectorized over a block of records. Returns the updated offered count."""
+        fill = min(max(sample_size - len(reservoir), 0), len(records))
+        reservoir.extend(records[:fill].tolist())
+
+        rest = records[fill:]
+        if len(rest):
+            positions = np.arange(offered_count + fill, offered_count + len(records))
+            slots = rng.integers(0, positions + 1)
+            for idx in np.flatnonzero(slots < sample_size):
+                reservoir[slots[idx]] = rest[idx].tolist()
+
+        return offered_count + len(records)
+
+    def _iter_csv_chunks(self, chunk_size: int, start_row: int = 0) -> Iterator[pd.DataFrame]:
+        if not start_row:
+            with pd.read_csv(self.path, dtype=str, chunksize=chunk_size) as reader:
+                yield from reader
+            return
+
+        for chunk in self._iter_csv_rows(start_row, chunk_size):
+            yield chunk.set_axis(self.columns, axis=1)
+
+    def _iter_csv_rows(self, start_row: int, chunk_size: int, usecols: List[int] = None) -> Iterator[pd.DataFrame]:
+        """
+        Yield chunks of data rows from start_row on, without the header and
+        labelled by column position. The rows before start_row are skipped
+        unparsed unless the file has blank lines, in which case they are
+        streamed through and dropped.
+        """
+        skip_lines = start_row if start_row and not self.has_blank_lines() else 0
+        try:
+            reader = pd.read_csv(
+                self.path, dtype=str, chunksize=chunk_size, header=None,
+                skiprows=skip_lines + 1, usecols=usecols
+            )
+        except pd.errors.EmptyDataError:
+            return
+
+        rows_to_skip = start_row - skip_lines
+        with reader:
+            for chunk in reader:
+                if rows_to_skip >= len(chunk):
+                    rows_to_skip -= len(chunk)
+                    continue
+                yield chunk.iloc[rows_to_skip:]
+                rows_to_skip = 0
+
+    def _count_csv_records(self, skip_blank_lines: bool) -> int:
+        """Count the records after the header with a single-column scan."""
+        return sum(
+            len(chunk) for chunk in pd.read_csv(
+                self.path, usecols=[0], dtype=str, chunksize=100000, skip_blank_lines=skip_blank_lines
+            )
+        )
+
+    def _iter_xlsx_chunks(self, chunk_size: int) -> Iterator[pd.DataFrame]:
+        import openpyxl
+
+        columns = self.columns
+        workbook = openpyxl.load_workbook(self.path, read_only=True, data_only=True)
+        try:
+            sheet = workbook.active
+            buffer = []
+            for row in sheet.iter_rows(min_row=2, values_only=True):
+                values = [self._cell_to_string(value) for value in row[:len(columns)]]
+                if all(value is None for value in values):
+                    continue
+                values.extend([None] * (len(columns) - len(values)))
+                buffer.append(values)
+
+                if len(buffer) == chunk_size:
+                    yield pd.DataFrame(buffer, columns=columns, dtype=object)
+                    buffer = []
+
+            if buffer:
+                yield pd.DataFrame(buffer, columns=columns, dtype=object)
+        finally:
+            workbook.close()
+
+    def _iter_xls_chunks(self, chunk_size: int) -> Iterator[pd.DataFrame]:
+        # openpyxl cannot read the legacy binary format. Those sheets are capped
+        # at 65,536 rows, so reading them in one go stays small.
+        df = pd.read_excel(self.path, dtype=str)
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+
+    def _read_excel_header(self) -> List[str]:
+        import openpyxl
+
+        workbook = openpyxl.load_workbook(self.path, read_only=True, data_only=True)
+        try:
+            header = next(workbook.active.iter_rows(max_row=1, values_only=True), ())
+        finally:
+            workbook.close()
+
+        return self._normalize_headers(header)
+
+    def _read_excel_max_row(self) -> Optional[int]:
+        import openpyxl
+
+        workbook = openpyxl.load_workbook(self.path, read_only=True, data_only=True)
+        try:
+            return workbook.active.max_row
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def _normalize_headers(header) -> List[str]:
+        """Label blank headers and de-duplicate names the same way pandas does."""
+        columns = []
+        seen = {}
+        for pos, name in enumerate(header):
+            name = f"Unnamed: {pos}" if name is None or str(name).strip() == '' else str(name)
+            if name in seen:
+                seen[name] += 1
+                name = f"{name}.{seen[name]}"
+            else:
+                seen[name] = 0
+            columns.append(name)
+
+        # Trailing blank header cells are styling noise, not columns
+        while columns and columns[-1].startswith('Unnamed: '):
+            columns.pop()
+        return columns
+
+    @staticmethod
+    def _cell_to_string(value: Any) -> Optional[str]:
+        if value is None:
+            return None
+        if isinstance(value, float) and value.is_integer():
+            return str(int(value))
+        return str(value)
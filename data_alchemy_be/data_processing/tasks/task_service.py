@@ -1,198 +1,941 @@
 import logging
-import time
-from typing import Dict, Callable, Any, Tuple
+from contextlib import closing, nullcontext
+from typing import Dict, Callable, Any, List, Optional, Tuple
+
 import pandas as pd
-from pandas.core.dtypes.common import is_datetime64_any_dtype, is_numeric_dtype
-from data_processing.models import Dataset, Column, DatasetRow, RowValue
+from django.conf import settings
+from django.db import transaction
+from data_processing.cache import InferenceCache
+from data_processing import metrics
+from data_processing.metrics import count_rows, stage, timed_iter
+from data_processing.models import Dataset, Column, ColumnProfile
+from data_processing.storage import get_storage
+from data_processing.tasks.conversion import ConversionEngine, ConversionFailed, ConversionValidator
+from data_processing.tasks.inference import ColumnTypeState, InferenceCacheMismatch, column_fingerprint, convert_chunk
+from data_processing.tasks.inference_pool import InferencePool
+from data_processing.tasks.profiling import ColumnProfiler
+from data_processing.tasks.readers import DatasetFileReader
+from utils.cpu import available_cpus
 
 logger = logging.getLogger(__name__)
 
 
 class DataProcessingService:
     CHUNK_SIZE = 10000
+    CONVERSION_BATCH_SIZE = 50000
+    # Rows shared with the inference pool at a time; larger chunks amortize the hand-off
+    POOL_CHUNK_SIZE = 50000
+    # Share of the overall progress bar given to the type inference pass
+    INFERENCE_PROGRESS_SHARE = 30
+    INFERENCE_MODES = ('full', 'sample')
+    INGESTION_MODES = ('serial', 'parallel')
 
     @classmethod
     def process_dataset(
             cls,
             dataset: Dataset,
-            progress_callback: Callable = None
+            progress_callback: Callable = None,
+            inference_mode: str = None,
+            checkpoint: Dict[str, Any] = None,
+            checkpoint_callback: Callable[[Dict[str, Any]], None] = None,
+            inference_cache: bool = True
     ) -> Dict[str, Any]:
         """
         Process dataset in chunks to handle large files efficiently.
-        Uses pandas read_csv/read_excel with chunking.
+        The file is streamed through DatasetFileReader so only one chunk of
+        CHUNK_SIZE rows is held in memory at a time.
+
+        Column types are decided by a full inference pass before anything is
+        persisted; the persistence pass then writes every value once, in the
+        representation of its column's final type.
+
+        In 'sample' inference mode types are inferred from a sample instead,
+        values are stored as text, and validate_inferred_types later confirms
+        or corrects each type against the full column.
+
+        Full inference takes the states of columns it has seen before from
+        the InferenceCache and only scans the others; when every column is
+        known the inference pass is skipped. Cached types are checked against
+        every value during the persistence pass instead, and if any does not
+        hold its entry is evicted and the dataset processed again without the
+        cache, so the types are those a full scan decides.
+
+        Both passes hand a checkpoint to checkpoint_callback about every
+        INGESTION_CHECKPOINT_ROWS rows. Given the last checkpoint, processing
+        continues from it: inference from the saved type states, persistence
+        from the first row that was not committed.
         """
+        checkpoint = checkpoint or {}
+        save_checkpoint = checkpoint_callback or (lambda data: None)
+        inference_mode = checkpoint.get('inference_mode') or inference_mode or settings.INFERENCE_MODE
+        retried = False
         try:
-            if dataset.file_type == 'csv':
-                df = pd.read_csv(dataset.file.path)
-            elif dataset.file_type in ('xls', 'xlsx'):
-                df = pd.read_excel(dataset.file.path)
-            else:
-                raise ValueError("Unsupported file format. Please use CSV or Excel.")
-
-            total_columns = len(df.columns)
-            total_rows = len(df)
-            processed_columns = 0
-            overall_progress = 0
-
-            # Create columns first
-            columns_map = {}
-            for pos, col_name in enumerate(df.columns):
-                column = Column.objects.create(
-                    dataset=dataset,
-                    name=col_name,
-                    original_name=col_name,
-                    position=pos,
-                    inferred_type='Text',
-                    current_type='Text'
-                )
-                columns_map[col_name] = column
-
-            # Process data in chunks
-            for start in range(0, len(df), cls.CHUNK_SIZE):
-                end = min(start + cls.CHUNK_SIZE, len(df))
-                chunk = df.iloc[start:end]
-    
-                dataset_rows = [
-                    DatasetRow(
-                        dataset=dataset,
-                        row_index=start + idx
-                    ) for idx in range(len(chunk))
-                ]
-                created_rows = DatasetRow.objects.bulk_create(dataset_rows)
-
-                # Process each column for this chunk
-                for column_name in df.columns:
-                    column = columns_map[column_name]
-                    chunk_series = chunk[column_name]
-                    
-                    converted_chunk, inferred_type = cls._process_column_chunk(
-                        chunk_series, 
-                        column.inferred_type
+            reader = DatasetFileReader(dataset.file.path, dataset.file_type)
+            while True:
+                try:
+                    return cls._ingest_serially(
+                        dataset,
+                        reader,
+                        inference_mode,
+                        progress_callback,
+                        checkpoint,
+                        save_checkpoint,
+                        inference_cache=inference_cache and not retried
                     )
+                except InferenceCacheMismatch as e:
+                    if retried:
+                        raise
+                    cls._discard_cached_types(dataset, reader, e, save_checkpoint)
+                    # Start over once, inferring every column
+                    checkpoint, retried = {}, True
+
+        except Exception as e:
+            logger.error(f"Error processing dataset: {str(e)}")
+            raise Exception(f"Error processing dataset: {str(e)}") from e
+
+    @classmethod
+    def plan_parallel_ingestion(cls, dataset: Dataset) -> Optional[Dict[str, Any]]:
+        """
+        Header and row count stage of a parallel ingestion. The file is split
+        into parts of PARALLEL_INGESTION_PART_ROWS rows by groups of
+        PARALLEL_INGESTION_COLUMN_GROUP_SIZE columns, each of which a worker
+        reads on its own.
+
+        Returns None when the file cannot be split (Excel sheets and CSV files
+        with blank lines can only be streamed from the top) or fits in a
+        single part; those are processed serially.
+        """
+        if dataset.file_type != 'csv':
+            return None
+
+        reader = DatasetFileReader(dataset.file.path, dataset.file_type)
+        if reader.has_blank_lines():
+            return None
+        column_names = reader.columns
+        total_rows = reader.count_rows()
+        part_rows = settings.PARALLEL_INGESTION_PART_ROWS
+        group_size = settings.PARALLEL_INGESTION_COLUMN_GROUP_SIZE
+
+        row_parts = [[start, part_rows] for start in range(0, total_rows, part_rows)]
+        column_groups = [
+            list(range(pos, min(pos + group_size, len(column_names))))
+            for pos in range(0, len(column_names), group_size)
+        ]
+        if len(row_parts) * len(column_groups) <= 1:
+            return None
+
+        return {
+            'column_names': column_names,
+            'total_rows': total_rows,
+            'row_parts': row_parts,
+            'column_groups': column_groups,
+        }
+
+    @classmethod
+    def infer_part_types(
+            cls,
+            dataset: Dataset,
+            start_row: int,
+            row_count: int,
+            positions: List[int]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Type state of each column of one part of the file, as a dict that merges across workers."""
+        reader = DatasetFileReader(dataset.file.path, dataset.file_type)
+        with stage('parse'):
+            part = reader.read_part(start_row, row_count, positions)
+        with stage('inference'):
+            count_rows(len(part))
+            return {
+                col_name: ColumnTypeState().update(part[col_name]).to_dict()
+                for col_name in part.columns
+            }
+
+    @classmethod
+    def create_parallel_columns(
+            cls,
+            dataset: Dataset,
+            column_names: List[str],
+            part_states: List[Dict[str, Dict[str, Any]]]
+    ) -> int:
+        """
+        Merge the type states of every part, create the columns with their
+        final types and prepare the storage rows. Returns the number of rows.
+        """
+        states = {col_name: ColumnTypeState() for col_name in column_names}
+        with stage('inference'):
+            for part in part_states:
+                for col_name, state in part.items():
+                    states[col_name].merge(ColumnTypeState.from_dict(state))
+
+        with stage('create_columns'):
+            cls._create_columns(dataset, column_names, states, 'full', {})
+        total_rows = states[column_names[0]].total_count if column_names else 0
+        with stage('write'):
+            get_storage(dataset).create_rows(total_rows)
+        return total_rows
+
+    @classmethod
+    def persist_part(
+            cls,
+            dataset: Dataset,
+            start_row: int,
+            row_count: int,
+            positions: List[int],
+            progress_callback: Callable[[int], None] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Convert and store one part of the file for the columns at the given
+        positions, in chunks of CHUNK_SIZE rows so storage parts line up with
+        serial ingestion. Returns the profiler state of each column, keyed by column id.
+        """
+        columns = list(dataset.columns.filter(position__in=positions).order_by('position'))
+        reader = DatasetFileReader(dataset.file.path, dataset.file_type)
+        with stage('parse'):
+            part = reader.read_part(start_row, row_count, [column.position for column in columns])
+
+        storage = get_storage(dataset)
+        profilers = {column.name: ColumnProfiler() for column in columns}
+        for offset in range(0, len(part), cls.CHUNK_SIZE):
+            chunk = part.iloc[offset:offset + cls.CHUNK_SIZE]
+            with stage('convert'):
+                converted = pd.DataFrame({
+                    column.name: convert_chunk(chunk[column.name], column.current_type)
+                    for column in columns
+                })
+            with stage('write'):
+                storage.write_columns(start_row + offset, columns, converted)
+                count_rows(len(chunk))
+
+            with stage('profile'):
+                for column in columns:
+                    profilers[column.name].update(storage.to_text(converted[column.name]))
+            if progress_callback:
+                progress_callback(len(chunk) * len(columns))
+
+        return {str(column.id): profilers[column.name].to_dict() for column in columns}
+
+    @classmethod
+    def finish_parallel_ingestion(
+            cls,
+            dataset: Dataset,
+            total_rows: int,
+            part_profiles: List[Dict[str, Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Merge the profiles of every part and record the dataset's row count."""
+        columns = list(dataset.columns.all())
+        profilers = {str(column.id): ColumnProfiler() for column in columns}
+        with stage('profile'):
+            for part in part_profiles:
+                for column_id, profile in part.items():
+                    profilers[column_id].merge(ColumnProfiler.from_dict(profile))
+
+            ColumnProfile.objects.bulk_create([
+                ColumnProfile(column=column, **profilers[str(column.id)].to_fields())
+                for column in columns
+            ])
+        dataset.row_count = total_rows
+        dataset.save(update_fields=['row_count'])
+
+        return {
+            'total_rows': total_rows,
+            'total_columns': len(columns),
+            'inference_mode': 'full',
+            'ingestion_mode': 'parallel'
+        }
+
+    @classmethod
+    @transaction.atomic
+    def clone_dataset(cls, source: Dataset, dataset: Dataset) -> Dict[str, Any]:
+        """
+        Give a dataset the columns, profiles and stored values of an ingested
+        dataset of the same file instead of processing its file. Values are
+        copied within the storage backend and never parsed or inferred.
+        """
+        source_columns = list(source.columns.all())
+        columns = Column.objects.bulk_create([
+            Column(
+                dataset=dataset,
+                name=column.name,
+                original_name=column.original_name,
+                position=column.position,
+                inferred_type=column.inferred_type,
+                current_type=column.current_type,
+                inference_confidence=column.inference_confidence
+            ) for column in source_columns
+        ])
+        cloned = {source_column.id: column for source_column, column in zip(source_columns, columns)}
+
+        profiles = list(ColumnProfile.objects.filter(column__in=source_columns))
+        for profile in profiles:
+            profile.pk = None
+            profile.column = cloned[profile.column_id]
+        ColumnProfile.objects.bulk_create(profiles)
+
+        get_storage(dataset).copy_from(get_storage(source), list(zip(source_columns, columns)), cls.CHUNK_SIZE)
+
+        dataset.row_count = source.row_count
+        dataset.save(update_fields=['row_count'])
+
+        return {
+            'total_rows': dataset.row_count,
+            'total_columns': len(columns),
+            'ingestion_mode': 'clone',
+            'cloned_from': str(source.id)
+        }
+
+    @classmethod
+    def infer_column_types(
+            cls,
+            reader: DatasetFileReader,
+            column_names: List[str],
+            total_rows: int,
+            progress_callback: Callable = None,
+            checkpoint: Dict[str, Any] = None,
+            checkpoint_callback: Callable[[int, Dict[str, ColumnTypeState]], None] = None,
+            cached: Dict[str, ColumnTypeState] = None
+    ) -> Dict[str, ColumnTypeState]:
+        """
+        Scan the file once, accumulating a ColumnTypeState per column. With
+        more than one INFERENCE_PROCESSES the columns of each chunk are
+        inferred across a process pool instead of one after the other.
+        Columns with a cached state are not scanned, nor is the file when
+        every column has one.
+
+        checkpoint_callback receives (next row, states) as the scan goes; an
+        inference checkpoint resumes the scan from its next row.
+        """
+        cached = cached or {}
+        states = {col_name: ColumnTypeState() for col_name in column_names}
+        start_row = 0
+        if checkpoint:
+            states = {col_name: ColumnTypeState.from_dict(checkpoint['states'][col_name]) for col_name in column_names}
+            start_row = checkpoint['next_row']
+        states.update(cached)
+
+        scanned = [col_name for col_name in column_names if col_name not in cached]
+        if not scanned:
+            return states
+
+        processes = settings.INFERENCE_PROCESSES or available_cpus()
+        pool = InferencePool(processes, scanned) if processes > 1 and len(scanned) > 1 else None
+        chunk_size = cls.POOL_CHUNK_SIZE if pool else cls.CHUNK_SIZE
+        processed_rows = checkpointed_rows = start_row
+
+        with pool or nullcontext(), stage('inference'):
+            for chunk in timed_iter('parse', reader.iter_chunks(chunk_size, start_row)):
+                if pool:
+                    pool.infer(chunk, states)
+                else:
+                    for col_name in scanned:
+                        states[col_name].update(chunk[col_name])
+                count_rows(len(chunk))
+
+                processed_rows += len(chunk)
+                # The pool folds a chunk into the states one chunk late
+                merged_rows = processed_rows - (pool.pending_rows if pool else 0)
+                if checkpoint_callback and merged_rows - checkpointed_rows >= settings.INGESTION_CHECKPOINT_ROWS:
+                    with stage('checkpoint'):
+                        checkpoint_callback(merged_rows, states)
+                    checkpointed_rows = merged_rows
 
-                    # Update column type if needed
-                    if column.inferred_type != inferred_type:
-                        column.inferred_type = inferred_type
-                        column.current_type = inferred_type
-                        column.save()
-
-                    row_values = [
-                        RowValue(
-                            dataset_row=created_rows[idx],
-                            column=column,
-                            value=str(value) if pd.notna(value) else ''
-                        ) for idx, value in enumerate(converted_chunk)
-                    ]
-                    
-                    RowValue.objects.bulk_create(row_values, batch_size=1000)
-
-                    # Calculate progress
-                    chunk_progress = (end / total_rows) * 100
-                    overall_progress = (processed_columns * 100 + chunk_progress) / total_columns
-
-                    if progress_callback:
-                        progress_callback(
-                            progress={
-                                'total_rows': total_rows,
-                                'processed_rows': end,
-                                'progress': round(overall_progress, 2),
-                            },
-                            stage='Processing column data'
-                        )
-                    processed_columns += 1
-
-                overall_progress = (processed_columns / total_columns) * 100
-
-                # Report completion of column
                 if progress_callback:
                     progress_callback(
                         progress={
                             'total_rows': total_rows,
-                            'processed_rows': total_rows,
-                            'progress': round(overall_progress, 2),
+                            'processed_rows': processed_rows,
+                            'progress': round(
+                                min(processed_rows / total_rows, 1) * cls.INFERENCE_PROGRESS_SHARE, 2
+                            ) if total_rows else 0,
                         },
-                        stage='Column processing complete'
+                        stage='Inferring column types'
                     )
 
+            if pool:
+                pool.finish(states)
 
-            return {
-                'total_rows': total_rows,
-                'total_columns': total_columns
+        return states
+
+    @classmethod
+    def sample_column_types(
+            cls,
+            reader: DatasetFileReader,
+            column_names: List[str]
+    ) -> Tuple[Dict[str, ColumnTypeState], int]:
+        """Infer column types from head/tail rows plus a reservoir sample. Returns (states, total_rows)."""
+        with stage('parse'):
+            sample, total_rows = reader.sample(
+                sample_size=settings.INFERENCE_SAMPLE_SIZE,
+                head_rows=settings.INFERENCE_HEAD_ROWS,
+                tail_rows=settings.INFERENCE_TAIL_ROWS,
+                chunk_size=cls.CHUNK_SIZE
+            )
+        with stage('inference'):
+            states = {
+                col_name: ColumnTypeState().update(sample[col_name])
+                for col_name in column_names
             }
+            count_rows(len(sample))
+        return states, total_rows
 
-        except Exception as e:
-            logger.error(f"Error processing dataset: {str(e)}")
-            raise Exception(f"Error processing dataset: {str(e)}")
+    @classmethod
+    def fingerprint_columns(cls, reader: DatasetFileReader, column_names: List[str]) -> Dict[str, str]:
+        """Fingerprints of columns from the first INFERENCE_CACHE_SAMPLE_ROWS rows; none when the cache is off."""
+        if not settings.INFERENCE_CACHE_ENABLED:
+            return {}
+        with stage('inference_cache'), closing(reader.iter_chunks(settings.INFERENCE_CACHE_SAMPLE_ROWS)) as chunks:
+            head = next(chunks, None)
+        if head is None:
+            return {}
+        return {col_name: column_fingerprint(col_name, head[col_name]) for col_name in column_names}
+
+    @staticmethod
+    def cached_column_types(fingerprints: Dict[str, str]) -> Dict[str, ColumnTypeState]:
+        """Type states of the columns whose fingerprint is in the inference cache."""
+        with stage('inference_cache'):
+            found = InferenceCache.get_many(sorted(set(fingerprints.values())))
+        return {
+            col_name: ColumnTypeState.from_dict(found[fingerprint])
+            for col_name, fingerprint in fingerprints.items() if fingerprint in found
+        }
 
-        
     @staticmethod
-    def _process_column_chunk(chunk: pd.Series, current_type: str) -> Tuple[pd.Series, str]:
-        """Process a chunk of data for a column, returning converted data and inferred type."""
-        # Skip if already numeric or datetime
-        if current_type != 'Text' and (is_numeric_dtype(chunk) or is_datetime64_any_dtype(chunk)):
-            return chunk, current_type
-
-        # Clean and normalize the chunk
-        normalized_chunk = DataProcessingService._normalize_values(chunk)
-
-        # Handle all null case
-        if chunk.isna().all():
-            return chunk, 'Text'
-
-        # Try boolean conversion first
-        if chunk.dtype == 'object':
-            unique_values = normalized_chunk.dropna().unique()
-            boolean_values = {'true', 'false', 'yes', 'no', '1', '0', 't', 'f', 'y', 'n'}
-            if len(unique_values) <= 2 and set(map(str, unique_values)).issubset(boolean_values):
-                converted = normalized_chunk.map(
-                    lambda x: True if str(x).lower() in {'true', 'yes', '1', 't', 'y'}
-                    else False if str(x).lower() in {'false', 'no', '0', 'f', 'n'}
-                    else None
+    def _sample_confidence(state: ColumnTypeState, total_rows: int) -> float:
+        """
+        Lower bound, at INFERENCE_CONFIDENCE_LEVEL, of the share of a column's
+        values consistent with its sampled type. n sampled values with no
+        counter-example give (1 - level) ** (1 / n); a sample covering the
+        whole column is certain.
+        """
+        if state.total_count >= total_rows:
+            return 1.0
+
+        non_null = state.non_null_count
+        if non_null == 0:
+            return 0.0
+        if state.resolve() == 'Text':
+            return 1.0
+        return round((1 - settings.INFERENCE_CONFIDENCE_LEVEL) ** (1 / non_null), 4)
+
+    @classmethod
+    def validate_inferred_types(
+            cls,
+            dataset: Dataset,
+            progress_callback: Callable = None
+    ) -> Dict[str, Any]:
+        """
+        Check sampled column types against every stored value. Each type is
+        confirmed or replaced by the type the full column supports, and the
+        column's text values are converted to it unless the user already
+        changed the column type.
+        """
+        storage = get_storage(dataset)
+        columns = list(dataset.columns.filter(inference_confidence__lt=1))
+        results = {}
+
+        for position, column in enumerate(columns, start=1):
+            state = ColumnTypeState()
+            for batch in timed_iter('read', storage.iter_column(column, cls.CHUNK_SIZE)):
+                with stage('inference'):
+                    state.update(batch['value'].where(batch['value'] != ''))
+                    count_rows(len(batch))
+
+            sampled_type, validated_type = column.inferred_type, state.resolve()
+            converted_column = column.current_type == 'Text' and validated_type != 'Text'
+            if converted_column:
+                profiler = ColumnProfiler()
+                for batch in timed_iter('read', storage.iter_column(column, cls.CHUNK_SIZE)):
+                    with stage('convert'):
+                        raw_values = batch['value'].where(batch['value'] != '')
+                        converted = storage.to_text(convert_chunk(raw_values, validated_type))
+                        count_rows(len(batch))
+                    with stage('write'):
+                        storage.update_column(column, converted)
+                    with stage('profile'):
+                        profiler.update(converted)
+                column.current_type = validated_type
+                cls._save_profile(column, profiler)
+
+            column.inferred_type = validated_type
+            column.inference_confidence = 1.0
+            column.save(update_fields=['inferred_type', 'current_type', 'inference_confidence'])
+
+            results[column.name] = {
+                'sampled_type': sampled_type,
+                'validated_type': validated_type,
+                'confirmed': sampled_type == validated_type,
+                'converted': converted_column
+            }
+
+            if progress_callback:
+                progress_callback(
+                    progress={
+                        'total_columns': len(columns),
+                        'processed_columns': position,
+                        'progress': round(position / len(columns) * 100, 2),
+                    },
+                    stage='Validating column types'
                 )
-                return converted, 'Boolean'
 
-        # Try numeric conversion
-        try:
-            cleaned_chunk = DataProcessingService._clean_numeric_string(chunk)
-            numeric_chunk = pd.to_numeric(cleaned_chunk, errors='raise')
+        return {'columns': results}
 
-            # Check if it should be integer
-            if numeric_chunk.dropna().apply(lambda x: float(x).is_integer()).all():
-                return numeric_chunk.astype('Int64'), 'Integer'
-            return numeric_chunk, 'Float'
-        except (ValueError, TypeError):
-            pass
+    @classmethod
+    def convert_column(
+            cls,
+            column: Column,
+            target_type: str,
+            dry_run: bool = False,
+            progress_callback: Callable = None
+    ) -> Dict[str, Any]:
+        """
+        Validate and convert a column in a single streaming pass. Each batch is
+        converted once; the result both feeds the validator and, while no value
+        has failed, is written through the storage's rewrite_column so nothing
+        becomes visible unless the whole column converts.
 
-        # Try datetime conversion
-        try:
-            datetime_chunk = pd.to_datetime(chunk, errors='raise')
-            return datetime_chunk, 'Datetime'
-        except (ValueError, TypeError):
-            pass
+        A dry run only validates. Raises ConversionFailed when any value (or,
+        for Category, the column as a whole) cannot be converted.
+        """
+        if target_type not in ConversionEngine.SUPPORTED_TYPES:
+            raise ValueError(f"Unsupported target type: {target_type}")
+
+        storage = get_storage(column.dataset)
+        total_values = storage.count_rows()
+        validator = ConversionValidator(target_type)
+        profiler = ColumnProfiler()
+
+        with (nullcontext() if dry_run else storage.rewrite_column(column)) as write:
+            for batch in timed_iter('read', storage.iter_column(column, cls.CONVERSION_BATCH_SIZE)):
+                with stage('convert'):
+                    converted = ConversionEngine.convert(batch['value'], target_type)
+                    validator.update(batch['value'], batch['row_index'], converted)
+                    count_rows(len(batch))
+
+                # Keep scanning after a failure to report how many values fail
+                if write and validator.failed_count == 0:
+                    with stage('write'):
+                        write(converted.values)
+                    with stage('profile'):
+                        profiler.update(converted.values)
+
+                if progress_callback:
+                    progress_callback(
+                        progress={
+                            'total_values': total_values,
+                            'processed_values': validator.total_count,
+                            'progress': round(
+                                min(validator.total_count / total_values, 1) * 100, 2
+                            ) if total_values else 100,
+                        },
+                        stage='Validating values' if dry_run else 'Converting values'
+                    )
+
+            if not validator.is_valid:
+                raise ConversionFailed(validator)
+
+        if not dry_run:
+            column.current_type = target_type
+            column.save(update_fields=['current_type'])
+            cls._save_profile(column, profiler)
+
+        return {**validator.to_dict(), 'dry_run': dry_run}
 
-        # Check for categorical
-        unique_count = normalized_chunk.dropna().nunique()
-        total_count = len(normalized_chunk.dropna())
+    @classmethod
+    def plan_conversion_partitions(cls, column: Column) -> Optional[List[List[Optional[int]]]]:
+        """
+        Row ranges of CONVERSION_PARTITION_ROWS rows to convert a column in
+        parallel, the last one open ended. None when one task is enough.
+        """
+        partition_rows = settings.CONVERSION_PARTITION_ROWS
+        total_rows = column.dataset.row_count or get_storage(column.dataset).count_rows()
+        if not partition_rows or total_rows <= partition_rows:
+            return None
+
+        starts = list(range(0, total_rows, partition_rows))
+        return [[start, stop] for start, stop in zip(starts, starts[1:] + [None])]
+
+    @classmethod
+    def convert_partition(
+            cls,
+            column: Column,
+            target_type: str,
+            start_row: int,
+            stop_row: Optional[int],
+            stage: Optional[str] = None,
+            progress_callback: Callable[[int], None] = None
+    ) -> Dict[str, Any]:
+        """
+        Validate one row range of a column and, given a stage, write its
+        converted values there while none has failed. Returns the validator
+        and profiler states to merge with the other partitions.
+        """
+        storage = get_storage(column.dataset)
+        validator = ConversionValidator(target_type)
+        profiler = ColumnProfiler()
+        write = storage.stage_writer(column, stage) if stage else None
+
+        batches = storage.iter_column_range(column, start_row, stop_row, cls.CONVERSION_BATCH_SIZE)
+        for batch in timed_iter('read', batches):
+            with metrics.stage('convert'):
+                converted = ConversionEngine.convert(batch['value'], target_type)
+                validator.update(batch['value'], batch['row_index'], converted)
+                count_rows(len(batch))
+
+            if write and validator.failed_count == 0:
+                with metrics.stage('write'):
+                    write(converted.values)
+                with metrics.stage('profile'):
+                    profiler.update(converted.values)
+            if progress_callback:
+                progress_callback(len(batch))
+
+        return {'validator': validator.state_dict(), 'profile': profiler.to_dict()}
+
+    @classmethod
+    def finish_partitioned_conversion(
+            cls,
+            column: Column,
+            target_type: str,
+            partitions: List[Dict[str, Any]],
+            stage: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Merge the partitions' outcomes and, when every value converted, commit
+        the stage and flip the column type; otherwise drop the stage and raise
+        ConversionFailed. Without a stage this is a dry run.
+        """
+        validator = ConversionValidator(target_type)
+        profiler = ColumnProfiler()
+        with metrics.stage('convert'):
+            for partition in partitions:
+                validator.merge(ConversionValidator.from_state_dict(partition['validator']))
+                profiler.merge(ColumnProfiler.from_dict(partition['profile']))
+
+        storage = get_storage(column.dataset)
+        if not validator.is_valid:
+            if stage:
+                storage.discard_stage(column, stage)
+            raise ConversionFailed(validator)
+
+        if stage:
+            with metrics.stage('write'):
+                storage.commit_stage(column, stage)
+                column.current_type = target_type
+                column.save(update_fields=['current_type'])
+            with metrics.stage('profile'):
+                cls._save_profile(column, profiler)
+
+        return {**validator.to_dict(), 'dry_run': stage is None, 'partitions': len(partitions)}
+
+    @classmethod
+    def _ingest_serially(
+            cls,
+            dataset: Dataset,
+            reader: DatasetFileReader,
+            inference_mode: str,
+            progress_callback: Optional[Callable],
+            checkpoint: Dict[str, Any],
+            save_checkpoint: Callable[[Dict[str, Any]], None],
+            inference_cache: bool
+    ) -> Dict[str, Any]:
+        """
+        One attempt at process_dataset. Raises InferenceCacheMismatch as soon
+        as a value does not fit a type taken from the InferenceCache.
+        """
+        if checkpoint.get('stage') == 'persist':
+            columns = list(dataset.columns.order_by('position'))
+        else:
+            columns, checkpoint = cls._create_typed_columns(
+                dataset, reader, inference_mode, progress_callback, checkpoint, save_checkpoint, inference_cache
+            )
+        verified = cls._verified_states(checkpoint)
 
-        if (total_count >= 30 and
-                unique_count <= 10 and
-                unique_count < 0.2 * total_count and
-                total_count >= unique_count * 3):
-            return chunk.astype('category'), 'Category'
+        dataset.row_count = cls._persist_rows(
+            dataset,
+            reader,
+            columns,
+            checkpoint['total_rows'],
+            progress_callback,
+            start_row=checkpoint['next_row'],
+            checkpoint_callback=lambda next_row: save_checkpoint({
+                **checkpoint,
+                'next_row': next_row,
+                'verified_states': {col_name: state.to_dict() for col_name, state in verified.items()},
+            }),
+            verified=verified
+        )
+        dataset.save(update_fields=['row_count'])
 
-        # Default to text
-        return chunk, 'Text'
+        if verified:
+            with stage('inference_cache'):
+                fingerprints = cls.fingerprint_columns(reader, list(verified))
+                InferenceCache.set_many({
+                    fingerprints[col_name]: state.to_dict()
+                    for col_name, state in verified.items() if col_name in fingerprints
+                })
+
+        return {
+            'total_rows': checkpoint['total_rows'],
+            'total_columns': len(columns),
+            'inference_mode': inference_mode,
+            'ingestion_mode': 'serial',
+            'cached_columns': len(verified)
+        }
+
+    @classmethod
+    def _discard_cached_types(
+            cls,
+            dataset: Dataset,
+            reader: DatasetFileReader,
+            mismatch: InferenceCacheMismatch,
+            save_checkpoint: Callable[[Dict[str, Any]], None]
+    ) -> None:
+        """Evict the cached types that did not fit and drop everything stored with them."""
+        logger.warning(f"Inferring the types of dataset {dataset.id} again: {str(mismatch)}")
+        fingerprints = cls.fingerprint_columns(reader, mismatch.columns)
+        InferenceCache.evict(list(fingerprints.values()))
+        with stage('write'), transaction.atomic():
+            get_storage(dataset).delete()
+            dataset.columns.all().delete()
+            save_checkpoint(None)
+
+    @classmethod
+    def _create_typed_columns(
+            cls,
+            dataset: Dataset,
+            reader: DatasetFileReader,
+            inference_mode: str,
+            progress_callback: Optional[Callable],
+            checkpoint: Dict[str, Any],
+            save_checkpoint: Callable[[Dict[str, Any]], None],
+            inference_cache: bool
+    ) -> Tuple[List[Column], Dict[str, Any]]:
+        """
+        Decide the column types, resuming an interrupted inference pass from
+        its checkpoint, and create the columns. Returns them with the
+        checkpoint the persistence pass starts from.
+        """
+        column_names = reader.columns
+        if inference_mode == 'sample':
+            states, total_rows = cls.sample_column_types(reader, column_names)
+            confidences = {
+                col_name: cls._sample_confidence(states[col_name], total_rows)
+                for col_name in column_names
+            }
+            cached_columns = []
+        else:
+            states, total_rows, cached_columns = cls._infer_full_column_types(
+                reader, column_names, progress_callback, checkpoint, save_checkpoint, inference_cache
+            )
+            confidences = {}
+
+        # Columns and the checkpoint that refers to them are committed together
+        with stage('create_columns'), transaction.atomic():
+            columns = cls._create_columns(dataset, column_names, states, inference_mode, confidences)
+            checkpoint = {
+                'stage': 'persist',
+                'inference_mode': inference_mode,
+                'total_rows': total_rows,
+                'next_row': 0,
+                'cached_columns': cached_columns,
+            }
+            save_checkpoint(checkpoint)
+        return columns, checkpoint
+
+    @classmethod
+    def _infer_full_column_types(
+            cls,
+            reader: DatasetFileReader,
+            column_names: List[str],
+            progress_callback: Optional[Callable],
+            checkpoint: Dict[str, Any],
+            save_checkpoint: Callable[[Dict[str, Any]], None],
+            inference_cache: bool
+    ) -> Tuple[Dict[str, ColumnTypeState], int, List[str]]:
+        """
+        Full inference pass. Columns found in the InferenceCache are not
+        scanned; their names are returned so the persistence pass checks them.
+        Given an 'inference' checkpoint, the pass continues from it with the
+        cached columns it started with.
+        """
+        estimated_rows = reader.count_rows()
+        fingerprints = cls.fingerprint_columns(reader, column_names)
+        resuming = checkpoint.get('stage') == 'inference'
+        if resuming:
+            cached_columns = checkpoint.get('cached_columns', [])
+            cached = {
+                col_name: ColumnTypeState.from_dict(checkpoint['states'][col_name])
+                for col_name in cached_columns
+            }
+        else:
+            cached = cls.cached_column_types(fingerprints) if inference_cache else {}
+            cached_columns = sorted(cached)
+
+        states = cls.infer_column_types(
+            reader,
+            column_names,
+            estimated_rows,
+            progress_callback,
+            checkpoint=checkpoint if resuming else None,
+            checkpoint_callback=lambda next_row, current: save_checkpoint({
+                'stage': 'inference',
+                'inference_mode': 'full',
+                'next_row': next_row,
+                'states': {col_name: state.to_dict() for col_name, state in current.items()},
+                'cached_columns': cached_columns,
+            }),
+            cached=cached
+        )
+        scanned = [col_name for col_name in column_names if col_name not in cached]
+        total_rows = states[scanned[0]].total_count if scanned else estimated_rows
+
+        with stage('inference_cache'):
+            InferenceCache.set_many({
+                fingerprints[col_name]: states[col_name].to_dict()
+                for col_name in scanned if col_name in fingerprints
+            })
+        return states, total_rows, cached_columns
 
     @staticmethod
-    def _normalize_values(chunk):
-        """Normalize string values by stripping whitespace and converting to lowercase"""
-        if chunk.dtype == 'object':
-            return chunk.str.strip().str.lower()
-        return chunk
+    def _verified_states(checkpoint: Dict[str, Any]) -> Dict[str, ColumnTypeState]:
+        """
+        States of the columns whose types came from the InferenceCache, with
+        the values the persistence pass already checked against them.
+        """
+        verified = {col_name: ColumnTypeState() for col_name in checkpoint.get('cached_columns', [])}
+        verified.update({
+            col_name: ColumnTypeState.from_dict(state)
+            for col_name, state in checkpoint.get('verified_states', {}).items()
+        })
+        return verified
+
+    @classmethod
+    def _persist_rows(
+            cls,
+            dataset: Dataset,
+            reader: DatasetFileReader,
+            columns: List[Column],
+            total_rows: int,
+            progress_callback: Callable = None,
+            start_row: int = 0,
+            checkpoint_callback: Callable[[int], None] = None,
+            verified: Dict[str, ColumnTypeState] = None
+    ) -> int:
+        """
+        Stream the file again, converting each chunk to its final types before
+        storing it. Returns the number of rows stored.
+
+        Storing starts at start_row, after discarding anything an interrupted
+        attempt stored from there on, so every chunk can be written again.
+        checkpoint_callback receives the next row to store as chunks commit.
+
+        Columns whose types came from the inference cache have their stored
+        values folded into the states in verified, covering the rows before
+        start_row already. InferenceCacheMismatch is raised as soon as
+        converting one of them turns a value into a null, or at the end when
+        a state resolves to another type than the column's.
+        """
+        verified = verified if verified is not None else {}
+        storage = get_storage(dataset)
+        with stage('write'):
+            storage.delete_rows_from(start_row)
+
+        # Profiles of the rows already stored are rebuilt from storage
+        profilers = {column.name: ColumnProfiler() for column in columns}
+        if start_row:
+            with stage('profile'):
+                for column in columns:
+                    for batch in storage.iter_column_range(column, 0, start_row, cls.CONVERSION_BATCH_SIZE):
+                        profilers[column.name].update(batch['value'])
+
+        processed_rows = checkpointed_rows = start_row
+        for chunk in timed_iter('parse', reader.iter_chunks(cls.CHUNK_SIZE, start_row)):
+            with stage('convert'):
+                converted = cls._convert_chunk(chunk, columns, verified)
+            with stage('inference'):
+                for col_name, state in verified.items():
+                    state.update(chunk[col_name])
+            with stage('write'):
+                storage.write_chunk(processed_rows, columns, converted)
+                count_rows(len(chunk))
+
+            # Profile the values as stored, which is what conversions later read
+            with stage('profile'):
+                for column in columns:
+                    profilers[column.name].update(storage.to_text(converted[column.name]))
+
+            processed_rows += len(chunk)
+            if checkpoint_callback and processed_rows - checkpointed_rows >= settings.INGESTION_CHECKPOINT_ROWS:
+                with stage('checkpoint'):
+                    checkpoint_callback(processed_rows)
+                checkpointed_rows = processed_rows
+
+            if progress_callback:
+                share = 100 - cls.INFERENCE_PROGRESS_SHARE
+                progress_callback(
+                    progress={
+                        'total_rows': total_rows,
+                        'processed_rows': processed_rows,
+                        'progress': round(
+                            cls.INFERENCE_PROGRESS_SHARE + processed_rows / total_rows * share, 2
+                        ) if total_rows else 100,
+                    },
+                    stage='Processing column data'
+                )
+
+        # Cached types only stand if every stored value leads to the same type
+        mismatched = [
+            column.name for column in columns
+            if column.name in verified and verified[column.name].resolve() != column.inferred_type
+        ]
+        if mismatched:
+            raise InferenceCacheMismatch(mismatched)
+
+        with stage('profile'), transaction.atomic():
+            ColumnProfile.objects.filter(column__in=columns).delete()
+            ColumnProfile.objects.bulk_create([
+                ColumnProfile(column=column, **profilers[column.name].to_fields())
+                for column in columns
+            ])
+        return processed_rows
+
+    @staticmethod
+    def _convert_chunk(chunk: pd.DataFrame, columns: List[Column], verified: Dict[str, ColumnTypeState]) -> pd.DataFrame:
+        """Convert a chunk to its columns' types, checking that cached types lose no value."""
+        converted = {}
+        for column in columns:
+            values = chunk[column.name]
+            try:
+                converted[column.name] = convert_chunk(values, column.current_type)
+            except (TypeError, ValueError):
+                # Integer casts raise on fractions
+                if column.name in verified:
+                    raise InferenceCacheMismatch([column.name])
+                raise
+            if column.name in verified and (converted[column.name].isna() & values.notna()).any():
+                raise InferenceCacheMismatch([column.name])
+        return pd.DataFrame(converted)
+
+    @staticmethod
+    def _create_columns(
+            dataset: Dataset,
+            column_names: List[str],
+            states: Dict[str, ColumnTypeState],
+            inference_mode: str,
+            confidences: Dict[str, float]
+    ) -> List[Column]:
+        """Create columns with their final (or, when sampled, proposed) types."""
+        return Column.objects.bulk_create([
+            Column(
+                dataset=dataset,
+                name=col_name,
+                original_name=col_name,
+                position=pos,
+                inferred_type=states[col_name].resolve(),
+                current_type=states[col_name].resolve() if inference_mode == 'full' else 'Text',
+                inference_confidence=confidences.get(col_name)
+            ) for pos, col_name in enumerate(column_names)
+        ])
 
     @staticmethod
-    def _clean_numeric_string(chunk):
-        """Clean numeric strings by removing commas"""
-        if chunk.dtype == 'object':
-            return chunk.str.replace(',', '')
-        return chunk
\ No newline at end of file
+    def _save_profile(column: Column, profiler: ColumnProfiler) -> None:
+        ColumnProfile.objects.update_or_create(column=column, defaults=profiler.to_fields())
@@ -1,36 +1,87 @@
+import os
 import time
+from pathlib import Path
 
 import pandas as pd
-from celery import shared_task
+from celery import chord, shared_task
+from celery.exceptions import Ignore, SoftTimeLimitExceeded
+from django.conf import settings
+from django.db import InterfaceError, OperationalError, transaction
 from django.utils import timezone
 import logging
-from typing import Dict, Any
-from data_processing.models import Dataset, ProcessingJob, Column, RowValue
+from typing import Dict, Any, List, Optional
+from uuid import uuid4
+from redis import RedisError
+from data_processing.cache import DatasetPageCache
+from data_processing.exporters import DatasetExporter
+from data_processing.metrics import JobMetrics, count_rows, stage
+from data_processing.models import Dataset, ProcessingJob, Column
+from data_processing.profiler import JobProfiler
+from data_processing.progress import TaskProgress
+from data_processing.storage import get_storage
 from data_processing.tasks.task_service import DataProcessingService
-from utils.helpers import convert_to_integer, convert_to_float, convert_to_datetime, convert_to_boolean, \
-    convert_to_category
+from data_processing.tasks.conversion import ConversionFailed
+from utils.redis_client import RedisClient
 
 logger = logging.getLogger(__name__)
 
+JOB_PROGRESS_KEY = 'job-progress:{job_id}'
+JOB_PROGRESS_TTL = 24 * 60 * 60
 
-@shared_task(bind=True, max_retries=3, soft_time_limit=3600)
-def process_dataset_task(self, dataset_id: str, job_id: str) -> Dict[str, Any]:
+# Failures after which an ingestion is retried from its last checkpoint
+RETRYABLE_INGESTION_ERRORS = (SoftTimeLimitExceeded, OperationalError, InterfaceError)
+INGESTION_RETRY_DELAY = 30
+
+
+@shared_task(
+    bind=True,
+    max_retries=3,
+    soft_time_limit=3600,
+    acks_late=True,
+    reject_on_worker_lost=True,
+    name='data_processing.tasks.process_dataset_task'
+)
+def process_dataset_task(
+        self,
+        dataset_id: str,
+        job_id: str,
+        inference_mode: str = None,
+        ingestion_mode: str = None,
+        profile: str = None
+) -> Dict[str, Any]:
     """
     Process dataset with progress tracking.
     Soft time limit: 1 hour
+
+    In 'parallel' ingestion mode the task is replaced by a chord of part
+    tasks on the data_processing queue (see _start_parallel_ingestion),
+    which keeps reporting progress and the final result under this task's id.
+
+    With profile (or PROFILER_MODE) set, serial ingestion runs under a
+    JobProfiler and its profile is stored as an artifact of the job. Parallel
+    ingestion is spread over many workers and is not profiled; the job's
+    metrics still time each of its stages.
+
+    Serial ingestion checkpoints the job as it goes. The task is acknowledged
+    only once it finishes, so a lost worker, a soft time limit or a dropped
+    database connection retries it from the last checkpoint.
     """
 
     dataset = Dataset.objects.filter(id=dataset_id).last()
 
     job = ProcessingJob.objects.filter(id=job_id).last()
     job.status = 'RUNNING'
-    job.started_at = timezone.now()
+    job.started_at = job.started_at or timezone.now()
     job.save()
 
+    def save_checkpoint(checkpoint: Dict[str, Any]) -> None:
+        job.checkpoint = checkpoint
+        ProcessingJob.objects.filter(id=job.id).update(checkpoint=checkpoint)
+
     try:
         # Update initial status
-        self.update_state(
-            state='PROGRESS',
+        TaskProgress.report(
+            self,
             meta={
                 'progress': 0,
                 'current_stage': 'Starting dataset processing',
@@ -39,24 +90,52 @@ def process_dataset_task(self, dataset_id: str, job_id: str) -> Dict[str, Any]:
             }
         )
 
+        if (ingestion_mode or settings.INGESTION_MODE) == 'parallel' and not job.checkpoint:
+            plan = DataProcessingService.plan_parallel_ingestion(dataset)
+            if plan:
+                raise self.replace(_start_parallel_ingestion(self, dataset_id, job, plan))
+
         # Start processing
-        result = DataProcessingService.process_dataset(
-            dataset=dataset,
-            progress_callback=lambda progress, stage: self.update_state(
-                state='PROGRESS',
-                meta={
-                    'progress': progress['progress'],
-                    'current_stage': stage,
-                    'processed_rows': progress['processed_rows'],
-                    'total_rows': progress['total_rows']
-                }
+        with JobProfiler.for_job(job, profile), JobMetrics(job.job_type) as metrics:
+            result = DataProcessingService.process_dataset(
+                dataset=dataset,
+                progress_callback=lambda progress, stage: TaskProgress.report(
+                    self,
+                    meta={
+                        'progress': progress['progress'],
+                        'current_stage': stage,
+                        'processed_rows': progress['processed_rows'],
+                        'total_rows': progress['total_rows']
+                    }
+                ),
+                inference_mode=inference_mode,
+                checkpoint=job.checkpoint,
+                checkpoint_callback=save_checkpoint
             )
-        )
+        result['metrics'] = metrics.to_dict()
+
+        DatasetPageCache.invalidate(dataset.id)
+
+        # Typed indexes are built in the background so the dataset is usable right away
+        index_columns_task.delay(str(dataset.id))
+
+        # Sampled types are confirmed against the full columns in the background
+        if result.get('inference_mode') == 'sample':
+            validation_job = ProcessingJob.objects.create(
+                dataset=dataset,
+                job_type='VALIDATION',
+                status='QUEUED'
+            )
+            validation_task = validate_column_types_task.delay(str(dataset.id), str(validation_job.id))
+            validation_job.celery_task_id = validation_task.id
+            validation_job.save()
+            result['validation_task_id'] = validation_task.id
 
         # Update job status
         job.status = 'COMPLETED'
         job.completed_at = timezone.now()
         job.result = result
+        job.checkpoint = None
         job.save()
 
         return {
@@ -66,7 +145,17 @@ def process_dataset_task(self, dataset_id: str, job_id: str) -> Dict[str, Any]:
             'columns_processed': result.get('total_columns', 0)
         }
 
+    except Ignore:
+        raise
+
     except Exception as e:
+        retryable = isinstance(e, RETRYABLE_INGESTION_ERRORS) or isinstance(e.__cause__, RETRYABLE_INGESTION_ERRORS)
+        if retryable and self.request.retries < self.max_retries:
+            logger.warning(f"Retrying dataset {dataset_id} from its last checkpoint: {str(e)}")
+            job.status = 'QUEUED'
+            job.save()
+            raise self.retry(exc=e, countdown=INGESTION_RETRY_DELAY)
+
         logger.error(f"Error processing dataset {dataset_id}: {str(e)}")
         job.status = 'FAILED'
         job.error_message = str(e)
@@ -75,107 +164,613 @@ def process_dataset_task(self, dataset_id: str, job_id: str) -> Dict[str, Any]:
         raise
 
 
+@shared_task(bind=True, name='data_processing.tasks.clone_dataset_task')
+def clone_dataset_task(self, source_id: str, dataset_id: str, job_id: str) -> Dict[str, Any]:
+    """
+    Complete the ingestion of a re-uploaded file by copying an earlier
+    dataset of the same content. Should that dataset have been deleted in
+    the meantime, the task is replaced by processing the file.
+    """
+    dataset = Dataset.objects.filter(id=dataset_id).last()
+    source = Dataset.objects.filter(id=source_id).last()
+    if source is None:
+        logger.info(f"Dataset {source_id} is gone, processing dataset {dataset_id} from its file")
+        raise self.replace(process_dataset_task.si(dataset_id, job_id))
+
+    job = ProcessingJob.objects.filter(id=job_id).last()
+    job.status = 'RUNNING'
+    job.started_at = timezone.now()
+    job.save()
+
+    try:
+        TaskProgress.report(
+            self,
+            meta={
+                'progress': 0,
+                'current_stage': 'Copying dataset',
+                'processed_rows': 0,
+                'total_rows': source.row_count
+            }
+        )
+
+        with JobMetrics(job.job_type) as metrics, stage('write'), transaction.atomic():
+            result = DataProcessingService.clone_dataset(source, dataset)
+            count_rows(result['total_rows'])
+        result['metrics'] = metrics.to_dict()
+
+        index_columns_task.delay(str(dataset.id))
+
+        job.status = 'COMPLETED'
+        job.completed_at = timezone.now()
+        job.result = result
+        job.save()
+
+        return {
+            'status': 'success',
+            'dataset_id': str(dataset.id),
+            'rows_processed': result['total_rows'],
+            'columns_processed': result['total_columns']
+        }
+
+    except Exception as e:
+        logger.error(f"Error cloning dataset {source_id} into dataset {dataset_id}: {str(e)}")
+        # Stored values outside the database are not rolled back with the columns
+        get_storage(dataset).delete()
+        job.status = 'FAILED'
+        job.error_message = str(e)
+        job.completed_at = timezone.now()
+        job.save()
+        raise
+
+
+def _start_parallel_ingestion(task, dataset_id: str, job: ProcessingJob, plan: Dict[str, Any]):
+    """
+    First chord of a parallel ingestion: infer the types of every part, then
+    create the columns. Every part is a (row range, column group) pair.
+    """
+    plan = {
+        **plan,
+        'dataset_id': dataset_id,
+        'job_id': str(job.id),
+        'job_type': job.job_type,
+        'progress_task_id': task.request.id
+    }
+    return chord(
+        [
+            infer_part_types_task.s(plan, start_row, row_count, positions)
+            for start_row, row_count in plan['row_parts']
+            for positions in plan['column_groups']
+        ],
+        create_parallel_columns_task.s(plan)
+    ).on_error(fail_parallel_ingestion_task.s(plan))
+
+
+def _add_job_progress(job_id: str, counter: str, amount: int) -> Optional[int]:
+    """
+    Add to one of a job's progress counters, shared by every task working
+    on the job. Returns the counter's new value, None if Redis is unavailable.
+    """
+    key = JOB_PROGRESS_KEY.format(job_id=job_id)
+    try:
+        pipeline = RedisClient().pipeline()
+        pipeline.hincrby(key, counter, amount)
+        pipeline.expire(key, JOB_PROGRESS_TTL)
+        return pipeline.execute()[0]
+    except RedisError as e:
+        logger.warning(f"Could not record progress of job {job_id}: {str(e)}")
+        return None
+
+
+def _clear_job_progress(job_id: str) -> None:
+    try:
+        RedisClient().delete(JOB_PROGRESS_KEY.format(job_id=job_id))
+    except RedisError as e:
+        logger.warning(f"Could not clear progress of job {job_id}: {str(e)}")
+
+
+def _report_ingestion_progress(task, plan: Dict[str, Any], stage: str, cells: int) -> None:
+    """Count the cells a part task finished and publish the overall progress on the original task id."""
+    done_cells = _add_job_progress(plan['job_id'], stage, cells)
+    if done_cells is None:
+        return
+
+    total_cells = plan['total_rows'] * len(plan['column_names'])
+    share = DataProcessingService.INFERENCE_PROGRESS_SHARE
+    fraction = min(done_cells / total_cells, 1) if total_cells else 1
+    TaskProgress.report(
+        task,
+        task_id=plan['progress_task_id'],
+        meta={
+            'progress': round(
+                fraction * share if stage == 'Inferring column types' else share + fraction * (100 - share), 2
+            ),
+            'current_stage': stage,
+            'processed_rows': done_cells // max(len(plan['column_names']), 1),
+            'total_rows': plan['total_rows']
+        }
+    )
+
+
+@shared_task(bind=True, name='data_processing.tasks.infer_part_types_task')
+def infer_part_types_task(
+        self,
+        plan: Dict[str, Any],
+        start_row: int,
+        row_count: int,
+        positions: List[int]
+) -> Dict[str, Dict[str, Any]]:
+    """Infer the type state of one part of a file for a parallel ingestion."""
+    dataset = Dataset.objects.get(id=plan['dataset_id'])
+    with JobMetrics(plan['job_type'], record=False) as metrics:
+        states = DataProcessingService.infer_part_types(dataset, start_row, row_count, positions)
+
+    part_rows = next(iter(states.values()))['total_count'] if states else 0
+    _report_ingestion_progress(self, plan, 'Inferring column types', part_rows * len(positions))
+    return {'states': states, 'metrics': metrics.to_dict()}
+
+
+@shared_task(bind=True, name='data_processing.tasks.create_parallel_columns_task')
+def create_parallel_columns_task(self, parts: List[Dict[str, Any]], plan: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Merge the inferred types, create the columns, then replace this task
+    with the chord that stores every part. The metrics of the inference
+    stage travel with the plan to the task finishing the ingestion.
+    """
+    dataset = Dataset.objects.get(id=plan['dataset_id'])
+    with JobMetrics(plan['job_type'], record=False) as metrics:
+        total_rows = DataProcessingService.create_parallel_columns(
+            dataset, plan['column_names'], [part['states'] for part in parts]
+        )
+    for part in parts:
+        metrics.merge(part['metrics'])
+
+    # The header's estimate is replaced by the rows actually parsed
+    plan = {**plan, 'total_rows': total_rows, 'metrics': metrics.to_dict()}
+    raise self.replace(chord(
+        [
+            persist_part_task.s(plan, start_row, row_count, positions)
+            for start_row, row_count in plan['row_parts']
+            for positions in plan['column_groups']
+        ],
+        finish_parallel_ingestion_task.s(plan)
+    ))
+
+
+@shared_task(bind=True, name='data_processing.tasks.persist_part_task')
+def persist_part_task(
+        self,
+        plan: Dict[str, Any],
+        start_row: int,
+        row_count: int,
+        positions: List[int]
+) -> Dict[str, Dict[str, Any]]:
+    """Convert and store one part of a file for a parallel ingestion."""
+    dataset = Dataset.objects.get(id=plan['dataset_id'])
+    with JobMetrics(plan['job_type'], record=False) as metrics:
+        profiles = DataProcessingService.persist_part(
+            dataset,
+            start_row,
+            row_count,
+            positions,
+            progress_callback=lambda cells: _report_ingestion_progress(self, plan, 'Processing column data', cells)
+        )
+    return {'profiles': profiles, 'metrics': metrics.to_dict()}
+
+
+@shared_task(bind=True, name='data_processing.tasks.finish_parallel_ingestion_task')
+def finish_parallel_ingestion_task(
+        self,
+        parts: List[Dict[str, Any]],
+        plan: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Merge the column profiles of every part and complete the ingestion job,
+    recording the metrics of every task that worked on it.
+    """
+    dataset = Dataset.objects.get(id=plan['dataset_id'])
+    job = ProcessingJob.objects.get(id=plan['job_id'])
+
+    with JobMetrics(job.job_type, started_at=job.started_at) as metrics:
+        metrics.merge(plan.get('metrics'))
+        for part in parts:
+            metrics.merge(part['metrics'])
+        result = DataProcessingService.finish_parallel_ingestion(
+            dataset, plan['total_rows'], [part['profiles'] for part in parts]
+        )
+    result['metrics'] = metrics.to_dict()
+
+    DatasetPageCache.invalidate(dataset.id)
+    index_columns_task.delay(str(dataset.id))
+    _clear_job_progress(str(job.id))
+
+    job.status = 'COMPLETED'
+    job.completed_at = timezone.now()
+    job.result = result
+    job.save()
+
+    return {
+        'status': 'success',
+        'dataset_id': str(dataset.id),
+        'rows_processed': result['total_rows'],
+        'columns_processed': result['total_columns']
+    }
+
+
+@shared_task(name='data_processing.tasks.fail_parallel_ingestion_task')
+def fail_parallel_ingestion_task(request, exc, traceback, plan: Dict[str, Any]) -> None:
+    """
+    Error callback of a parallel ingestion: any failing step fails the job and
+    drops the columns and values the other parts already stored.
+    """
+    logger.error(f"Error in parallel ingestion job {plan['job_id']}: {str(exc)}")
+    dataset = Dataset.objects.filter(id=plan['dataset_id']).last()
+    if dataset:
+        with transaction.atomic():
+            get_storage(dataset).delete()
+            dataset.columns.all().delete()
+    _clear_job_progress(plan['job_id'])
+
+    ProcessingJob.objects.filter(id=plan['job_id']).update(
+        status='FAILED',
+        error_message=str(exc),
+        completed_at=timezone.now()
+    )
+    TaskProgress.publish(plan['progress_task_id'], 'FAILURE', str(exc))
+
+
+@shared_task(bind=True)
+def validate_column_types_task(self, dataset_id: str, job_id: str) -> Dict[str, Any]:
+    """
+    Confirm or correct column types that were inferred from a sample
+    """
+    dataset = Dataset.objects.filter(id=dataset_id).last()
+
+    job = ProcessingJob.objects.filter(id=job_id).last()
+    job.status = 'RUNNING'
+    job.started_at = timezone.now()
+    job.save()
+
+    try:
+        with JobMetrics(job.job_type) as metrics:
+            result = DataProcessingService.validate_inferred_types(
+                dataset=dataset,
+                progress_callback=lambda progress, stage: TaskProgress.report(
+                    self,
+                    meta={
+                        'progress': progress['progress'],
+                        'current_stage': stage
+                    }
+                )
+            )
+        result['metrics'] = metrics.to_dict()
+
+        job.status = 'COMPLETED'
+        job.completed_at = timezone.now()
+        job.result = result
+        job.save()
+
+        # Validation can change column types and values
+        DatasetPageCache.invalidate(dataset.id)
+
+        converted = [name for name, outcome in result['columns'].items() if outcome['converted']]
+        if converted:
+            index_columns_task.delay(
+                str(dataset.id),
+                [str(column_id) for column_id in dataset.columns.filter(name__in=converted).values_list('id', flat=True)]
+            )
+
+        return {
+            'status': 'success',
+            'dataset_id': str(dataset.id),
+            'columns_validated': len(result['columns'])
+        }
+
+    except Exception as e:
+        logger.error(f"Error validating column types for dataset {dataset_id}: {str(e)}")
+        job.status = 'FAILED'
+        job.error_message = str(e)
+        job.completed_at = timezone.now()
+        job.save()
+        raise
+
+
 @shared_task(bind=True)
-def convert_column_type_task(self, column_id: str, dataset_id: str, target_type: str, job_id: str) -> Dict[str, Any]:
+def convert_column_type_task(
+        self,
+        column_id: str,
+        dataset_id: str,
+        target_type: str,
+        job_id: str,
+        dry_run: bool = False,
+        profile: str = None
+) -> Dict[str, Any]:
     """
-    Task to convert column values to new type
+    Task to validate and convert column values to a new type in one pass.
+    With dry_run the column is only validated. Either way the outcome, including
+    the first offending values and their row indexes, is stored on the job result.
+
+    With profile (or PROFILER_MODE) set, a conversion in a single task runs
+    under a JobProfiler and its profile is stored as an artifact of the job.
     """
+    job = ProcessingJob.objects.get(id=job_id)
+
     try:
         column = Column.objects.get(id=column_id, dataset_id=dataset_id)
-        job = ProcessingJob.objects.get(id=job_id)
 
         job.status = 'RUNNING'
         job.started_at = timezone.now()
         job.save()
 
-        # Get all values
-        values = RowValue.objects.filter(column=column)
-        total_values = values.count()
-
-        if total_values == 0:
-            job.status = 'COMPLETED'
-            job.completed_at = timezone.now()
-            job.save()
-            return {
-                'status': 'success',
-                'message': 'No values to convert'
-            }
-
         # Initial progress
-        self.update_state(
-            state='PROGRESS',
+        TaskProgress.report(
+            self,
             meta={'progress': 0}
         )
 
-        conversion_functions = {
-            'Integer': convert_to_integer,
-            'Float': convert_to_float,
-            'Datetime': convert_to_datetime,
-            'Boolean': convert_to_boolean,
-            'Category': convert_to_category,
-            'Text': str
-        }
-
-        # Get the appropriate conversion function
-        convert_func = conversion_functions.get(target_type)
-        if not convert_func:
-            raise ValueError(f"Unsupported target type: {target_type}")
-
-        # Batch processing to improve performance
-        batch_size = 1000
-        total_batches = (total_values + batch_size - 1) // batch_size
-        
-        for batch_index in range(total_batches):
-            start_idx = batch_index * batch_size
-            end_idx = min((batch_index + 1) * batch_size, total_values)
-            
-            batch_values = values[start_idx:end_idx]
-            updated_values = []
-
-            for value in batch_values:
-                try:
-                    converted_value = convert_func(value.value)
-                    value.value = converted_value
-                    updated_values.append(value)
-                except Exception as e:
-                    job.status = 'FAILED'
-                    job.error_message = (
-                        f"Error converting value '{value.value}' at row "
-                        f"{value.dataset_row.row_index}: {str(e)}"
-                    )
-                    job.completed_at = timezone.now()
-                    job.save()
-                    raise
-
-            # Bulk update the batch
-            RowValue.objects.bulk_update(updated_values, ['value'])
-
-            # Update progress
-            progress = ((batch_index + 1) * batch_size / total_values) * 100
-            self.update_state(
-                state='PROGRESS',
-                meta={'progress': min(round(progress, 2), 100)}
+        partitions = DataProcessingService.plan_conversion_partitions(column)
+        if partitions:
+            raise self.replace(
+                _start_partitioned_conversion(self, column, target_type, job, dry_run, partitions)
             )
 
-        # Update column type
-        column.current_type = target_type
-        column.save()
+        with JobProfiler.for_job(job, profile), JobMetrics(job.job_type) as metrics:
+            result = DataProcessingService.convert_column(
+                column=column,
+                target_type=target_type,
+                dry_run=dry_run,
+                progress_callback=lambda progress, stage: TaskProgress.report(
+                    self,
+                    meta={
+                        'progress': progress['progress'],
+                        'current_stage': stage
+                    }
+                )
+            )
+        result['metrics'] = metrics.to_dict()
 
         # Complete job
         job.status = 'COMPLETED'
         job.completed_at = timezone.now()
+        job.result = result
         job.save()
 
+        if not dry_run:
+            DatasetPageCache.invalidate(dataset_id)
+            index_columns_task.delay(dataset_id, [column_id])
+
         return {
             'status': 'success',
-            'message': f'Successfully converted column type to {target_type}'
+            'message': (
+                f'Column can be converted to {target_type}' if dry_run
+                else f'Successfully converted column type to {target_type}'
+            )
         }
 
+    except Ignore:
+        raise
+
+    except ConversionFailed as e:
+        job.status = 'FAILED'
+        job.error_message = str(e)
+        job.result = {**e.validator.to_dict(), 'dry_run': dry_run}
+        job.completed_at = timezone.now()
+        job.save()
+        raise
+
     except Exception as e:
         logger.error(f"Error in convert_column_type_task: {str(e)}")
-        if job.status != 'FAILED':  # Only update if not already marked as failed
-            job.status = 'FAILED'
-            job.error_message = str(e)
-            job.completed_at = timezone.now()
-            job.save()
-        raise
\ No newline at end of file
+        job.status = 'FAILED'
+        job.error_message = str(e)
+        job.completed_at = timezone.now()
+        job.save()
+        raise
+
+
+def _start_partitioned_conversion(
+        task,
+        column: Column,
+        target_type: str,
+        job: ProcessingJob,
+        dry_run: bool,
+        partitions: List[List[Optional[int]]]
+):
+    """
+    Chord converting every row range of a column into one shared stage,
+    committed by finish_partitioned_conversion_task once all have converted.
+    Dry runs only validate and have no stage.
+    """
+    stage = None if dry_run else uuid4().hex
+    if stage:
+        get_storage(column.dataset).open_stage(column, stage)
+
+    plan = {
+        'column_id': str(column.id),
+        'dataset_id': str(column.dataset_id),
+        'target_type': target_type,
+        'job_id': str(job.id),
+        'job_type': job.job_type,
+        'stage': stage,
+        'progress_task_id': task.request.id,
+        'total_values': column.dataset.row_count or get_storage(column.dataset).count_rows(),
+    }
+    return chord(
+        [convert_partition_task.s(plan, start_row, stop_row) for start_row, stop_row in partitions],
+        finish_partitioned_conversion_task.s(plan)
+    ).on_error(fail_partitioned_conversion_task.s(plan))
+
+
+@shared_task(bind=True, name='data_processing.tasks.convert_partition_task')
+def convert_partition_task(self, plan: Dict[str, Any], start_row: int, stop_row: Optional[int]) -> Dict[str, Any]:
+    """Convert one row range of a column into the conversion's stage."""
+    column = Column.objects.select_related('dataset').get(id=plan['column_id'])
+    stage = 'Validating values' if plan['stage'] is None else 'Converting values'
+
+    def report(values: int) -> None:
+        done = _add_job_progress(plan['job_id'], 'values', values)
+        if done is not None:
+            TaskProgress.report(
+                self,
+                task_id=plan['progress_task_id'],
+                meta={
+                    'progress': round(min(done / plan['total_values'], 1) * 100, 2) if plan['total_values'] else 100,
+                    'current_stage': stage
+                }
+            )
+
+    with JobMetrics(plan['job_type'], record=False) as metrics:
+        result = DataProcessingService.convert_partition(
+            column, plan['target_type'], start_row, stop_row, stage=plan['stage'], progress_callback=report
+        )
+    return {**result, 'metrics': metrics.to_dict()}
+
+
+@shared_task(bind=True, name='data_processing.tasks.finish_partitioned_conversion_task')
+def finish_partitioned_conversion_task(self, partitions: List[Dict[str, Any]], plan: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Commit a partitioned conversion once every partition has converted, or
+    fail it as a whole, recording the metrics of every partition.
+    """
+    column = Column.objects.select_related('dataset').get(id=plan['column_id'])
+    job = ProcessingJob.objects.get(id=plan['job_id'])
+    dry_run = plan['stage'] is None
+    _clear_job_progress(plan['job_id'])
+
+    try:
+        with JobMetrics(job.job_type, started_at=job.started_at) as metrics:
+            for partition in partitions:
+                metrics.merge(partition['metrics'])
+            result = DataProcessingService.finish_partitioned_conversion(
+                column, plan['target_type'], partitions, stage=plan['stage']
+            )
+    except ConversionFailed as e:
+        job.status = 'FAILED'
+        job.error_message = str(e)
+        job.result = {**e.validator.to_dict(), 'dry_run': dry_run, 'partitions': len(partitions)}
+        job.completed_at = timezone.now()
+        job.save()
+        raise
+    result['metrics'] = metrics.to_dict()
+
+    job.status = 'COMPLETED'
+    job.completed_at = timezone.now()
+    job.result = result
+    job.save()
+
+    if not dry_run:
+        DatasetPageCache.invalidate(plan['dataset_id'])
+        index_columns_task.delay(plan['dataset_id'], [plan['column_id']])
+
+    return {
+        'status': 'success',
+        'message': (
+            f"Column can be converted to {plan['target_type']}" if dry_run
+            else f"Successfully converted column type to {plan['target_type']}"
+        )
+    }
+
+
+@shared_task(name='data_processing.tasks.fail_partitioned_conversion_task')
+def fail_partitioned_conversion_task(request, exc, traceback, plan: Dict[str, Any]) -> None:
+    """Error callback of a partitioned conversion: drop the stage and fail the job."""
+    logger.error(f"Error in partitioned conversion job {plan['job_id']}: {str(exc)}")
+    if plan['stage']:
+        column = Column.objects.select_related('dataset').get(id=plan['column_id'])
+        get_storage(column.dataset).discard_stage(column, plan['stage'])
+    _clear_job_progress(plan['job_id'])
+
+    # A failed conversion already recorded its outcome on the job
+    ProcessingJob.objects.filter(id=plan['job_id']).exclude(status='FAILED').update(
+        status='FAILED',
+        error_message=str(exc),
+        completed_at=timezone.now()
+    )
+    TaskProgress.publish(plan['progress_task_id'], 'FAILURE', str(exc))
+
+
+@shared_task(bind=True)
+def index_columns_task(self, dataset_id: str, column_ids: List[str] = None) -> Dict[str, Any]:
+    """
+    Build the storage indexes that let columns be filtered and sorted by
+    their current type. Defaults to every column of the dataset.
+    """
+    dataset = Dataset.objects.filter(id=dataset_id).last()
+    columns = dataset.columns.all()
+    if column_ids is not None:
+        columns = columns.filter(id__in=column_ids)
+
+    storage = get_storage(dataset)
+    indexed = 0
+    for column in columns:
+        storage.index_column(column)
+        indexed += 1
+
+    return {
+        'status': 'success',
+        'dataset_id': dataset_id,
+        'columns_indexed': indexed
+    }
+
+
+@shared_task(bind=True, name='data_processing.tasks.export_dataset_task')
+def export_dataset_task(self, dataset_id: str, job_id: str, file_format: str) -> Dict[str, Any]:
+    """
+    Export a dataset in its current column types to a file under
+    DATASET_EXPORT_ROOT, streaming it chunk by chunk.
+    """
+    dataset = Dataset.objects.filter(id=dataset_id).last()
+
+    job = ProcessingJob.objects.filter(id=job_id).last()
+    job.status = 'RUNNING'
+    job.started_at = timezone.now()
+    job.save()
+
+    try:
+        exporter = DatasetExporter(dataset, file_format)
+        total_rows = dataset.row_count or get_storage(dataset).count_rows()
+
+        path = Path(settings.DATASET_EXPORT_ROOT) / str(dataset.id) / f"{job.id}.{file_format}"
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        tmp_path = path.with_suffix('.tmp')
+        with JobMetrics(job.job_type) as metrics, stage('export'), open(tmp_path, 'wb') as export_file:
+            rows = exporter.write(
+                export_file,
+                progress_callback=lambda written: TaskProgress.report(
+                    self,
+                    meta={
+                        'progress': round(min(written / total_rows, 1) * 100, 2) if total_rows else 100,
+                        'current_stage': 'Exporting rows',
+                        'processed_rows': written,
+                        'total_rows': total_rows
+                    }
+                )
+            )
+            count_rows(rows)
+        os.replace(tmp_path, path)
+
+        result = {
+            'path': str(path),
+            'filename': exporter.filename,
+            'file_format': file_format,
+            'rows': rows,
+            'size': path.stat().st_size,
+            'metrics': metrics.to_dict()
+        }
+        job.status = 'COMPLETED'
+        job.completed_at = timezone.now()
+        job.result = result
+        job.save()
+
+        return {
+            'status': 'success',
+            'dataset_id': str(dataset.id),
+            'rows_exported': rows
+        }
+
+    except Exception as e:
+        logger.error(f"Error exporting dataset {dataset_id}: {str(e)}")
+        job.status = 'FAILED'
+        job.error_message = str(e)
+        job.completed_at = timezone.now()
+        job.save()
+        raise
@@ -0,0 +1,103 @@
+import shutil
+import tempfile
+from unittest import mock, skipUnless
+from uuid import uuid4
+
+import pandas as pd
+from django.test import SimpleTestCase, TestCase, override_settings
+from redis import RedisError
+
+from data_processing.cache import DatasetPageCache
+from data_processing.metrics import JobMetricsStore
+from data_processing.models import Column, Dataset, ProcessingJob
+from data_processing.progress import TaskProgress
+from data_processing.storage import ColumnarStorage
+from data_processing.tasks import tasks
+from data_processing.tasks.conversion import ConversionFailed
+from utils.redis_client import RedisClient
+
+
+def redis_available() -> bool:
+    try:
+        return bool(RedisClient().redis.ping())
+    except RedisError:
+        return False
+
+
+@skipUnless(redis_available(), 'the page cache needs a Redis server')
+class DatasetPageCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.dataset_id = uuid4()
+        self.addCleanup(DatasetPageCache.invalidate, self.dataset_id)
+
+    def test_invalidate_hides_cached_pages(self):
+        params = [('page', ['1'])]
+        version = DatasetPageCache.version(self.dataset_id)
+        DatasetPageCache.set(self.dataset_id, version, params, {'rows': [1]})
+        self.assertEqual(DatasetPageCache.get(self.dataset_id, version, params), {'rows': [1]})
+
+        DatasetPageCache.invalidate(self.dataset_id)
+        self.assertIsNone(DatasetPageCache.get(self.dataset_id, version, params))
+        new_version = DatasetPageCache.version(self.dataset_id)
+        self.assertNotEqual(new_version, version)
+
+        # A page built from data read before the invalidation is never served
+        DatasetPageCache.set(self.dataset_id, version, params, {'rows': [1]})
+        self.assertIsNone(DatasetPageCache.get(self.dataset_id, new_version, params))
+
+    @override_settings(DATASET_PAGE_CACHE_MAX_PAGES=2)
+    def test_least_recently_used_pages_are_evicted(self):
+        version = DatasetPageCache.version(self.dataset_id)
+        for page in ('1', '2'):
+            DatasetPageCache.set(self.dataset_id, version, [('page', [page])], {'page': page})
+        DatasetPageCache.get(self.dataset_id, version, [('page', ['1'])])
+        DatasetPageCache.set(self.dataset_id, version, [('page', ['3'])], {'page': '3'})
+
+        cached = [DatasetPageCache.get(self.dataset_id, version, [('page', [page])]) for page in ('1', '2', '3')]
+        self.assertEqual(cached, [{'page': '1'}, None, {'page': '3'}])
+
+
+class ConversionInvalidationTests(TestCase):
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        settings_override = override_settings(DATASET_STORAGE_ROOT=root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.dataset = Dataset.objects.create(
+            name='d', file='d.csv', file_type='CSV', storage_backend='COLUMNAR', row_count=3
+        )
+        self.column = Column.objects.create(
+            dataset=self.dataset, name='n', original_name='n', position=0, inferred_type='Text', current_type='Text'
+        )
+        ColumnarStorage(self.dataset).write_chunk(0, [self.column], pd.DataFrame({'n': ['1', '2', '']}))
+
+        for patcher in (
+                mock.patch.object(DatasetPageCache, 'invalidate'),
+                mock.patch.object(tasks.index_columns_task, 'delay'),
+                mock.patch.object(TaskProgress, 'report'),
+                mock.patch.object(JobMetricsStore, 'record'),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def convert(self, target_type: str, dry_run: bool = False) -> ProcessingJob:
+        job = ProcessingJob.objects.create(dataset=self.dataset, job_type='CONVERSION')
+        try:
+            tasks.convert_column_type_task(
+                str(self.column.id), str(self.dataset.id), target_type, str(job.id), dry_run=dry_run
+            )
+        except ConversionFailed:
+            pass
+        job.refresh_from_db()
+        return job
+
+    def test_conversion_invalidates_pages(self):
+        self.assertEqual(self.convert('Integer').status, 'COMPLETED')
+        DatasetPageCache.invalidate.assert_called_once_with(str(self.dataset.id))
+
+    def test_dry_runs_and_failed_conversions_keep_pages(self):
+        self.assertEqual(self.convert('Integer', dry_run=True).status, 'COMPLETED')
+        self.assertEqual(self.convert('Datetime').status, 'FAILED')
+        DatasetPageCache.invalidate.assert_not_called()
@@ -0,0 +1,80 @@
+import pandas as pd
+from django.test import SimpleTestCase
+
+from data_processing.storage import DatasetStorage
+from data_processing.tasks.conversion import ConversionEngine, ConversionValidator
+from data_processing.tasks.inference import convert_chunk
+
+
+class StoredTextTests(SimpleTestCase):
+    def test_ingested_booleans_match_converted_booleans(self):
+        raw = pd.Series(['Yes', 'no', None, 'TRUE', 'f'])
+        ingested = DatasetStorage.to_text(convert_chunk(raw, 'Boolean'))
+        converted = ConversionEngine.convert(raw.fillna(''), 'Boolean').values
+        self.assertEqual(ingested.tolist(), ['true', 'false', '', 'true', 'false'])
+        self.assertEqual(ingested.tolist(), converted.tolist())
+
+    def test_boolean_looking_text_is_kept(self):
+        self.assertEqual(DatasetStorage.to_text(pd.Series(['True', 'x', None])).tolist(), ['True', 'x', ''])
+        self.assertEqual(DatasetStorage.to_text(pd.Series([1, 0, 2])).tolist(), ['1', '0', '2'])
+
+
+class ConversionEngineTests(SimpleTestCase):
+    def convert(self, values, target_type):
+        result = ConversionEngine.convert(pd.Series(values, dtype=object), target_type)
+        return result.values.tolist(), result.errors.tolist()
+
+    def test_integer_failures(self):
+        self.assertEqual(self.convert(['1,000', ' 7 ', '', None, '2.5', 'x', '1e30'], 'Integer'), (
+            ['1000', '7', '', '', '', '', ''],
+            ['', '', '', '', 'has a decimal part', 'not a number', 'out of integer range'],
+        ))
+
+    def test_float_failures(self):
+        self.assertEqual(self.convert(['2.5', '3', 'abc', 'inf'], 'Float'), (
+            ['2.5', '3.0', '', ''],
+            ['', '', 'not a number', 'out of float range'],
+        ))
+
+    def test_datetime_failures(self):
+        self.assertEqual(self.convert(['2024-01-02', '2024-01-02 03:04:05.5', 'soon'], 'Datetime'), (
+            ['2024-01-02 00:00:00', '2024-01-02 03:04:05.500000', ''],
+            ['', '', 'not a date'],
+        ))
+
+    def test_boolean_failures(self):
+        self.assertEqual(self.convert(['Yes', 'off', 'maybe', ''], 'Boolean'), (
+            ['true', 'false', '', ''],
+            ['', '', 'not a boolean', ''],
+        ))
+
+    def test_unsupported_type(self):
+        with self.assertRaises(ValueError):
+            ConversionEngine.convert(pd.Series(['1']), 'Decimal')
+
+
+class ConversionValidatorTests(SimpleTestCase):
+    def validate(self, target_type, *batches):
+        validators = []
+        start = 0
+        for batch in batches:
+            values = pd.Series(batch, dtype=object)
+            validator = ConversionValidator(target_type)
+            row_indexes = pd.Series(range(start, start + len(values)))
+            validator.update(values, row_indexes, ConversionEngine.convert(values, target_type))
+            validators.append(validator)
+            start += len(values)
+        return validators[0] if len(validators) == 1 else validators[1].merge(validators[0])
+
+    def test_failures_are_reported_in_row_order_across_partitions(self):
+        validator = self.validate('Integer', ['1', 'a'], ['b', '2'])
+        self.assertFalse(validator.is_valid)
+        self.assertEqual(validator.failed_count, 2)
+        self.assertEqual([failure['row_index'] for failure in validator.failures], [1, 2])
+        self.assertIn("'a' at row 1 (not a number)", validator.summary())
+
+    def test_category_limits(self):
+        self.assertTrue(self.validate('Category', ['a', 'b'] * 60).is_valid)
+        self.assertIn('too rare', self.validate('Category', ['a'] * 200 + ['b']).summary())
+        overflow = self.validate('Category', [str(value) for value in range(ConversionValidator.MAX_CATEGORIES + 1)])
+        self.assertIn('Too many unique values', overflow.summary())
@@ -0,0 +1,36 @@
+import io
+from unittest import mock
+
+import pandas as pd
+from django.test import SimpleTestCase
+from openpyxl.worksheet._writer import ALL_TEMP_FILES
+
+from data_processing.exporters import DatasetExporter
+from utils.exceptions import ExportError
+
+
+class DatasetExporterTests(SimpleTestCase):
+    def exporter(self, file_format: str) -> DatasetExporter:
+        column = mock.Mock()
+        column.name = 'a'
+        dataset = mock.Mock()
+        dataset.columns.all.return_value.order_by.return_value = [column]
+        return DatasetExporter(dataset, file_format)
+
+    def test_xlsx_rejects_more_rows_than_a_sheet(self):
+        exporter = self.exporter('xlsx')
+        exporter.check_row_count(DatasetExporter.XLSX_MAX_ROWS)
+        with self.assertRaises(ExportError):
+            exporter.check_row_count(DatasetExporter.XLSX_MAX_ROWS + 1)
+        self.exporter('csv').check_row_count(DatasetExporter.XLSX_MAX_ROWS + 1)
+
+    @mock.patch.object(DatasetExporter, 'XLSX_MAX_ROWS', 3)
+    def test_xlsx_stops_when_rows_outgrow_a_sheet(self):
+        exporter = self.exporter('xlsx')
+        temp_files = list(ALL_TEMP_FILES)
+        chunks = [pd.DataFrame({'a': [1, 2]}), pd.DataFrame({'a': [3, 4]})]
+        with mock.patch.object(DatasetExporter, 'iter_chunks', return_value=iter(chunks)):
+            with self.assertRaises(ExportError):
+                exporter.write(io.BytesIO())
+        # The sheet's temporary file is removed rather than left until the process exits
+        self.assertEqual(ALL_TEMP_FILES, temp_files)
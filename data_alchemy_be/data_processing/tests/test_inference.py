@@ -0,0 +1,140 @@
+import os
+import shutil
+import tempfile
+from typing import Any, Dict
+from unittest import mock
+
+import pandas as pd
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from data_processing.cache import InferenceCache
+from data_processing.models import Dataset
+from data_processing.storage import get_storage
+from data_processing.tasks.inference import ColumnTypeState, column_fingerprint, convert_chunk
+from data_processing.tasks.readers import DatasetFileReader
+from data_processing.tasks.task_service import DataProcessingService
+
+
+class ColumnTypeStateTests(SimpleTestCase):
+    def test_integers_outside_int64_are_floats(self):
+        for values in (['99999999999999999999', '1'], ['1e30', '2'], ['-9223372036854775809', '3']):
+            with self.subTest(values=values):
+                state = ColumnTypeState().update(pd.Series(values))
+                self.assertEqual(state.resolve(), 'Float')
+                convert_chunk(pd.Series(values), state.resolve())
+
+    def test_integers_within_int64(self):
+        values = pd.Series(['9223372036854774784', '-5', None])
+        state = ColumnTypeState().update(values)
+        self.assertEqual(state.resolve(), 'Integer')
+        self.assertEqual(convert_chunk(values, 'Integer').tolist()[:2], [9223372036854774784, -5])
+
+
+class ColumnFingerprintTests(SimpleTestCase):
+    def test_same_shapes_match(self):
+        first = column_fingerprint('Amount', pd.Series([str(value) for value in range(100)] + [None]))
+        second = column_fingerprint(' amount', pd.Series([str(value) for value in range(500, 600)]))
+        self.assertEqual(first, second)
+
+    def test_different_shapes_or_value_sets_differ(self):
+        dates = column_fingerprint('at', pd.Series(['2024-01-31', '2024-02-01'] * 10))
+        self.assertNotEqual(dates, column_fingerprint('at', pd.Series(['31/01/2024', '01/02/2024'] * 10)))
+        flags = column_fingerprint('flag', pd.Series(['yes', 'no'] * 10))
+        self.assertNotEqual(flags, column_fingerprint('flag', pd.Series(['yes', 'maybe'] * 10)))
+
+
+class InferenceCacheIngestionTests(TestCase):
+    CSV = 'id,code\n' + ''.join(f'{row},{row}\n' for row in range(1, 30)) + '30,X1\n'
+
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        settings_override = override_settings(
+            MEDIA_ROOT=root, DATASET_STORAGE_ROOT=root, INFERENCE_CACHE_ENABLED=True
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        with open(os.path.join(root, 'd.csv'), 'w') as file:
+            file.write(self.CSV)
+        self.dataset = Dataset.objects.create(name='d', file='d.csv', file_type='csv', storage_backend='COLUMNAR')
+        self.reader = DatasetFileReader(self.dataset.file.path, 'csv')
+        self.fingerprints = DataProcessingService.fingerprint_columns(self.reader, ['id', 'code'])
+
+        self.cache = {}
+        for name in ('get_many', 'set_many', 'evict'):
+            patcher = mock.patch.object(InferenceCache, name, autospec=True)
+            self.addCleanup(patcher.stop)
+            setattr(self, name, patcher.start())
+        self.get_many.side_effect = lambda fingerprints: {
+            fingerprint: self.cache[fingerprint] for fingerprint in fingerprints if fingerprint in self.cache
+        }
+
+    def process(self) -> Dict[str, Any]:
+        result = DataProcessingService.process_dataset(self.dataset, inference_mode='full')
+        self.assertEqual(result['total_rows'], 30)
+        self.assertEqual(
+            dict(self.dataset.columns.values_list('name', 'current_type')), {'id': 'Integer', 'code': 'Text'}
+        )
+        return result
+
+    def test_cached_columns_skip_the_scan(self):
+        state = ColumnTypeState().update(self.reader.read_part(0, 30, [0])['id'])
+        self.cache[self.fingerprints['id']] = state.to_dict()
+
+        self.assertEqual(self.process()['cached_columns'], 1)
+        stored = self.set_many.call_args_list[0].args[0]
+        self.assertEqual(list(stored), [self.fingerprints['code']])
+        self.evict.assert_not_called()
+
+    def test_mismatched_cached_types_are_evicted_and_inferred_again(self):
+        # Learnt from an extract whose codes were all numbers
+        self.cache[self.fingerprints['code']] = ColumnTypeState().update(pd.Series(['1', '2'])).to_dict()
+
+        with self.assertLogs('data_processing.tasks.task_service', 'WARNING'):
+            self.assertEqual(self.process()['cached_columns'], 0)
+        self.evict.assert_called_once_with([self.fingerprints['code']])
+        # The second pass does not read the cache
+        self.assertEqual(self.get_many.call_count, 1)
+
+
+@mock.patch.multiple(DataProcessingService, CHUNK_SIZE=10, POOL_CHUNK_SIZE=10)
+class CheckpointResumeTests(TestCase):
+    CSV = 'id,share\n' + ''.join(f'{row},{row}.5\n' for row in range(50))
+
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        settings_override = override_settings(
+            MEDIA_ROOT=root, DATASET_STORAGE_ROOT=root, INFERENCE_CACHE_ENABLED=False, INGESTION_CHECKPOINT_ROWS=10
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        with open(os.path.join(root, 'd.csv'), 'w') as file:
+            file.write(self.CSV)
+
+    def test_resumes_from_the_last_checkpoint(self):
+        for stage in ('inference', 'persist'):
+            with self.subTest(stage=stage):
+                dataset = Dataset.objects.create(name='d', file='d.csv', file_type='csv', storage_backend='COLUMNAR')
+                checkpoints = []
+
+                def interrupt(checkpoint):
+                    if checkpoint['stage'] == stage and checkpoint['next_row'] >= 30:
+                        raise ConnectionError('worker lost')
+                    checkpoints.append(checkpoint)
+
+                with self.assertRaises(Exception), self.assertLogs('data_processing.tasks.task_service', 'ERROR'):
+                    DataProcessingService.process_dataset(dataset, inference_mode='full', checkpoint_callback=interrupt)
+                self.assertEqual((checkpoints[-1]['stage'], checkpoints[-1]['next_row']), (stage, 20))
+
+                result = DataProcessingService.process_dataset(
+                    dataset, checkpoint=checkpoints[-1], checkpoint_callback=checkpoints.append
+                )
+                self.assertEqual(result['total_rows'], 50)
+                columns = list(dataset.columns.order_by('position'))
+                self.assertEqual([column.current_type for column in columns], ['Integer', 'Float'])
+                rows = get_storage(dataset).read_rows(columns, 0, 100)
+                self.assertEqual([row['id'] for row in rows], [str(row) for row in range(50)])
+                self.assertEqual(rows[49]['share'], '49.5')
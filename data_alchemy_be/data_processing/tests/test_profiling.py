@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+
+from data_processing.models import ColumnProfile
+from data_processing.tasks.conversion import ConversionValidator
+from data_processing.tasks.profiling import ColumnProfiler
+from utils.sketches import HyperLogLog, TopK
+
+
+class HyperLogLogTests(SimpleTestCase):
+    def test_estimates_within_error_bound(self):
+        for distinct in (10, 1000, 200000):
+            values = pd.Series(np.arange(distinct)).astype(str)
+            estimate = HyperLogLog().update(values).update(values).estimate()
+            # Four standard errors of the default precision
+            self.assertLess(abs(estimate - distinct) / distinct, 0.065, distinct)
+
+    def test_merged_parts_estimate_like_the_whole(self):
+        values = pd.Series(np.arange(50000)).astype(str)
+        whole = HyperLogLog().update(values)
+        merged = HyperLogLog().update(values[:30000]).merge(
+            HyperLogLog.from_dict(HyperLogLog().update(values[20000:]).to_dict())
+        )
+        self.assertEqual(merged.estimate(), whole.estimate())
+
+
+class TopKTests(SimpleTestCase):
+    def test_exact_while_under_size(self):
+        summary = TopK(size=3).update(pd.Series(['a', 'b', 'a', 'c', 'a', 'b']))
+        self.assertTrue(summary.exact)
+        self.assertEqual(summary.most_common(), [('a', 3), ('b', 2), ('c', 1)])
+
+    def test_counts_underestimate_within_bound(self):
+        rng = np.random.default_rng(0)
+        values = pd.Series(rng.zipf(1.5, 20000).clip(max=5000)).astype(str)
+        size = 20
+        summary = TopK(size)
+        for start in range(0, len(values), 1000):
+            summary.merge(TopK.from_dict(TopK(size).update(values[start:start + 1000]).to_dict()))
+
+        self.assertFalse(summary.exact)
+        true_counts = values.value_counts()
+        for value, count in summary.most_common():
+            self.assertLessEqual(count, true_counts[value])
+            self.assertLessEqual(true_counts[value] - count, 2 * len(values) / (size + 1))
+        # The most frequent values cannot be dropped
+        self.assertEqual(summary.most_common(1)[0][0], true_counts.index[0])
+
+
+class ColumnProfilerTests(SimpleTestCase):
+    def profile(self, *batches) -> ColumnProfiler:
+        profiler = ColumnProfiler()
+        for batch in batches:
+            part = ColumnProfiler().update(pd.Series(batch, dtype=object))
+            profiler.merge(ColumnProfiler.from_dict(part.to_dict()))
+        return profiler
+
+    def test_parse_counts_rule_out_types(self):
+        fields = self.profile(['1', '2', ''], ['3.5', None]).to_fields()
+        self.assertEqual((fields['total_count'], fields['null_count'], fields['distinct_count']), (5, 2, 3))
+        self.assertEqual(fields['parse_counts'], {'Integer': None, 'Float': 3, 'Datetime': None, 'Boolean': None})
+        self.assertEqual((fields['min_value'], fields['max_value']), ('1.0', '3.5'))
+
+    def test_text_columns_range_lexically(self):
+        fields = self.profile(['b', 'a'], ['10', 'c']).to_fields()
+        self.assertEqual((fields['min_value'], fields['max_value']), ('10', 'c'))
+        self.assertEqual(fields['top_values'], [('10', 1), ('a', 1), ('b', 1), ('c', 1)])
+
+    def test_check_profile(self):
+        def check(target_type, *batches):
+            profile = ColumnProfile(**self.profile(*batches).to_fields())
+            return ConversionValidator.check_profile(profile, target_type)[0]
+
+        self.assertTrue(check('Integer', ['1', '2'], ['']))
+        self.assertFalse(check('Integer', ['1', 'x']))
+        self.assertTrue(check('Category', ['a', 'b'] * 60))
+        self.assertFalse(check('Category', ['a'] * 200 + ['b']))
+        self.assertFalse(check('Category', [str(value) for value in range(ConversionValidator.MAX_CATEGORIES + 1)]))
@@ -0,0 +1,156 @@
+import shutil
+import tempfile
+from unittest import mock
+
+import pandas as pd
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from data_processing.models import Column, Dataset
+from data_processing.storage import ColumnarStorage
+from data_processing.storage.query import RowFilter, RowQuery, RowSort, parse_filter, parse_sort
+
+
+def make_column(name: str, data_type: str, **kwargs) -> Column:
+    return Column(name=name, original_name=name, current_type=data_type, inferred_type=data_type, **kwargs)
+
+
+COLUMNS = {
+    column.name: column for column in [
+        make_column('id', 'Integer'),
+        make_column('at', 'Datetime'),
+        make_column('ok', 'Boolean'),
+        make_column('kind', 'Category'),
+        make_column('note', 'Text'),
+    ]
+}
+
+
+class ParseFilterTests(SimpleTestCase):
+    def test_integer_values_are_parsed_exactly(self):
+        self.assertEqual(parse_filter(COLUMNS, 'id:gt:9007199254740993').value, '9007199254740993')
+        with self.assertRaises(ValueError):
+            parse_filter(COLUMNS, 'id:gt:1.5')
+
+    def test_values_are_canonical(self):
+        self.assertEqual(parse_filter(COLUMNS, 'at:gte:2024-01-02').value, '2024-01-02 00:00:00')
+        self.assertEqual(parse_filter(COLUMNS, 'ok:eq:Yes').value, 'true')
+        # Only the first two colons split the expression
+        self.assertEqual(parse_filter(COLUMNS, 'kind:eq:a:b').value, 'a:b')
+
+    def test_invalid_filters(self):
+        for expression in ('id:gt', 'missing:eq:1', 'kind:gt:a', 'note:eq:a', 'ok:eq:maybe', 'at:lt:', 'id:eq: '):
+            with self.subTest(expression=expression), self.assertRaises(ValueError):
+                parse_filter(COLUMNS, expression)
+
+
+class ParseSortTests(SimpleTestCase):
+    def test_direction(self):
+        self.assertEqual(parse_sort(COLUMNS, '-at'), RowSort(COLUMNS['at'], descending=True))
+        self.assertEqual(parse_sort(COLUMNS, 'kind'), RowSort(COLUMNS['kind']))
+
+    def test_invalid_sorts(self):
+        for expression in ('missing', '-', 'note'):
+            with self.subTest(expression=expression), self.assertRaises(ValueError):
+                parse_sort(COLUMNS, expression)
+
+
+class ColumnarQueryTests(TestCase):
+    # Consecutive integers above 2**53, which floats cannot tell apart
+    BASE = 2 ** 53
+
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        settings_override = override_settings(DATASET_STORAGE_ROOT=root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        dataset = Dataset.objects.create(name='d', file='d.csv', file_type='CSV', storage_backend='COLUMNAR')
+        self.column = Column.objects.create(
+            dataset=dataset, name='id', original_name='id', position=0, inferred_type='Integer', current_type='Integer'
+        )
+        self.storage = ColumnarStorage(dataset)
+        ids = [self.BASE + 3, None, self.BASE + 1, self.BASE + 2]
+        self.storage.write_chunk(0, [self.column], pd.DataFrame({'id': pd.array(ids[:2], dtype='Int64')}))
+        self.storage.write_chunk(2, [self.column], pd.DataFrame({'id': pd.array(ids[2:], dtype='Int64')}))
+
+    def ids(self, query: RowQuery, limit: int = 10):
+        rows, after = self.storage.query_rows([self.column], query, limit)
+        return [row['id'] for row in rows], after
+
+    def test_filters_large_integers_exactly(self):
+        query = RowQuery(filters=[RowFilter(self.column, 'gt', str(self.BASE + 1))], sort=RowSort(self.column))
+        self.assertEqual(self.ids(query)[0], [str(self.BASE + 2), str(self.BASE + 3)])
+
+    def test_sorts_large_integers_across_pages(self):
+        query = RowQuery(filters=[], sort=RowSort(self.column))
+        page, after = self.ids(query, limit=1)
+        self.assertEqual((page, after), ([str(self.BASE + 1)], {'row': 2, 'key': self.BASE + 1}))
+        page, after = self.ids(query._replace(after=after), limit=2)
+        self.assertEqual(page, [str(self.BASE + 2), str(self.BASE + 3)])
+        self.assertEqual(self.ids(query._replace(after=after))[0], [''])
+
+    def test_key_parts_skip_parts_ruled_out(self):
+        self.storage.index_column(self.column)
+        query = RowQuery(filters=[RowFilter(self.column, 'gt', str(self.BASE + 2))])
+        read_keys = ColumnarStorage._read_keys
+        with mock.patch.object(ColumnarStorage, '_read_keys', autospec=True, side_effect=read_keys) as read:
+            self.assertEqual(self.ids(query)[0], [str(self.BASE + 3)])
+        # The second part's keys top out at BASE + 2
+        self.assertEqual([call.args[2] for call in read.call_args_list], [0])
+
+    def test_stale_key_parts_are_ignored(self):
+        self.storage.index_column(self.column)
+        self.storage.update_column(self.column, pd.Series([self.BASE + 9], index=[2]))
+        query = RowQuery(filters=[RowFilter(self.column, 'gt', str(self.BASE + 2))], sort=RowSort(self.column))
+        self.assertEqual(self.ids(query)[0], [str(self.BASE + 3), str(self.BASE + 9)])
+
+
+class ColumnarQueryOrderTests(TestCase):
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        settings_override = override_settings(DATASET_STORAGE_ROOT=root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        dataset = Dataset.objects.create(name='d', file='d.csv', file_type='CSV', storage_backend='COLUMNAR')
+        self.column = Column.objects.create(
+            dataset=dataset, name='x', original_name='x', position=0, inferred_type='Float', current_type='Float'
+        )
+        self.storage = ColumnarStorage(dataset)
+        # Ties and nulls in every part
+        for start, values in enumerate([[2.5, None, 1.0], [1.0, None, 2.5], [-3.0, 1.0, None]]):
+            self.storage.write_chunk(start * 3, [self.column], pd.DataFrame({'x': values}))
+
+    def walk(self, query: RowQuery, limit: int):
+        """Value of every matching row, reading page by page from the first."""
+        rows = []
+        after = None
+        while True:
+            page, after = self.storage.query_rows([self.column], query._replace(after=after), limit)
+            rows.extend(page)
+            if after is None:
+                return [row['x'] for row in rows]
+
+    def expected(self, descending: bool):
+        values = [2.5, None, 1.0, 1.0, None, 2.5, -3.0, 1.0, None]
+        present = sorted(
+            [(value, row) for row, value in enumerate(values) if value is not None],
+            key=lambda item: (-item[0] if descending else item[0], item[1])
+        )
+        return [str(value) for value, _ in present] + [''] * values.count(None)
+
+    def test_nulls_last_and_ties_by_row_index(self):
+        for indexed in (False, True):
+            if indexed:
+                self.storage.index_column(self.column)
+            for descending in (False, True):
+                for limit in (1, 2, 4, 20):
+                    with self.subTest(indexed=indexed, descending=descending, limit=limit):
+                        query = RowQuery(filters=[], sort=RowSort(self.column, descending))
+                        self.assertEqual(self.walk(query, limit), self.expected(descending))
+
+    def test_filters_skip_nulls(self):
+        query = RowQuery(filters=[RowFilter(self.column, 'lte', '1.0')], sort=RowSort(self.column, True))
+        self.assertEqual(self.walk(query, 2), ['1.0', '1.0', '1.0', '-3.0'])
@@ -0,0 +1,43 @@
+import os
+import tempfile
+
+import pandas as pd
+from django.test import SimpleTestCase
+
+from data_processing.tasks.readers import DatasetFileReader
+
+
+class DatasetFileReaderTests(SimpleTestCase):
+    BLANK_LINES_CSV = 'a,b\n1,x\n\n2,y\n  \n3,"z\nq"\n4,w\n\n\n5,v\n6,u\n'
+    ROWS = [['1', 'x'], ['2', 'y'], ['3', 'z\nq'], ['4', 'w'], ['5', 'v'], ['6', 'u']]
+
+    def reader(self, content: str) -> DatasetFileReader:
+        handle, path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(handle, 'w') as file:
+            file.write(content)
+        self.addCleanup(os.remove, path)
+        return DatasetFileReader(path, 'csv')
+
+    def test_read_part_counts_rows_not_lines(self):
+        reader = self.reader(self.BLANK_LINES_CSV)
+        self.assertTrue(reader.has_blank_lines())
+        self.assertEqual(reader.count_rows(), len(self.ROWS))
+        for start_row in range(len(self.ROWS)):
+            with self.subTest(start_row=start_row):
+                part = reader.read_part(start_row, 2, [1, 0])
+                self.assertEqual(part.columns.tolist(), ['b', 'a'])
+                self.assertEqual(part[['a', 'b']].values.tolist(), self.ROWS[start_row:start_row + 2])
+
+    def test_read_part_without_blank_lines(self):
+        reader = self.reader('a,b\n' + ''.join(f'{a},{b}\n' for a, b in self.ROWS if '\n' not in b))
+        self.assertFalse(reader.has_blank_lines())
+        self.assertEqual(reader.read_part(3, 10, [0]).values.tolist(), [['5'], ['6']])
+
+    def test_iter_chunks_resumes_at_row(self):
+        reader = self.reader(self.BLANK_LINES_CSV)
+        for start_row in range(len(self.ROWS) + 1):
+            with self.subTest(start_row=start_row):
+                chunks = list(reader.iter_chunks(2, start_row))
+                rows = pd.concat(chunks).values.tolist() if chunks else []
+                self.assertEqual(rows, self.ROWS[start_row:])
+                self.assertTrue(all(chunk.columns.tolist() == ['a', 'b'] for chunk in chunks))
@@ -0,0 +1,107 @@
+import shutil
+import tempfile
+from unittest import skipUnless
+
+import pandas as pd
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from data_processing.models import Column, Dataset
+from data_processing.storage import ColumnarStorage, EAVStorage
+from data_processing.storage.query import RowFilter, RowQuery, RowSort
+
+
+class ColumnarStorageTests(TestCase):
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        settings_override = override_settings(DATASET_STORAGE_ROOT=root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.dataset = Dataset.objects.create(name='d', file='d.csv', file_type='CSV', storage_backend='COLUMNAR')
+        self.columns = [
+            Column.objects.create(
+                dataset=self.dataset, name=name, original_name=name, position=position,
+                inferred_type=data_type, current_type=data_type
+            )
+            for position, (name, data_type) in enumerate([('n', 'Integer'), ('t', 'Text')])
+        ]
+        self.storage = ColumnarStorage(self.dataset)
+        self.storage.write_chunk(0, self.columns, pd.DataFrame({
+            'n': pd.array([1, 2, None], dtype='Int64'),
+            't': ['a', None, 'c']
+        }))
+        self.storage.write_chunk(3, self.columns, pd.DataFrame({'n': [4, 5], 't': ['d', 'e']}))
+
+    def test_write_and_read_rows(self):
+        self.assertEqual(self.storage.count_rows(), 5)
+        self.assertEqual(self.storage.read_rows(self.columns, 1, 3), [
+            {'n': '2', 't': ''},
+            {'n': '', 't': 'c'},
+            {'n': '4', 't': 'd'},
+        ])
+        chunks = list(self.storage.iter_rows(self.columns, 2))
+        self.assertEqual([start for start, _ in chunks], [0, 2, 3])
+        self.assertEqual(pd.concat(chunk for _, chunk in chunks)['t'].tolist(), ['a', '', 'c', 'd', 'e'])
+
+    def test_rewrite_column_commits_on_success(self):
+        column = self.columns[0]
+        with self.storage.rewrite_column(column) as write:
+            for batch in self.storage.iter_column(column, 10):
+                write(batch['value'].replace('', None).astype(float) * 10)
+
+        values = [row['n'] for row in self.storage.read_rows([column], 0, 5)]
+        self.assertEqual(values, ['10.0', '20.0', '', '40.0', '50.0'])
+
+        # Only the committed version and the one it replaced are kept
+        with self.storage.rewrite_column(column) as write:
+            for batch in self.storage.iter_column(column, 10):
+                write(batch['value'])
+        versions = list(self.storage._column_dir(column).glob(f"{ColumnarStorage.VERSION_PREFIX}*"))
+        self.assertEqual(len(versions), 2)
+
+    def test_rewrite_column_discards_on_error(self):
+        column = self.columns[1]
+        with self.assertRaises(RuntimeError):
+            with self.storage.rewrite_column(column) as write:
+                write(pd.Series(['x', 'y', 'z']))
+                raise RuntimeError('interrupted')
+
+        self.assertEqual([row['t'] for row in self.storage.read_rows([column], 0, 5)], ['a', '', 'c', 'd', 'e'])
+
+    def test_update_column_and_delete_rows_from(self):
+        self.storage.update_column(self.columns[1], pd.Series(['B', 'E'], index=[1, 4]))
+        self.assertEqual([row['t'] for row in self.storage.read_rows(self.columns, 0, 5)], ['a', 'B', 'c', 'd', 'E'])
+
+        self.storage.delete_rows_from(3)
+        self.assertEqual(self.storage.count_rows(), 3)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'typed EAV queries cast with PostgreSQL syntax')
+class EAVQueryTests(TestCase):
+    def setUp(self):
+        dataset = Dataset.objects.create(name='d', file='d.csv', file_type='CSV', storage_backend='EAV')
+        self.number, self.text = [
+            Column.objects.create(
+                dataset=dataset, name=name, original_name=name, position=position,
+                inferred_type=data_type, current_type=data_type
+            )
+            for position, (name, data_type) in enumerate([('n', 'Integer'), ('t', 'Text')])
+        ]
+        self.storage = EAVStorage(dataset)
+        self.storage.write_chunk(0, [self.number, self.text], pd.DataFrame({
+            'n': pd.array([3, None, 1, 2], dtype='Int64'),
+            't': ['not a number', '1.5', '', 'x'],
+        }))
+
+    def test_filter_casts_only_its_own_column(self):
+        # Without indexes every RowValue of the dataset reaches the filter's cast
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_indexscan = off')
+            cursor.execute('SET LOCAL enable_bitmapscan = off')
+
+        query = RowQuery(filters=[RowFilter(self.number, 'gte', '2')], sort=RowSort(self.number))
+        rows, after = self.storage.query_rows([self.number, self.text], query, 10)
+        self.assertEqual(rows, [{'n': '2', 't': 'x'}, {'n': '3', 't': 'not a number'}])
+        self.assertIsNone(after)
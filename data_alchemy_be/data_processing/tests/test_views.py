@@ -0,0 +1,141 @@
+import gzip
+import json
+import shutil
+import tempfile
+
+import msgpack
+import pandas as pd
+import pyarrow as pa
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from data_processing.models import Column, Dataset
+from data_processing.storage import ColumnarStorage
+from utils.pagination import decode_cursor, encode_cursor
+
+
+@override_settings(DATASET_PAGE_CACHE_ENABLED=False)
+class DatasetRowsViewTests(TestCase):
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        settings_override = override_settings(DATASET_STORAGE_ROOT=root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.dataset = Dataset.objects.create(
+            name='d', file='d.csv', file_type='CSV', storage_backend='COLUMNAR', row_count=5
+        )
+        self.column = Column.objects.create(
+            dataset=self.dataset, name='n', original_name='n', position=0,
+            inferred_type='Integer', current_type='Integer'
+        )
+        storage = ColumnarStorage(self.dataset)
+        storage.write_chunk(0, [self.column], pd.DataFrame({'n': [5, 4, 3]}))
+        storage.write_chunk(3, [self.column], pd.DataFrame({'n': [2, 1]}))
+        self.client = APIClient()
+
+    def get(self, **params):
+        response = self.client.get(f'/api/v1/datasets/{self.dataset.id}/', params)
+        return response.status_code, response.json()
+
+    def follow(self, **params):
+        """Values of every page, following the next cursors from the first page."""
+        pages = []
+        cursor = ''
+        while cursor is not None:
+            status_code, body = self.get(cursor=cursor, **params)
+            self.assertEqual(status_code, 200, body)
+            pages.append([row['n'] for row in body['data']['rows']])
+            cursor = body['pagination']['next']
+        return pages
+
+    def test_cursor_pages_round_trip(self):
+        self.assertEqual(self.follow(page_size=2), [['5', '4'], ['3', '2'], ['1']])
+
+        _, body = self.get(cursor=encode_cursor({'row': 2}), page_size=2)
+        self.assertEqual(decode_cursor(body['pagination']['previous']), {'row': 0})
+        self.assertEqual(decode_cursor(body['pagination']['next']), {'row': 4})
+
+    def test_sorted_cursor_pages_round_trip(self):
+        self.assertEqual(self.follow(page_size=2, sort='n'), [['1', '2'], ['3', '4'], ['5']])
+        self.assertEqual(self.follow(page_size=3, sort='-n', filter='n:lt:5'), [['4', '3', '2'], ['1']])
+
+    def test_invalid_cursor(self):
+        for cursor in ('not base64!', encode_cursor({'row': -1})):
+            status_code, _ = self.get(cursor=cursor)
+            self.assertEqual(status_code, 400)
+
+
+@override_settings(DATASET_PAGE_CACHE_ENABLED=False)
+class RowRendererTests(TestCase):
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        settings_override = override_settings(DATASET_STORAGE_ROOT=root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.dataset = Dataset.objects.create(
+            name='d', file='d.csv', file_type='CSV', storage_backend='COLUMNAR', row_count=200
+        )
+        columns = [
+            Column.objects.create(
+                dataset=self.dataset, name=name, original_name=name, position=position,
+                inferred_type=data_type, current_type=data_type
+            )
+            for position, (name, data_type) in enumerate([('n', 'Integer'), ('t', 'Text')])
+        ]
+        ColumnarStorage(self.dataset).write_chunk(0, columns, pd.DataFrame({
+            'n': range(200),
+            't': [None if value % 3 == 0 else f'text {value}' for value in range(200)],
+        }))
+        self.client = APIClient()
+
+    def get(self, accept: str, page_size: int = 2, **headers):
+        return self.client.get(
+            f'/api/v1/datasets/{self.dataset.id}/', {'page_size': page_size}, HTTP_ACCEPT=accept, **headers
+        )
+
+    def test_json_is_the_default(self):
+        response = self.get('*/*')
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(response.json()['data']['rows'], [{'n': '0', 't': ''}, {'n': '1', 't': 'text 1'}])
+
+    def test_arrow_stream(self):
+        response = self.get('application/vnd.apache.arrow.stream')
+        self.assertEqual(response['Content-Type'], 'application/vnd.apache.arrow.stream')
+
+        table = pa.ipc.open_stream(response.content).read_all()
+        self.assertEqual(table.to_pydict(), {'n': ['0', '1'], 't': ['', 'text 1']})
+        self.assertEqual(table.schema.field('n').metadata, {b'type': b'Integer'})
+        envelope = json.loads(table.schema.metadata[b'envelope'])
+        self.assertEqual(envelope['pagination']['count'], 200)
+        self.assertNotIn('rows', envelope['data'])
+
+    def test_msgpack_column_arrays(self):
+        response = self.get('application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(msgpack.unpackb(response.content)['data']['rows'], {
+            'columns': ['n', 't'],
+            'values': [['0', '1'], ['', 'text 1']],
+        })
+
+    def test_large_bodies_are_compressed(self):
+        response = self.get('application/msgpack', page_size=200, HTTP_ACCEPT_ENCODING='br, gzip;q=0.8')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        rows = msgpack.unpackb(gzip.decompress(response.content))['data']['rows']
+        self.assertEqual(len(rows['values'][0]), 200)
+
+        response = self.get('application/msgpack', page_size=200, HTTP_ACCEPT_ENCODING='zstd')
+        self.assertEqual(response['Content-Encoding'], 'zstd')
+        body = pa.CompressedInputStream(pa.BufferReader(response.content), 'zstd').read()
+        self.assertEqual(len(msgpack.unpackb(body)['data']['rows']['values'][1]), 200)
+
+    def test_errors_keep_their_envelope(self):
+        response = self.client.get(
+            f'/api/v1/datasets/{self.dataset.id}/', {'filter': 'missing:eq:1'}, HTTP_ACCEPT='application/msgpack'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(msgpack.unpackb(response.content)['status'], 'error')
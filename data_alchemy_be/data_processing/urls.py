@@ -1,10 +1,11 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import DatasetViewSet, ColumnViewSet
+from .views import DatasetViewSet, ColumnViewSet, ProcessingJobViewSet
 
 router = DefaultRouter()
 router.register(r'datasets', DatasetViewSet, basename='dataset')
 router.register(r'columns', ColumnViewSet, basename='column')
+router.register(r'jobs', ProcessingJobViewSet, basename='job')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -2,21 +2,37 @@ from __future__ import absolute_import
 
 import logging
 
+from django.conf import settings
 from django.core.paginator import Paginator
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.http import content_disposition_header
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.parsers import MultiPartParser
 from django.core.exceptions import ValidationError
-from .models import Dataset, Column
+from .cache import DatasetPageCache
+from .exporters import DatasetExporter
+from .metrics import JobMetricsStore
+from .models import Dataset, Column, JobArtifact, ProcessingJob
+from .profiler import JobProfiler
+from .progress import TaskProgress
+from .renderers import ArrowIPCRenderer, EventStreamRenderer, MessagePackRenderer
+from utils.exceptions import ExportError
+from utils.pagination import decode_cursor, encode_cursor
 from utils.response import APIResponse
+from utils.upload_handlers import HashingUploadHandler
 from .serializers import (
     DatasetCreateSerializer,
     DatasetResponseSerializer,
-    DatasetRowsSerializer,
-    DatasetColumnSerializer
+    DatasetColumnSerializer,
+    ProcessingJobSerializer
 )
 from .services import DatasetService, ColumnService
+from .storage import get_storage
+from .storage.query import RowQuery, parse_filter, parse_sort
+from .tasks.conversion import ConversionEngine
+from .tasks.task_service import DataProcessingService
 from .validators import FileValidator
 
 
@@ -34,6 +50,15 @@ class DatasetViewSet(viewsets.ModelViewSet):
             return DatasetCreateSerializer
         return DatasetResponseSerializer
 
+    def get_renderers(self):
+        # Row pages can also be negotiated as Arrow IPC or MessagePack column arrays
+        renderers = super().get_renderers()
+        if self.action == 'retrieve':
+            renderers += [ArrowIPCRenderer(), MessagePackRenderer()]
+        if self.action == 'progress':
+            renderers += [EventStreamRenderer()]
+        return renderers
+
     def create(self, request, *args, **kwargs):
         file_validator = FileValidator(
             allowed_extensions=['csv', 'xlsx', 'xls']
@@ -49,17 +74,47 @@ class DatasetViewSet(viewsets.ModelViewSet):
             if validation_err:
                 raise ValidationError(validation_err)
 
+            inference_mode = request.data.get('inferenceMode')
+            if inference_mode and inference_mode not in DataProcessingService.INFERENCE_MODES:
+                raise ValidationError(
+                    f"Invalid inference mode. Must be one of: {', '.join(DataProcessingService.INFERENCE_MODES)}"
+                )
+
+            ingestion_mode = request.data.get('ingestionMode')
+            if ingestion_mode and ingestion_mode not in DataProcessingService.INGESTION_MODES:
+                raise ValidationError(
+                    f"Invalid ingestion mode. Must be one of: {', '.join(DataProcessingService.INGESTION_MODES)}"
+                )
+            if ingestion_mode == 'parallel' and inference_mode == 'sample':
+                raise ValidationError("Parallel ingestion infers types from every value and cannot sample")
+
+            profile = request.data.get('profile')
+            if profile and profile not in JobProfiler.MODES:
+                raise ValidationError(f"Invalid profiler. Must be one of: {', '.join(JobProfiler.MODES)}")
+
+            deduplicate = request.data.get('deduplicate')
+            if deduplicate is not None:
+                deduplicate = str(deduplicate).lower() in ('true', '1')
+
             serializer = self.get_serializer(data=request.data)
             serializer.is_valid(raise_exception=True)
 
             result = DatasetService.create_dataset(
                 file=file,
-                validated_data=serializer.validated_data
+                validated_data=serializer.validated_data,
+                inference_mode=inference_mode,
+                ingestion_mode=ingestion_mode,
+                profile=profile,
+                content_hash=HashingUploadHandler.hash_of(request, 'file'),
+                deduplicate=deduplicate
             )
 
             return APIResponse.success(
                 data=result,
-                message="Dataset uploaded successfully. Processing started.",
+                message=(
+                    "Dataset uploaded successfully. Copied from an earlier upload of the same file."
+                    if result.get('clonedFrom') else "Dataset uploaded successfully. Processing started."
+                ),
                 status_code=status.HTTP_201_CREATED
             )
 
@@ -77,27 +132,55 @@ class DatasetViewSet(viewsets.ModelViewSet):
     def retrieve(self, request, *args, **kwargs):
         try:
             pk = kwargs.get('pk')
+
+            # Cached pages are answered without touching the database
+            cache_params = [(key, request.query_params.getlist(key)) for key in request.query_params]
+            cache_version = DatasetPageCache.version(pk)
+            cached_page = DatasetPageCache.get(pk, cache_version, cache_params)
+            if cached_page is not None:
+                return APIResponse.paginated_response(
+                    data=cached_page,
+                    message="Dataset retrieved successfully"
+                )
+
             dataset = Dataset.objects.filter(id=pk).last()
 
             # Get pagination parameters
-            page = int(request.query_params.get('page', 1))
             page_size = int(request.query_params.get('page_size', 20))
 
-            # Get columns
-            columns = dataset.columns.all().order_by('position')
+            # Get columns, projected to ?columns=a,b when given
+            all_columns = list(dataset.columns.all().order_by('position'))
+            columns_by_name = {column.name: column for column in all_columns}
+            columns = self._project(all_columns, request.query_params.get('columns'))
             columns_data = DatasetColumnSerializer(columns, many=True).data
 
-            # Get rows with pagination
-            queryset = dataset.rows.all().prefetch_related(
-                'values',
-                'values__column'
-            ).order_by('row_index')
+            # Typed filters (?filter=<column>:<op>:<value>, repeatable) and sort (?sort=-<column>)
+            filters = [
+                parse_filter(columns_by_name, expression)
+                for expression in request.query_params.getlist('filter')
+            ]
+            sort_param = request.query_params.get('sort')
+            sort = parse_sort(columns_by_name, sort_param) if sort_param else None
 
-            paginator = Paginator(queryset, page_size)
-            current_page = paginator.page(page)
+            # Get rows with pagination
+            storage = get_storage(dataset)
+            row_count = dataset.row_count if dataset.row_count is not None else storage.count_rows()
 
-            # Serialize rows
-            rows_data = DatasetRowsSerializer(current_page.object_list, many=True).data
+            if filters or sort:
+                rows, pagination = self._query_page(
+                    storage, columns, RowQuery(filters=filters, sort=sort),
+                    request.query_params.get('cursor'), page_size
+                )
+                # Counting matches would cost a full scan
+                row_count = None
+            elif 'cursor' in request.query_params:
+                rows, pagination = self._cursor_page(
+                    storage, columns, row_count, request.query_params['cursor'], page_size
+                )
+            else:
+                rows, pagination = self._numbered_page(
+                    storage, columns, row_count, int(request.query_params.get('page', 1)), page_size
+                )
 
             # Get dataset basic info
             dataset_data = DatasetResponseSerializer(dataset).data
@@ -107,21 +190,25 @@ class DatasetViewSet(viewsets.ModelViewSet):
                 "results": {
                     "dataset": dataset_data,
                     "columns": columns_data,
-                    "rows": [row['values'] for row in rows_data]
+                    "rows": rows
                 },
-                "count": paginator.count,
-                "next": page + 1 if current_page.has_next() else None,
-                "previous": page - 1 if current_page.has_previous() else None,
-                "current_page": page,
-                "total_pages": paginator.num_pages,
-                "page_size": page_size
+                "count": row_count,
+                "page_size": page_size,
+                **pagination
             }
+            DatasetPageCache.set(pk, cache_version, cache_params, response_data)
 
             return APIResponse.paginated_response(
                 data=response_data,
                 message="Dataset retrieved successfully"
             )
 
+        except ValueError as e:
+            return APIResponse.error(
+                message="Invalid pagination parameters",
+                errors={"detail": str(e)},
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
         except Exception as e:
             logger.error(f"Error retrieving dataset: {str(e)}")
             return APIResponse.error(
@@ -129,6 +216,120 @@ class DatasetViewSet(viewsets.ModelViewSet):
                 errors={"detail": str(e)}
             )
 
+    @staticmethod
+    def _project(columns, names: str):
+        if not names:
+            return columns
+
+        requested = [name.strip() for name in names.split(',') if name.strip()]
+        unknown = set(requested) - {column.name for column in columns}
+        if unknown:
+            raise ValueError(f"Unknown columns: {', '.join(sorted(unknown))}")
+        return [column for column in columns if column.name in requested]
+
+    @staticmethod
+    def _numbered_page(storage, columns, row_count: int, page: int, page_size: int):
+        paginator = Paginator(range(row_count), page_size)
+        current_page = paginator.page(page)
+
+        rows = storage.read_rows(
+            columns=columns,
+            offset=(page - 1) * page_size,
+            limit=page_size
+        )
+        return rows, {
+            "next": page + 1 if current_page.has_next() else None,
+            "previous": page - 1 if current_page.has_previous() else None,
+            "current_page": page,
+            "total_pages": paginator.num_pages,
+        }
+
+    @staticmethod
+    def _cursor_page(storage, columns, row_count: int, cursor: str, page_size: int):
+        """
+        Keyset page starting at the row_index held in the cursor; an empty
+        cursor is the first page. Every page is a row_index range scan.
+        """
+        start = int(decode_cursor(cursor).get('row', 0)) if cursor else 0
+        if start < 0 or page_size < 1:
+            raise ValueError("Invalid cursor")
+
+        rows = storage.read_rows(columns=columns, offset=start, limit=page_size)
+        return rows, {
+            "next": encode_cursor({'row': start + page_size}) if start + page_size < row_count else None,
+            "previous": encode_cursor({'row': max(start - page_size, 0)}) if start > 0 else None,
+            "current_page": None,
+            "total_pages": None,
+        }
+
+    @staticmethod
+    def _query_page(storage, columns, query: RowQuery, cursor: str, page_size: int):
+        """
+        Filtered and/or sorted page. Cursors hold the sort key and row_index of
+        the last row, so each page continues from an index position; paging
+        is forward only.
+        """
+        if page_size < 1:
+            raise ValueError("Invalid page size")
+
+        after = decode_cursor(cursor) if cursor else None
+        rows, next_position = storage.query_rows(columns, query._replace(after=after), page_size)
+        return rows, {
+            "next": encode_cursor(next_position) if next_position else None,
+            "previous": None,
+            "current_page": None,
+            "total_pages": None,
+        }
+
+    @action(detail=True, methods=['get'])
+    def export(self, request, pk=None):
+        """
+        Export the dataset in its current types (?fileFormat=csv|parquet|xlsx).
+        Small datasets stream straight back; larger ones, or any with
+        ?background=true, are exported by a job whose file is fetched from
+        /jobs/{id}/download/.
+        """
+        try:
+            dataset = Dataset.objects.filter(id=pk).last()
+            if not dataset:
+                raise Dataset.DoesNotExist("Dataset not found")
+
+            file_format = request.query_params.get('fileFormat', 'csv').lower()
+            if file_format not in DatasetExporter.FORMATS:
+                raise ExportError(
+                    f"Unsupported export format. Must be one of: {', '.join(DatasetExporter.FORMATS)}"
+                )
+
+            exporter = DatasetExporter(dataset, file_format)
+            row_count = dataset.row_count if dataset.row_count is not None else get_storage(dataset).count_rows()
+            exporter.check_row_count(row_count)
+            background = request.query_params.get('background', 'false').lower() == 'true'
+
+            if not background and row_count * len(exporter.columns) <= settings.DATASET_EXPORT_STREAMING_MAX_CELLS:
+                response = StreamingHttpResponse(exporter.iter_bytes(), content_type=exporter.content_type)
+                response['Content-Disposition'] = content_disposition_header(True, exporter.filename)
+                return response
+
+            result = DatasetService.start_export(dataset, file_format)
+
+            return APIResponse.success(
+                data=result,
+                message="Export started",
+                status_code=status.HTTP_202_ACCEPTED
+            )
+        except ExportError as e:
+            return APIResponse.error(
+                message="Export not possible",
+                errors={"detail": str(e.detail)},
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+        except Exception as e:
+            logger.error(f"Error exporting dataset: {str(e)}")
+            return APIResponse.error(
+                message="Failed to export dataset",
+                errors={"detail": str(e)}
+            )
+
     @action(detail=True, methods=['get'])
     def status(self, request, pk=None):
         try:
@@ -146,6 +347,38 @@ class DatasetViewSet(viewsets.ModelViewSet):
                 errors={"detail": str(e)}
             )
 
+    @action(detail=True, methods=['get'])
+    def progress(self, request, pk=None):
+        """
+        Server-sent events of a task's progress, pushed as the task reports
+        it instead of polled through status. Needs the ASGI application.
+        """
+        try:
+            task_id = request.query_params.get('taskId')
+            if not task_id:
+                return APIResponse.error(
+                    message="Missing required parameters",
+                    errors={"detail": "taskId is required"},
+                    status_code=status.HTTP_400_BAD_REQUEST
+                )
+            if not ProcessingJob.objects.filter(dataset_id=pk, celery_task_id=task_id).exists():
+                return APIResponse.error(
+                    message="Task not found",
+                    errors={"detail": f"No task {task_id} for dataset {pk}"},
+                    status_code=status.HTTP_404_NOT_FOUND
+                )
+
+            response = StreamingHttpResponse(TaskProgress.stream(task_id), content_type='text/event-stream')
+            response['Cache-Control'] = 'no-cache'
+            response['X-Accel-Buffering'] = 'no'
+            return response
+        except Exception as e:
+            logger.error(f"Error streaming progress: {str(e)}")
+            return APIResponse.error(
+                message="Failed to stream progress",
+                errors={"detail": str(e)}
+            )
+
 class ColumnViewSet(viewsets.ViewSet):
     @action(detail=True, methods=['put'])
     def type_conversion(self, request, pk=None):
@@ -163,24 +396,41 @@ class ColumnViewSet(viewsets.ViewSet):
             # Get column and dataset
             column = get_object_or_404(Column, id=pk, dataset_id=dataset_id)
 
-            # Validate conversion possibility
-            can_convert, error_message = ColumnService.validate_type_conversion(
-                column=column,
-                target_type=target_type
-            )
+            if target_type not in ConversionEngine.SUPPORTED_TYPES:
+                return APIResponse.error(
+                    message="Type conversion not possible",
+                    errors={"detail": f"Unsupported target type: {target_type}"},
+                    status_code=status.HTTP_400_BAD_REQUEST
+                )
 
-            if not can_convert:
+            # Most conversions can be ruled out from the column profile alone
+            profile_check = ColumnService.check_profile(column, target_type)
+            if profile_check is not None and not profile_check[0]:
                 return APIResponse.error(
                     message="Type conversion not possible",
-                    errors={"detail": error_message},
+                    errors={"detail": profile_check[1]},
                     status_code=status.HTTP_400_BAD_REQUEST
                 )
 
-            result = ColumnService.update_column_type(dataset_id, column.id, target_type)
+            # Values are validated and converted in one pass by the worker;
+            # failures are reported through the job result
+            dry_run = str(request.data.get('dryRun', False)).lower() in ('true', '1')
+
+            profile = request.data.get('profile')
+            if profile and profile not in JobProfiler.MODES:
+                return APIResponse.error(
+                    message="Invalid profiler",
+                    errors={"detail": f"profile must be one of: {', '.join(JobProfiler.MODES)}"},
+                    status_code=status.HTTP_400_BAD_REQUEST
+                )
+
+            result = ColumnService.update_column_type(
+                dataset_id, column.id, target_type, dry_run=dry_run, profile=profile
+            )
 
             return APIResponse.success(
                 data=result,
-                message="Type conversion started successfully",
+                message="Type validation started successfully" if dry_run else "Type conversion started successfully",
                 status_code=status.HTTP_202_ACCEPTED
             )
 
@@ -191,3 +441,87 @@ class ColumnViewSet(viewsets.ViewSet):
                 errors={"detail": str(e)}
             )
 
+
+class ProcessingJobViewSet(viewsets.ViewSet):
+    def retrieve(self, request, pk=None):
+        try:
+            job = get_object_or_404(ProcessingJob, id=pk)
+
+            return APIResponse.success(data=ProcessingJobSerializer(job).data)
+        except Exception as e:
+            logger.error(f"Error retrieving job: {str(e)}")
+            return APIResponse.error(
+                message="Failed to retrieve job",
+                errors={"detail": str(e)}
+            )
+
+    @action(detail=True, methods=['post'])
+    def resume(self, request, pk=None):
+        try:
+            job = get_object_or_404(ProcessingJob, id=pk, job_type='INFERENCE')
+            if job.status != 'FAILED' or not job.checkpoint:
+                return APIResponse.error(
+                    message="Job cannot be resumed",
+                    errors={"detail": "Only failed ingestion jobs with a checkpoint can be resumed"},
+                    status_code=status.HTTP_409_CONFLICT
+                )
+
+            result = DatasetService.resume_processing(job)
+            return APIResponse.success(
+                data=result,
+                message="Processing resumed",
+                status_code=status.HTTP_202_ACCEPTED
+            )
+        except Exception as e:
+            logger.error(f"Error resuming job: {str(e)}")
+            return APIResponse.error(
+                message="Failed to resume job",
+                errors={"detail": str(e)}
+            )
+
+    @action(detail=True, methods=['get'], url_path=r'artifacts/(?P<artifact_id>\d+)')
+    def artifact(self, request, pk=None, artifact_id=None):
+        try:
+            artifact = get_object_or_404(JobArtifact, id=artifact_id, job_id=pk)
+
+            return FileResponse(
+                artifact.file.open('rb'),
+                as_attachment=True,
+                filename=artifact.file.name.rsplit('/', 1)[-1],
+                content_type='application/octet-stream'
+            )
+        except Exception as e:
+            logger.error(f"Error downloading artifact: {str(e)}")
+            return APIResponse.error(
+                message="Failed to download artifact",
+                errors={"detail": str(e)}
+            )
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        try:
+            job = get_object_or_404(ProcessingJob, id=pk, job_type='EXPORT')
+            if job.status != 'COMPLETED':
+                return APIResponse.error(
+                    message="Export not ready",
+                    errors={"detail": f"Export job is {job.status.lower()}"},
+                    status_code=status.HTTP_409_CONFLICT
+                )
+
+            return FileResponse(
+                open(job.result['path'], 'rb'),
+                as_attachment=True,
+                filename=job.result['filename'],
+                content_type=DatasetExporter.FORMATS[job.result['file_format']][0]
+            )
+        except Exception as e:
+            logger.error(f"Error downloading export: {str(e)}")
+            return APIResponse.error(
+                message="Failed to download export",
+                errors={"detail": str(e)}
+            )
+
+
+def metrics(request):
+    """Aggregate job metrics in the Prometheus text exposition format."""
+    return HttpResponse(JobMetricsStore.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
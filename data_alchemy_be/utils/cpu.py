@@ -0,0 +1,41 @@
+import math
+import os
+from pathlib import Path
+from typing import Optional
+
+CGROUP_ROOT = Path('/sys/fs/cgroup')
+
+
+def available_cpus() -> int:
+    """
+    Number of CPUs this process may actually use: the scheduler affinity,
+    capped by a cgroup CPU quota when the container sets one. os.cpu_count()
+    reports the host's CPUs, which oversubscribes a limited container.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    quota = _cgroup_cpu_quota()
+    if quota is not None:
+        cpus = min(cpus, max(math.ceil(quota), 1))
+    return cpus
+
+
+def _cgroup_cpu_quota() -> Optional[float]:
+    """CPU quota of the process's cgroup in CPUs, or None when unlimited."""
+    try:
+        # cgroup v2: "<quota> <period>", quota "max" when unlimited
+        quota, period = (CGROUP_ROOT / 'cpu.max').read_text().split()
+        return None if quota == 'max' else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+
+    try:
+        # cgroup v1: quota -1 when unlimited
+        quota = int((CGROUP_ROOT / 'cpu' / 'cpu.cfs_quota_us').read_text())
+        period = int((CGROUP_ROOT / 'cpu' / 'cpu.cfs_period_us').read_text())
+        return None if quota <= 0 else quota / period
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,22 @@
+import base64
+import json
+from typing import Any, Dict
+
+
+def encode_cursor(position: Dict[str, Any]) -> str:
+    """Render a page position as an opaque, URL safe cursor."""
+    payload = json.dumps(position, separators=(',', ':'), sort_keys=True)
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Parse a cursor made by encode_cursor. Raises ValueError for anything else."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+    if not isinstance(position, dict):
+        raise ValueError("Invalid cursor")
+    return position
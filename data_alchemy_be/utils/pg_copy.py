@@ -0,0 +1,65 @@
+import io
+from typing import Any, Iterable, Iterator, List, Sequence
+
+COPY_ESCAPES = str.maketrans({
+    '\\': '\\\\',
+    '\t': '\\t',
+    '\n': '\\n',
+    '\r': '\\r',
+})
+
+
+def escape_copy_value(value: Any) -> str:
+    """Render a value in PostgreSQL COPY text format."""
+    if value is None:
+        return '\\N'
+    return str(value).translate(COPY_ESCAPES)
+
+
+class CopyStream(io.RawIOBase):
+    """
+    Read-only file object that lazily renders rows as COPY text lines,
+    so copy_expert can stream any number of rows in constant memory.
+    """
+
+    def __init__(self, rows: Iterable[Sequence[Any]]):
+        self._lines = self._render(rows)
+        self._buffer = b''
+
+    @staticmethod
+    def _render(rows: Iterable[Sequence[Any]]) -> Iterator[bytes]:
+        for row in rows:
+            yield ('\t'.join(escape_copy_value(value) for value in row) + '\n').encode('utf-8')
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            self._buffer += line
+
+        if size < 0:
+            data, self._buffer = self._buffer, b''
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+def copy_rows(cursor, table: str, columns: List[str], rows: Iterable[Sequence[Any]]) -> None:
+    """Stream rows into a table with COPY FROM STDIN."""
+    cursor.copy_expert(
+        f"COPY {table} ({', '.join(columns)}) FROM STDIN",
+        CopyStream(rows)
+    )
+
+
+def allocate_ids(cursor, table: str, count: int, column: str = 'id') -> List[int]:
+    """Reserve count values from a table's id sequence in one round trip."""
+    cursor.execute(
+        "SELECT nextval(pg_get_serial_sequence(%s, %s)) FROM generate_series(1, %s)",
+        [table, column, count]
+    )
+    return [row[0] for row in cursor.fetchall()]
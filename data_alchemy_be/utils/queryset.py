@@ -0,0 +1,25 @@
+from typing import Iterator, List, Tuple
+
+from django.db.models import QuerySet
+
+
+def iter_keyset(queryset: QuerySet, fields: List[str], batch_size: int, key: str = 'id') -> Iterator[List[Tuple]]:
+    """
+    Yield batches of values_list(*fields) rows ordered by key, fetching each
+    batch with `key > last seen key` instead of OFFSET. Every batch is an index
+    range scan, so a full scan stays linear and never skips or repeats rows
+    while they are being updated. key must be unique and listed in fields.
+    """
+    key_position = fields.index(key)
+    last_key = None
+
+    while True:
+        batch_queryset = queryset if last_key is None else queryset.filter(**{f'{key}__gt': last_key})
+        batch = list(batch_queryset.order_by(key).values_list(*fields)[:batch_size])
+        if not batch:
+            return
+
+        yield batch
+        if len(batch) < batch_size:
+            return
+        last_key = batch[-1][key_position]
@@ -10,4 +10,14 @@ class RedisClient(metaclass=SingletonMeta):
         self.redis = redis.Redis.from_url(CELERY_BROKER_URL)
 
     def get(self, key: str) -> str:
-        return self.redis.get(key)
\ No newline at end of file
+        return self.redis.get(key)
+
+    def set(self, key: str, value, ttl: int = None) -> None:
+        self.redis.set(key, value, ex=ttl)
+
+    def delete(self, *keys: str) -> None:
+        if keys:
+            self.redis.delete(*keys)
+
+    def pipeline(self):
+        return self.redis.pipeline()
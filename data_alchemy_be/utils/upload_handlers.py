@@ -0,0 +1,37 @@
+import hashlib
+from typing import Dict, Optional
+
+from django.core.files.uploadhandler import FileUploadHandler
+
+
+class HashingUploadHandler(FileUploadHandler):
+    """
+    Computes the SHA-256 of every uploaded file while it streams in, then
+    hands the chunks on to the next handler, which stores the file. Must
+    come first in FILE_UPLOAD_HANDLERS.
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.hashes: Dict[str, str] = {}
+        self._hasher = None
+
+    def new_file(self, *args, **kwargs) -> None:
+        super().new_file(*args, **kwargs)
+        self._hasher = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data: bytes, start: int) -> bytes:
+        self._hasher.update(raw_data)
+        return raw_data
+
+    def file_complete(self, file_size: int) -> None:
+        self.hashes[self.field_name] = self._hasher.hexdigest()
+        return None
+
+    @classmethod
+    def hash_of(cls, request, field_name: str) -> Optional[str]:
+        """Content hash of the file uploaded in a field of a parsed request, if it was hashed."""
+        for handler in request.upload_handlers:
+            if isinstance(handler, cls):
+                return handler.hashes.get(field_name)
+        return None